@@ -0,0 +1,336 @@
+'''
+Created on Oct 18, 2026
+
+This module is Arelle's controller for benchmarking loading in command line mode
+
+Loads an entry point repeatedly, first with the DTS cache disabled (cold loads, each
+load parses every document), then with the DTS cache enabled (warm loads, standard
+taxonomy documents parsed by the first load are reused), and reports the timings.
+
+With --compareParsers, the entry point is instead loaded with minidom and with lxml,
+each in its own process so that the peak resident memory of each parser is reported.
+
+With --factIndex N, a synthetic instance of N facts (with some equivalent facts) is
+written and loaded, and finding its equivalent facts (as EFM 6.5.12) with the fact
+index is timed against the pairwise comparison of facts it replaced.
+
+With --evaluations N, N synthetic variable set evaluations (some with fallen back variables)
+are tested for being unnecessary with the hashed evaluations of the formula evaluator, timed
+against the linear scan of prior evaluations it replaced.
+
+With --xpath N, sample XPath 2.0 expressions are parsed against the entry point and each is
+evaluated N times by the expression interpreter and by its compiled program.  The operands of
+their value operations and comparisons (and of some on numeric facts of the entry point) that
+take the numeric fast path are counted.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import gettext, time, gc, sys, os, subprocess, tempfile, shutil
+from collections import defaultdict
+from optparse import OptionParser
+from arelle import (Cntlr, FileSource, Version)
+from arelle.ModelValue import qname
+from arelle.Locale import format_string
+
+def main():
+    gettext.install("arelle")
+    usage = "usage: %prog [options]"
+    parser = OptionParser(usage, version="Arelle(TM) {0}".format(Version.version))
+    parser.add_option("-f", "--file", dest="filename",
+                      help=_("FILENAME is an entry point, which may be "
+                             "an XBRL instance, schema or linkbase file, "
+                             "a local file or a URI to a web located file."))
+    parser.add_option("--repeat", type="int", dest="repeat", default=5,
+                      help=_("Number of times to load the entry point in each mode."))
+    parser.add_option("--dtsCacheSize", type="int", dest="dtsCacheSize", default=512,
+                      help=_("Megabytes of parsed documents to hold in the DTS cache for warm loads."))
+    parser.add_option("--parser", choices=("minidom", "lxml"), dest="parser",
+                      help=_("Load with only this xml parser, with the DTS cache disabled, "
+                             "and report load times and peak memory."))
+    parser.add_option("--compareParsers", action="store_true", dest="compareParsers",
+                      help=_("Compare load times and peak memory of minidom and lxml parsing, "
+                             "each in a separate process."))
+    parser.add_option("--factIndex", type="int", dest="factIndexFacts",
+                      help=_("Benchmark finding equivalent facts in a synthetic instance "
+                             "of this number of facts (no --file needed)."))
+    parser.add_option("--evaluations", type="int", dest="evaluations",
+                      help=_("Benchmark detecting unnecessary formula evaluations among "
+                             "this number of synthetic evaluations (no --file needed)."))
+    parser.add_option("--xpath", type="int", dest="xpathEvaluations",
+                      help=_("Benchmark this number of evaluations of each of a set of sample XPath "
+                             "expressions, interpreted and compiled, against the --file entry point."))
+    (options, args) = parser.parse_args()
+    if len(args) != 0 or (options.filename is None and options.factIndexFacts is None and 
+                          options.evaluations is None):
+        parser.error(_("incorrect arguments, please try\n  python CntlrBenchmark.py --help"))
+    else:
+        CntlrBenchmark().run(options)
+
+class CntlrBenchmark(Cntlr.Cntlr):
+
+    def __init__(self):
+        super().__init__()
+
+    def timeLoads(self, filename, repeat):
+        times = []
+        for i in range(repeat):
+            startedAt = time.time()
+            modelXbrl = self.modelManager.load(FileSource.FileSource(filename, self), _("benchmark"))
+            times.append(time.time() - startedAt)
+            self.modelManager.close(modelXbrl)
+        return times
+
+    def run(self, options):
+        if options.factIndexFacts:
+            self.benchmarkFactIndex(options.factIndexFacts)
+            return
+        if options.evaluations:
+            self.benchmarkEvaluations(options.evaluations)
+            return
+        if options.xpathEvaluations:
+            self.benchmarkXPath(options.filename, options.xpathEvaluations)
+            return
+        if options.compareParsers:
+            self.compareParsers(options)
+            return
+        self.modelManager.disclosureSystem.select(None) # just load ordinary mappings
+        if options.parser:
+            self.modelManager.useLxml = options.parser == "lxml"
+            self.modelManager.dtsCache.maxSize = 0
+            self.logTimes(options.parser, self.timeLoads(options.filename, options.repeat))
+            self.addToLog(_("[info] {0} peak memory: {1}").format(options.parser, peakMemory()))
+            return
+        dtsCache = self.modelManager.dtsCache
+
+        dtsCache.maxSize = 0
+        coldTimes = self.timeLoads(options.filename, options.repeat)
+
+        dtsCache.maxSize = options.dtsCacheSize * 1024 * 1024
+        self.timeLoads(options.filename, 1) # fills cache
+        gc.collect()
+        warmTimes = self.timeLoads(options.filename, options.repeat)
+
+        self.logTimes("cold", coldTimes)
+        self.logTimes("warm", warmTimes)
+        self.addToLog(_("[info] {0}").format(dtsCache))
+        dtsCache.clear()
+
+    def compareParsers(self, options):
+        for parser in ("minidom", "lxml"):
+            try:
+                output = subprocess.check_output([sys.executable, "-m", "arelle.CntlrBenchmark",
+                                                  "--file", options.filename,
+                                                  "--repeat", str(options.repeat),
+                                                  "--parser", parser],
+                                                 stderr=subprocess.STDOUT)
+                self.addToLog(output.decode(errors="replace").rstrip())
+            except (EnvironmentError, subprocess.CalledProcessError) as err:
+                self.addToLog(_("[err] {0} benchmark failed: {1}").format(parser, err))
+
+    def benchmarkFactIndex(self, numFacts):
+        self.modelManager.disclosureSystem.select(None)
+        dir = tempfile.mkdtemp()
+        try:
+            filename = writeSyntheticInstance(dir, numFacts)
+            startedAt = time.time()
+            modelXbrl = self.modelManager.load(FileSource.FileSource(filename, self), _("benchmark"))
+            self.addToLog(format_string(self.modelManager.locale, _("[info] loaded %d facts in %.3f secs"),
+                                        (len(modelXbrl.facts), time.time() - startedAt)))
+
+            startedAt = time.time()
+            factIndex = modelXbrl.factIndex()
+            self.addToLog(format_string(self.modelManager.locale, _("[info] fact index built in %.3f secs"),
+                                        (time.time() - startedAt,)))
+            startedAt = time.time()
+            indexedPairs = 0
+            seen = defaultdict(int)
+            for f1 in modelXbrl.facts:
+                key = (f1.qname, f1.contextID, f1.unitID, f1.xmlLang, None)
+                seen[key] += 1
+                indexedPairs += len(factIndex[key]) - seen[key]
+            indexedTime = time.time() - startedAt
+            self.addToLog(format_string(self.modelManager.locale,
+                                        _("[info] fact index: %d equivalent pairs in %.3f secs"),
+                                        (indexedPairs, indexedTime)))
+
+            # pairwise comparison is quadratic, time a sample of facts and extrapolate
+            sample = modelXbrl.facts[:min(len(modelXbrl.facts), 2000)]
+            startedAt = time.time()
+            for i, f1 in enumerate(sample):
+                for f2 in sample[i+1:]:
+                    if (f1.qname == f2.qname and f1.contextID == f2.contextID and
+                        f1.unitID == f2.unitID and f1.xmlLang == f2.xmlLang):
+                        pass
+            sampleTime = time.time() - startedAt
+            self.addToLog(format_string(self.modelManager.locale,
+                                        _("[info] pairwise: %.3f secs for %d facts, about %.1f secs for %d facts"),
+                                        (sampleTime, len(sample),
+                                         sampleTime * (len(modelXbrl.facts) / max(len(sample), 1)) ** 2,
+                                         len(modelXbrl.facts))))
+            self.modelManager.close(modelXbrl)
+        finally:
+            shutil.rmtree(dir, ignore_errors=True)
+
+    def benchmarkEvaluations(self, numEvaluations):
+        from arelle.FormulaEvaluator import Evaluations, evaluationIsUnnecessary
+        thisEvaluations = syntheticEvaluations(numEvaluations)
+        startedAt = time.time()
+        evaluations = Evaluations()
+        hashedUnnecessary = 0
+        for thisEvaluation in thisEvaluations:
+            if evaluations.isUnnecessary(thisEvaluation):
+                hashedUnnecessary += 1
+            else:
+                evaluations.append(thisEvaluation)
+        hashedTime = time.time() - startedAt
+        self.addToLog(format_string(self.modelManager.locale,
+                                    _("[info] hashed: %d of %d evaluations unnecessary in %.3f secs"),
+                                    (hashedUnnecessary, len(thisEvaluations), hashedTime)))
+
+        # linear scan is quadratic, time a sample of evaluations and extrapolate
+        sample = thisEvaluations[:min(len(thisEvaluations), 2000)]
+        startedAt = time.time()
+        evaluations = []
+        linearUnnecessary = 0
+        for thisEvaluation in sample:
+            if evaluationIsUnnecessary(thisEvaluation, evaluations):
+                linearUnnecessary += 1
+            else:
+                evaluations.append(thisEvaluation)
+        sampleTime = time.time() - startedAt
+        self.addToLog(format_string(self.modelManager.locale,
+                                    _("[info] linear: %d of %d evaluations unnecessary in %.3f secs, about %.1f secs for %d evaluations"),
+                                    (linearUnnecessary, len(sample), sampleTime,
+                                     sampleTime * (len(thisEvaluations) / max(len(sample), 1)) ** 2,
+                                     len(thisEvaluations))))
+
+    def benchmarkXPath(self, filename, numEvaluations):
+        from arelle import XPathParser, XPathContext
+        from arelle.ModelFormulaObject import FormulaOptions
+        self.modelManager.disclosureSystem.select(None)
+        self.modelManager.formulaOptions = FormulaOptions()
+        modelXbrl = self.modelManager.load(FileSource.FileSource(filename, self), _("benchmark"))
+        XPathParser.initializeParser(modelXbrl.modelDocument)
+        xpCtx = XPathContext.create(modelXbrl)
+        progs = [XPathParser.parse(modelXbrl.modelDocument, expr, 
+                                   XPathParser.staticExpressionFunctionContext(), "benchmark", None)
+                 for expr in sampleXPathExpressions]
+        for mode, evaluate in (("interpreted", xpCtx.interpret), ("compiled", xpCtx.evaluate)):
+            startedAt = time.time()
+            for prog in progs:
+                for i in range(numEvaluations):
+                    evaluate(prog)
+            self.addToLog(format_string(self.modelManager.locale,
+                                        _("[info] %s: %d expressions evaluated %d times in %.3f secs"),
+                                        (mode, len(progs), numEvaluations, time.time() - startedAt)))
+
+        # count the value operations and comparisons whose operands (numbers, or numeric facts of the
+        # entry point bound to $a and $b) take the fast path of XPathContext.numericOperand
+        numericFacts = [fact for fact in modelXbrl.facts if fact.isNumeric and not fact.isNil][:2]
+        if len(numericFacts) == 2:
+            xpCtx.inScopeVars[qname("a")], xpCtx.inScopeVars[qname("b")] = numericFacts
+            progs.extend(XPathParser.parse(modelXbrl.modelDocument, expr,
+                                           XPathParser.staticExpressionFunctionContext(), "benchmark", None)
+                         for expr in sampleFactXPathExpressions)
+        operands = []
+        numericOperand = XPathContext.numericOperand
+        def countingNumericOperand(xc, p, x):
+            result = numericOperand(xc, p, x)
+            operands.append(result is not None)
+            return result
+        XPathContext.numericOperand = countingNumericOperand
+        try:
+            for prog in progs:
+                xpCtx.evaluate(prog)
+        finally:
+            XPathContext.numericOperand = numericOperand
+        self.addToLog(format_string(self.modelManager.locale,
+                                    _("[info] numeric fast path: %d of %d operands numeric"),
+                                    (sum(operands), len(operands))))
+        self.modelManager.close(modelXbrl)
+
+    def logTimes(self, mode, times):
+        self.addToLog(format_string(self.modelManager.locale,
+                                    _("[info] %s loads: %d, mean %.3f secs, min %.3f secs, max %.3f secs"),
+                                    (mode, len(times), sum(times) / len(times), min(times), max(times))))
+
+    def addToLog(self, message):
+        print(message)
+
+    def showStatus(self, message, clearAfter=None):
+        pass
+
+def writeSyntheticInstance(dir, numFacts):
+    # schema of 100 monetary items, instance of numFacts facts, 100 facts per context,
+    # every 1000th fact repeats its predecessor (an equivalent fact)
+    with open(os.path.join(dir, "synthetic.xsd"), "w") as f:
+        f.write('<schema xmlns="http://www.w3.org/2001/XMLSchema" '
+                'xmlns:xbrli="http://www.xbrl.org/2003/instance" '
+                'targetNamespace="http://example.com/synthetic" elementFormDefault="qualified">\n'
+                '<import namespace="http://www.xbrl.org/2003/instance" '
+                'schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd"/>\n')
+        for i in range(100):
+            f.write('<element name="c{0}" id="c{0}" type="xbrli:monetaryItemType" '
+                    'substitutionGroup="xbrli:item" xbrli:periodType="instant" nillable="true"/>\n'.format(i))
+        f.write('</schema>\n')
+    filename = os.path.join(dir, "synthetic.xml")
+    with open(filename, "w") as f:
+        f.write('<xbrl xmlns="http://www.xbrl.org/2003/instance" '
+                'xmlns:link="http://www.xbrl.org/2003/linkbase" '
+                'xmlns:xlink="http://www.w3.org/1999/xlink" '
+                'xmlns:iso4217="http://www.xbrl.org/2003/iso4217" '
+                'xmlns:s="http://example.com/synthetic">\n'
+                '<link:schemaRef xlink:type="simple" xlink:href="synthetic.xsd"/>\n')
+        for i in range(numFacts // 100 + 1):
+            f.write('<context id="x{0}"><entity><identifier scheme="http://example.com">{0}</identifier>'
+                    '</entity><period><instant>2011-12-31</instant></period></context>\n'.format(i))
+        f.write('<unit id="usd"><measure>iso4217:USD</measure></unit>\n')
+        for i in range(numFacts):
+            j = i - 1 if i % 1000 == 999 else i
+            f.write('<s:c{0} contextRef="x{1}" unitRef="usd" decimals="0">{2}</s:c{0}>\n'.format(
+                    j % 100, j // 100, j))
+        f.write('</xbrl>\n')
+    return filename
+
+def syntheticEvaluations(numEvaluations):
+    # evaluations of 3 fact variables bound to distinct objects (as facts), every 10th
+    # evaluation repeats an earlier one, every 7th has its last variable fallen back (None)
+    facts = [object() for i in range(numEvaluations)]
+    evaluations = []
+    for i in range(numEvaluations):
+        j = i // 2 if i % 10 == 9 else i
+        evaluations.append((facts[j % 100], facts[j // 100], None if j % 7 == 6 else facts[j]))
+    return evaluations
+
+# expressions in the manner of formula linkbase value, test and filter expressions
+sampleXPathExpressions = (
+    "(1 + 2) * 3 - 4 div 2 eq 7",
+    "if (sum((1, 2, 3)) gt 5) then 'large' else 'small'",
+    "for $i in 1 to 20 return $i * 2",
+    "some $j in ('a', 'b', 'c') satisfies $j eq 'c'",
+    "every $j in (1, 2, 3) satisfies $j gt 0 and $j lt 10",
+    "string-length(concat('abc', 'def')) = 6",
+    "(10, 20, 30)[. gt 15]",
+    "count(//*) ge 1",
+    )
+
+# expressions in the manner of value assertions on numeric facts $a and $b
+sampleFactXPathExpressions = (
+    "$a + $b gt $a",
+    "$a * 2 eq $a + $a",
+    "sum(($a, $b)) = $a + $b",
+    )
+
+def peakMemory():
+    try:
+        import resource
+    except ImportError: # not available on Windows
+        return _("unavailable")
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        maxrss *= 1024 # linux reports kilobytes, mac os x bytes
+    return "{0:.1f} MB".format(maxrss / (1024 * 1024))
+
+if __name__ == "__main__":
+    main()
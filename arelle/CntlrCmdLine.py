@@ -65,6 +65,33 @@ def main():
                       help=_("Write dimensions (of definition) linkbase into CSVFILE"))
     parser.add_option("--csvTestReport", action="store", dest="csvTestReport",
                       help=_("Write test report of validation (of test cases) into CSVFILE"))
+    parser.add_option("--dtsCacheSize", type="int", dest="dtsCacheSize",
+                      help=_("Specify megabytes of parsed taxonomy documents to keep cached "
+                             "for reuse by later loads in this process, such as by test case variations."))
+    parser.add_option("--webCacheMaxSize", type="int", dest="webCacheMaxSize",
+                      help=_("Specify megabytes of web cache files to keep, least recently checked "
+                             "files are removed from the cache before loading."))
+    parser.add_option("--webCacheMaxAge", type="int", dest="webCacheMaxAge",
+                      help=_("Specify days since web cache files were last checked on the web "
+                             "after which they are removed from the cache before loading."))
+    parser.add_option("--xpathParseCache", action="store_true", dest="xpathParseCache",
+                      help=_("Save parsed formula XPath expressions in the cache directory, and reuse "
+                             "them instead of parsing identical expressions in later runs."))
+    parser.add_option("--formulaWorkers", type="int", dest="formulaWorkers",
+                      help=_("Specify number of processes evaluating assertions "
+                             "(where processes can be forked)."))
+    parser.add_option("--formulaProfile", action="store", dest="formulaProfile",
+                      help=_("Write time, counts, facts winnowed by filters and cache hits of each formula "
+                             "variable set, filter and expression into FILE (csv, or json if FILE ends with .json)."))
+    parser.add_option("--discoveryWorkers", type="int", dest="discoveryWorkers",
+                      help=_("Specify number of threads fetching and parsing referenced documents "
+                             "ahead of DTS discovery, such as for loading from a cold web cache."))
+    parser.add_option("--lxml", action="store_true", dest="lxml",
+                      help=_("Parse documents with lxml instead of minidom, "
+                             "which is faster and uses less memory for large instances and taxonomies."))
+    parser.add_option("--streaming", action="store_true", dest="streaming",
+                      help=_("Stream the facts of a very large instance as it is parsed (requires lxml), "
+                             "keeping fact values but not fact elements, which are not needed except by formulae."))
     parser.add_option("--logFile", action="store", dest="logFile",
                       help=_("Write log messages into file, otherwise they go to standard output"))
     parser.add_option("--formulaParamExprResult", action="store_true", dest="formulaParamExprResult", help=_("Specify formula tracing."))
@@ -147,6 +174,27 @@ class CntlrCmdLine(Cntlr.Cntlr):
             self.modelManager.validateCalcLB = True
         if options.utrValidate:
             self.modelManager.validateUtr = True
+        if options.dtsCacheSize:
+            self.modelManager.dtsCache.maxSize = options.dtsCacheSize * 1024 * 1024
+        if options.webCacheMaxSize is not None or options.webCacheMaxAge is not None:
+            evictedFiles = self.webCache.evict(
+                maxSize=options.webCacheMaxSize * 1024 * 1024 if options.webCacheMaxSize is not None else None,
+                maxAgeSeconds=options.webCacheMaxAge * 60 * 60 * 24 if options.webCacheMaxAge is not None else None)
+            files, size, oldestCheck, newestCheck = self.webCache.statistics()
+            self.addToLog(_("[info] web cache: removed {0} files, keeping {1} files of {2:.1f} MB").format(
+                          len(evictedFiles), files, size / (1024 * 1024)))
+        if options.lxml:
+            self.modelManager.useLxml = True
+        if options.xpathParseCache:
+            self.modelManager.xpathParseCache = True
+        if options.formulaWorkers:
+            self.modelManager.formulaWorkers = options.formulaWorkers
+        if options.formulaProfile:
+            self.modelManager.formulaProfileFile = options.formulaProfile
+        if options.discoveryWorkers:
+            self.modelManager.discoveryWorkers = options.discoveryWorkers
+        if options.streaming:
+            self.modelManager.streamInstances = True
         fo = FormulaOptions()
         if options.formulaParamExprResult:
             fo.traceParameterExpressionResult = True
@@ -0,0 +1,153 @@
+'''
+Created on Oct 18, 2026
+
+Discovery scheduler, fetches and parses the documents of a DTS ahead of discovery
+
+ModelDocument.load discovers referenced documents depth first, one at a time, so
+on a cold web cache each HTTP fetch waits for the prior one.  When a document has
+been loaded, the scheduler collects the hrefs it references (schema imports and
+includes, schemaRefs, linkbaseRefs, roleRefs, arcroleRefs and locators) and submits
+them to a bounded thread pool, which fetches each into the web cache, parses it,
+and submits its own hrefs in turn, so the DTS is crawled breadth first.
+
+Discovery itself (model objects, urlDocs, error messages) still occurs on the
+loading thread in the same document order as without the scheduler: load takes
+the prefetched document from the scheduler (waiting for it if necessary) instead
+of fetching and parsing it, so object indexes and messages are reproducible.
+Parsing errors found while prefetching are not reported, the document is then
+parsed again by load, which reports them in discovery order.  Likewise a document
+that could not be retrieved is fetched again when load takes it, which reports the
+retrieval error (and switches to work offline) as discovery without prefetching does.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import os, threading
+from concurrent.futures import ThreadPoolExecutor
+from arelle import (XbrlConst, UrlUtil)
+
+# (namespace, localName) of elements whose href or schemaLocation is discovered
+schemaLocationElements = {(XbrlConst.xsd, "import"), (XbrlConst.xsd, "include")}
+hrefElements = {(XbrlConst.link, "schemaRef"), (XbrlConst.link, "linkbaseRef"),
+                (XbrlConst.link, "roleRef"), (XbrlConst.link, "arcroleRef"),
+                (XbrlConst.link, "loc")}
+
+class DiscoveryScheduler:
+    def __init__(self, modelXbrl, maxWorkers):
+        self.modelXbrl = modelXbrl
+        self.modelManager = modelXbrl.modelManager
+        self.webCache = modelXbrl.modelManager.cntlr.webCache
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers)
+        self.lock = threading.Lock()
+        self.scheduled = set() # mapped uris submitted for prefetching
+        self.futures = {} # mapped uri of prefetch not yet taken by load
+        self.isClosed = False
+        # disclosure system checkfile reports errors, so documents are only fetched, not parsed
+        self.isParsing = not self.modelManager.validateDisclosureSystem
+
+    def isScheduled(self, mappedUri):
+        with self.lock:
+            return mappedUri in self.futures
+
+    def take(self, mappedUri):
+        # returns (filepath, xmlDocument) prefetched for load, xmlDocument is None if not parsed
+        with self.lock:
+            future = self.futures.pop(mappedUri)
+        try:
+            filepath, xmlDocument = future.result()
+        except Exception as err: # unexpected prefetching failure, fetch on this thread instead
+            self.modelXbrl.error(_("Prefetching {0} failed: {1}").format(mappedUri, err),
+                                 "info", "arelle:prefetchError")
+            filepath = xmlDocument = None
+        if filepath is None: # retrieval error, reported now (in discovery order) by fetching again
+            filepath = self.webCache.getfilename(mappedUri)
+        return (filepath, xmlDocument)
+
+    def schedule(self, xmlDocument, filepath):
+        from arelle.ModelDocument import mapUri
+        disclosureSystem = self.modelManager.disclosureSystem
+        validateDisclosureSystem = self.modelManager.validateDisclosureSystem
+        uriDir = getattr(self.modelXbrl, "uriDir", "")
+        for href, base, namespace in self.documentHrefs(xmlDocument, filepath):
+            normalizedUri = self.webCache.normalizeUrl(href, base)
+            if not normalizedUri:
+                continue
+            if validateDisclosureSystem and (
+                (not normalizedUri.startswith(uriDir) and not disclosureSystem.hrefValid(normalizedUri)) or
+                (namespace and disclosureSystem.blockDisallowedReferences and
+                 disclosureSystem.disallowedHrefOfNamespace(normalizedUri, namespace))):
+                continue # blocked references are reported by discovery and never fetched
+            mappedUri = mapUri(self.modelXbrl, normalizedUri)
+            if self.modelXbrl.fileSource.isInArchive(mappedUri):
+                continue
+            with self.lock:
+                if (self.isClosed or mappedUri in self.scheduled or
+                    mappedUri in self.modelXbrl.urlDocs):
+                    continue
+                self.scheduled.add(mappedUri)
+                self.futures[mappedUri] = self.executor.submit(self.prefetch, mappedUri)
+
+    def documentHrefs(self, xmlDocument, filepath):
+        ignoreBase = self.modelManager.validateDisclosureSystem # xml:base is prohibited, ignored by discovery
+        hrefs = []
+        for element in xmlDocument.getElementsByTagNameNS("*", "*"):
+            key = (element.namespaceURI, element.localName)
+            if key in schemaLocationElements:
+                href = element.getAttribute("schemaLocation")
+                namespace = element.getAttribute("namespace") if element.localName == "import" else None
+            elif key in hrefElements:
+                href = UrlUtil.splitDecodeFragment(element.getAttributeNS(XbrlConst.xlink, "href"))[0]
+                namespace = None
+            else:
+                continue
+            if href:
+                hrefs.append((href, filepath if ignoreBase else elementBase(element, filepath), namespace))
+        return hrefs
+
+    def prefetch(self, mappedUri):
+        # runs on a pool thread, retrieval errors are left for take to report
+        filepath = self.webCache.getfilename(mappedUri, deferErrors=True)
+        xmlDocument = None
+        if (filepath and self.isParsing and os.path.isfile(filepath) and
+            mappedUri not in self.modelManager.dtsCache.entries):
+            from arelle.ModelDocument import parse
+            try:
+                with open(filepath, "rb") as file:
+                    xmlDocument = parse(self.modelManager, file)
+            except Exception:
+                xmlDocument = None # load parses it again and reports the error in discovery order
+            if xmlDocument is not None:
+                self.schedule(xmlDocument, filepath)
+        return (filepath, xmlDocument)
+
+    def close(self):
+        with self.lock:
+            self.isClosed = True
+            futures = list(self.futures.values())
+            self.futures = {}
+        self.executor.shutdown(wait=True)
+        for future in futures: # prefetched documents not needed by discovery
+            try:
+                xmlDocument = future.result()[1]
+                if xmlDocument is not None:
+                    xmlDocument.unlink()
+            except Exception:
+                pass
+
+def elementBase(element, filepath):
+    # as ModelDocument.baseForElement
+    base = ""
+    baseElt = element
+    while baseElt.nodeType == 1:
+        if baseElt.hasAttribute("xml:base"):
+            baseAttr = baseElt.getAttribute("xml:base")
+            if baseAttr.startswith("/"):
+                base = baseAttr
+            else:
+                base = baseAttr + base
+        baseElt = baseElt.parentNode
+    if base:
+        if base.startswith('http://') or os.path.isabs(base):
+            return base
+        return os.path.dirname(filepath) + "/" + base
+    return filepath
@@ -0,0 +1,141 @@
+'''
+Created on Oct 18, 2026
+
+Process-wide cache of parsed taxonomy documents, so that standard taxonomies
+(such as US-GAAP and DEI) are parsed once per process instead of once per filing.
+
+Cached entries are the parsed xml documents of schemas and linkbases, keyed by
+mapped url and validated against the file's mtime.  Model objects hold back
+references to the modelXbrl that discovered them (objectIndex, modelDocument.modelXbrl,
+ownerDocument.modelDocument), so each modelXbrl still discovers its own model objects
+from the cached document; only the xml parsing is shared.
+
+A cached document is lent to one modelDocument at a time, when the modelDocument
+is closed the document is returned to the cache instead of being unlinked.  If
+a second concurrently loaded modelXbrl needs the same document while it is lent out,
+that modelXbrl parses its own copy.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+from collections import OrderedDict
+import os
+
+# rough ratio of minidom memory use to size of the source xml file
+domBytesPerFileByte = 12
+lxmlBytesPerFileByte = 4
+
+class DtsCacheEntry:
+    def __init__(self, url, mtime, size, xmlDocument, useLxml):
+        self.url = url
+        self.mtime = mtime
+        self.useLxml = useLxml
+        self.size = size
+        self.xmlDocument = xmlDocument
+        self.inUse = True
+        self.hits = 0
+
+class DtsCache:
+
+    def __init__(self, modelManager):
+        self.modelManager = modelManager
+        self.maxSize = 0    # estimated bytes of parsed documents, 0 disables caching
+        self.entries = OrderedDict()  # least recently used first
+        self.docEntries = {} # xmlDocument id to entry, for documents lent to modelDocuments
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def isEnabled(self):
+        return self.maxSize > 0
+
+    def isCacheable(self, modelXbrl, mappedUri, filepath):
+        # filing's own (extension) documents and archive contents are always parsed fresh
+        uriDir = getattr(modelXbrl, "uriDir", None)
+        return (self.isEnabled and
+                filepath is not None and
+                not (uriDir and mappedUri.startswith(uriDir)) and
+                not modelXbrl.fileSource.isInArchive(mappedUri) and
+                os.path.isfile(filepath))
+
+    def checkout(self, modelXbrl, mappedUri, filepath):
+        if not self.isCacheable(modelXbrl, mappedUri, filepath):
+            return None
+        entry = self.entries.get(mappedUri)
+        if entry is not None:
+            if (entry.mtime != os.path.getmtime(filepath) or
+                entry.useLxml != self.modelManager.useLxml):
+                self.discard(entry) # file has changed or was parsed by the other parser
+            elif not entry.inUse:
+                entry.inUse = True
+                entry.hits += 1
+                self.hits += 1
+                self.entries.move_to_end(mappedUri)
+                self.docEntries[id(entry.xmlDocument)] = entry
+                return entry.xmlDocument
+        self.misses += 1
+        return None
+
+    def add(self, modelXbrl, mappedUri, filepath, xmlDocument):
+        if not self.isCacheable(modelXbrl, mappedUri, filepath) or mappedUri in self.entries:
+            return False
+        entry = DtsCacheEntry(mappedUri,
+                              os.path.getmtime(filepath),
+                              os.path.getsize(filepath) *
+                                (lxmlBytesPerFileByte if self.modelManager.useLxml else domBytesPerFileByte),
+                              xmlDocument,
+                              self.modelManager.useLxml)
+        self.entries[mappedUri] = entry
+        self.docEntries[id(xmlDocument)] = entry
+        self.size += entry.size
+        self.evict()
+        return True
+
+    def release(self, xmlDocument):
+        # returns True if cache owns the xmlDocument (which then must not be unlinked)
+        entry = self.docEntries.pop(id(xmlDocument), None)
+        if entry is None:
+            return False
+        entry.inUse = False
+        if entry.url not in self.entries: # discarded while lent out
+            entry.xmlDocument.unlink()
+            entry.xmlDocument = None
+        else:
+            self.evict()
+        return True
+
+    def invalidate(self, url):
+        entry = self.entries.get(url)
+        if entry is not None:
+            self.discard(entry)
+
+    def discard(self, entry):
+        del self.entries[entry.url]
+        self.size -= entry.size
+        if not entry.inUse:
+            entry.xmlDocument.unlink()
+            entry.xmlDocument = None
+
+    def evict(self):
+        if self.size > self.maxSize:
+            for entry in [entry for entry in self.entries.values() if not entry.inUse]:
+                self.discard(entry)
+                if self.size <= self.maxSize:
+                    break
+
+    def clear(self):
+        for entry in list(self.entries.values()):
+            self.discard(entry)
+        self.hits = self.misses = 0
+
+    @property
+    def propertyView(self):
+        return (("entries", len(self.entries)),
+                ("size", self.size),
+                ("maxSize", self.maxSize),
+                ("hits", self.hits),
+                ("misses", self.misses))
+
+    def __repr__(self):
+        return ("dtsCache{0}".format(self.propertyView))
@@ -0,0 +1,122 @@
+'''
+Created on Oct 18, 2026
+
+Columnar fact table of a ModelXbrl
+
+Each fact discovered in an instance (or inline, or formula output instance) is
+appended as a row of parallel arrays: interned concept qname, contextRef, unitRef,
+decimals, precision and xml:lang ids, a nil flag and the numeric value (float of the
+value of a numeric item, the transformed and scaled value of an inline fact, NaN if
+nil, not numeric or invalid).  ModelFact properties read their row instead of the
+fact element's attributes, so validation and views scan facts without touching the
+DOM.  The text of a fact is read from its element, except for a streamed fact
+(ModelStreamFact), whose element is discarded, and whose text is kept by its row.
+
+Rows are written when a fact is discovered, from its complete element (an instance
+is parsed before discovery, and formula output facts are built before discovery),
+facts are not edited after discovery (tests/fact-table compares the fact table
+with the fact elements of inline and formula output facts).
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+from array import array
+from arelle import (XbrlConst, XmlUtil)
+
+NaN = float("NaN")
+
+class FactTable:
+    def __init__(self, modelXbrl):
+        self.modelXbrl = modelXbrl
+        self.qnames = [] # interned concept qnames by id
+        self.qnameIds = {}
+        self.strings = [None] # interned attribute values by id, id 0 is an absent attribute
+        self.stringIds = {None: 0}
+        self.conceptIds = array("i")
+        self.contextIds = array("i")
+        self.unitIds = array("i")
+        self.decimalsIds = array("i")
+        self.precisionIds = array("i")
+        self.langIds = array("i")
+        self.nils = bytearray()
+        self.numericValues = array("d")
+        self.texts = {} # text by row, for facts whose element is not kept
+        self.ids = {} # id attribute by row, for facts that have one
+
+    def __len__(self):
+        return len(self.conceptIds)
+
+    def internQname(self, qname):
+        try:
+            return self.qnameIds[qname]
+        except KeyError:
+            self.qnameIds[qname] = id = len(self.qnames)
+            self.qnames.append(qname)
+            return id
+
+    def internString(self, value):
+        try:
+            return self.stringIds[value]
+        except KeyError:
+            self.stringIds[value] = id = len(self.strings)
+            self.strings.append(value)
+            return id
+
+    def attrId(self, element, name):
+        return self.internString(element.getAttribute(name)) if element.hasAttribute(name) else 0
+
+    def append(self, fact, element):
+        # sets row of fact (of element), whose properties then read the row
+        fact.row = row = len(self.conceptIds)
+        self.conceptIds.append(self.internQname(fact.elementConceptQname()))
+        self.contextIds.append(self.attrId(element, "contextRef"))
+        self.unitIds.append(self.attrId(element, "unitRef"))
+        self.decimalsIds.append(self.attrId(element, "decimals"))
+        self.precisionIds.append(self.attrId(element, "precision"))
+        self.langIds.append(self.attrId(element, "xml:lang"))
+        isNil = element.getAttributeNS(XbrlConst.xsi,"nil") == "true"
+        self.nils.append(isNil)
+        if not fact.keepsElement:
+            self.texts[row] = XmlUtil.text(element)
+        if element.hasAttribute("id"):
+            self.ids[row] = element.getAttribute("id")
+        self.numericValues.append(self.factNumericValue(fact))
+
+    def factNumericValue(self, fact):
+        concept = fact.concept
+        if concept is not None and concept.isNumeric and not fact.isNil:
+            try:
+                return float(fact.value)
+            except ValueError:
+                pass
+        return NaN
+
+    def qname(self, row):
+        return self.qnames[self.conceptIds[row]]
+
+    def contextID(self, row):
+        return self.strings[self.contextIds[row]]
+
+    def unitID(self, row):
+        return self.strings[self.unitIds[row]]
+
+    def decimals(self, row):
+        return self.strings[self.decimalsIds[row]]
+
+    def precision(self, row):
+        return self.strings[self.precisionIds[row]]
+
+    def xmlLang(self, row):
+        return self.strings[self.langIds[row]] or ""
+
+    def isNil(self, row):
+        return self.nils[row] == 1
+
+    def numericValue(self, row):
+        return self.numericValues[row]
+
+    def text(self, row):
+        return self.texts[row]
+
+    def id(self, row):
+        return self.ids.get(row)
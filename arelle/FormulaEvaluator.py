@@ -12,12 +12,19 @@ from arelle.ModelFormulaObject import (aspectModels, Aspect, aspectModelAspect,
                                  ModelFactVariable, ModelGeneralVariable, ModelVariable,
                                  ModelParameter, ModelFilter, ModelAspectCover)
 from arelle.ModelValue import (QName)
-import datetime
+from collections import defaultdict
+import datetime, heapq, time
 
 def evaluate(xpCtx, varSet):
     # for each dependent variable, find bindings
     xpCtx.varBindings = {}
-    xpCtx.evaluations = []
+    xpCtx.evaluations = Evaluations()
+    xpCtx.factsAspectIndexes = {}   # implicit filtering indexes of variables' facts, see aspectMatchFilter
+    xpCtx.evaluationMemo = {}   # results that depend only on outer bindings, see evaluationMemoDepths
+    xpCtx.bindingSerials = [0] * len(varSet.orderedVariableRelationships)
+    xpCtx.bindingSerial = 0
+    if xpCtx.profile is not None:
+        startedAt = time.time()
     try:
         xpCtx.variableSet = varSet
         if isinstance(varSet, ModelExistenceAssertion):
@@ -55,6 +62,10 @@ def evaluate(xpCtx, varSet):
         xpCtx.modelXbrl.error( _("Variable set {0} \nException: {1}").format( varSet, err.message),
             "err", err.code)
         xpCtx.variableSet = None
+    if xpCtx.profile is not None:
+        xpCtx.profile.record("variableSet", varSet, varSet.localName, time.time() - startedAt, 
+                             cacheHits=xpCtx.evaluations.unnecessaryCount, 
+                             cacheLookups=xpCtx.evaluations.unnecessaryCount + len(xpCtx.evaluations))
     
 def evaluateVar(xpCtx, varSet, varIndex):
     if varIndex == len(varSet.orderedVariableRelationships):
@@ -72,15 +83,23 @@ def evaluateVar(xpCtx, varSet, varIndex):
         # record completed evaluation, for fallback blocking purposes
         fbVars = set(vb.qname for vb in xpCtx.varBindings.values() if vb.isFallback)
         thisEvaluation = tuple(vb.matchableBoundFact(fbVars) for vb in xpCtx.varBindings.values())
-        if evaluationIsUnnecessary(thisEvaluation, xpCtx.evaluations):
+        if xpCtx.evaluations.isUnnecessary(thisEvaluation):
+            xpCtx.evaluations.unnecessaryCount += 1
             if xpCtx.formulaOptions.traceVariableSetExpressionResult:
                 xpCtx.modelXbrl.error( _("Variable set {0} non-different or fallback evaluation skipped, duplicates another evaluation").format( varSet ),
                     "info", "formula:trace")
             return
         xpCtx.evaluations.append(thisEvaluation)
         # evaluate preconditions
-        for precondition in varSet.preconditions:
-            result = precondition.evalTest(xpCtx)
+        for i, precondition in enumerate(varSet.preconditions):
+            memoToken = evaluationMemoToken(xpCtx, evaluationMemoDepths(varSet)[1][i])
+            memo = xpCtx.evaluationMemo.get(-1 - i)
+            if memo is not None and memo[0] == memoToken:
+                result = memo[1]
+            else:
+                result = precondition.evalTest(xpCtx)
+                if memoToken is not None:
+                    xpCtx.evaluationMemo[-1 - i] = (memoToken, result)
             if xpCtx.formulaOptions.traceVariableSetExpressionResult:
                 xpCtx.modelXbrl.error( _("Variable set {0} \nPrecondition {1} \nResult: {2}").format( varSet, precondition.xlinkLabel, result),
                     "info", "formula:trace")
@@ -114,48 +133,87 @@ def evaluateVar(xpCtx, varSet, varIndex):
         # produce variable bindings
         varRel = varSet.orderedVariableRelationships[varIndex]
         vb = VariableBinding(varRel)
+        memoToken = evaluationMemoToken(xpCtx, evaluationMemoDepths(varSet)[0][varIndex])
+        memo = xpCtx.evaluationMemo.get(varIndex)
+        if memo is not None and memo[0] != memoToken:
+            memo = None
+        if xpCtx.profile is not None and memoToken is not None:
+            xpCtx.profile.record("memo", varSet, "$" + str(vb.qname), 0.0, cacheHits=memo is not None, cacheLookups=1)
         if vb.isFactVar:
             vb.aspectsDefined = aspectModels[varSet.aspectModel]
             vb.values = None
-            if vb.var.fromInstanceQnames:
-                facts = [f for qn in vb.var.fromInstanceQnames 
-                         for instSeq in (xpCtx.inScopeVars[qn],)
-                         for inst in (instSeq if isinstance(instSeq,(list,tuple)) else (instSeq,)) 
-                         for f in inst.factsInInstance] 
+            if memo is not None: # filtered as for the prior binding of the variables the filters depend on
+                facts, aspectsCovered, values = memo[1:]
+                vb.aspectsCovered = set(aspectsCovered)
+                for fact in facts:
+                    if fact.isItem:
+                        vb.aspectsDefined |= fact.context.dimAspects
             else:
-                facts = xpCtx.modelXbrl.factsInInstance
-            if vb.var.nils == "false":
-                facts = [fact for fact in facts if not fact.isNil]
-            if xpCtx.formulaOptions.traceVariableFilterWinnowing:
-                xpCtx.modelXbrl.error( _("Fact Variable ${0} filtering: start with {1} facts").format( vb.qname, len(facts)),
-                        "info", "formula:trace")
-            facts = filterFacts(xpCtx, vb, facts, varSet.groupFilterRelationships, "group")
-            facts = filterFacts(xpCtx, vb, facts, vb.var.filterRelationships, None)
-            for fact in facts:
-                if fact.isItem:
-                    vb.aspectsDefined |= fact.context.dimAspects
-            coverAspectCoverFilterDims(xpCtx, vb, facts, vb.var.filterRelationships)
+                if vb.var.fromInstanceQnames:
+                    facts = [f for qn in vb.var.fromInstanceQnames 
+                             for instSeq in (xpCtx.inScopeVars[qn],)
+                             for inst in (instSeq if isinstance(instSeq,(list,tuple)) else (instSeq,)) 
+                             for f in inst.factsInInstance] 
+                else:
+                    facts = xpCtx.modelXbrl.factsInInstance
+                    if not xpCtx.formulaOptions.traceVariableFilterWinnowing:
+                        if xpCtx.profile is not None:
+                            startedAt = time.time()
+                            numFacts = len(facts)
+                        facts = indexedCandidateFacts(xpCtx, facts, varSet.groupFilterRelationships, vb.var.filterRelationships)
+                        if xpCtx.profile is not None:
+                            xpCtx.profile.record("index", varSet, "$" + str(vb.qname), time.time() - startedAt,
+                                                 numFacts, len(facts), cacheHits=len(facts) < numFacts, cacheLookups=1)
+                if vb.var.nils == "false":
+                    facts = [fact for fact in facts if not fact.isNil]
+                if xpCtx.formulaOptions.traceVariableFilterWinnowing:
+                    xpCtx.modelXbrl.error( _("Fact Variable ${0} filtering: start with {1} facts").format( vb.qname, len(facts)),
+                            "info", "formula:trace")
+                facts = filterFacts(xpCtx, vb, facts, varSet.groupFilterRelationships, "group")
+                facts = filterFacts(xpCtx, vb, facts, vb.var.filterRelationships, None)
+                for fact in facts:
+                    if fact.isItem:
+                        vb.aspectsDefined |= fact.context.dimAspects
+                coverAspectCoverFilterDims(xpCtx, vb, facts, vb.var.filterRelationships)
+                values = xpCtx.evaluate(vb.var.fallbackValueProg) if vb.var.fallbackValueProg else None
+                if memoToken is not None:
+                    xpCtx.evaluationMemo[varIndex] = (memoToken, facts, set(vb.aspectsCovered), values)
             if varSet.implicitFiltering == "true" and len(xpCtx.varBindings) > 0:
-                facts = aspectMatchFilter(xpCtx, facts, (vb.aspectsDefined - vb.aspectsCovered), xpCtx.varBindings.values(), "implicit")
+                if xpCtx.profile is not None:
+                    startedAt = time.time()
+                    numFacts = len(facts)
+                    priorIndex = xpCtx.factsAspectIndexes.get(vb.qname)
+                facts = aspectMatchFilter(xpCtx, facts, (vb.aspectsDefined - vb.aspectsCovered), xpCtx.varBindings.values(), "implicit",
+                                          indexKey=vb.qname)
+                if xpCtx.profile is not None: # cache is of the variable's implicit filtering index
+                    xpCtx.profile.record("filter", varSet, "$" + str(vb.qname) + " implicit", time.time() - startedAt,
+                                         numFacts, len(facts), 
+                                         cacheHits=priorIndex is not None and priorIndex is xpCtx.factsAspectIndexes.get(vb.qname), 
+                                         cacheLookups=1)
             vb.facts = facts
             if xpCtx.formulaOptions.traceVariableFiltersResult:
                 xpCtx.modelXbrl.error( _("Fact Variable ${0}: filters result {1}").format( vb.qname, vb.facts),
                         "info", "formula:trace")
             if vb.var.fallbackValueProg:
-                vb.values = xpCtx.evaluate(vb.var.fallbackValueProg)
+                vb.values = values
                 if xpCtx.formulaOptions.traceVariableExpressionResult:
                     xpCtx.modelXbrl.error( _("Fact Variable ${0}: fallbackValue result {1}").format( vb.qname, vb.values),
                             "info", "formula:trace")
         elif vb.isGeneralVar: # general variable
-            if vb.var.fromInstanceQnames:
-                contextItem = [inst.modelDocument.xmlRootElement 
-                               for qn in vb.var.fromInstanceQnames 
-                               for instSeq in (xpCtx.inScopeVars[qn],)
-                               for inst in (instSeq if isinstance(instSeq,(list,tuple)) else (instSeq,)) 
-                               ] 
+            if memo is not None: # selected as for the prior binding of the variables the select depends on
+                vb.values = memo[1]
             else:
-                contextItem = xpCtx.modelXbrl.modelDocument.xmlRootElement  # default is standard input instance
-            vb.values = xpCtx.flattenSequence( xpCtx.evaluate(vb.var.selectProg, contextItem=contextItem) )
+                if vb.var.fromInstanceQnames:
+                    contextItem = [inst.modelDocument.xmlRootElement 
+                                   for qn in vb.var.fromInstanceQnames 
+                                   for instSeq in (xpCtx.inScopeVars[qn],)
+                                   for inst in (instSeq if isinstance(instSeq,(list,tuple)) else (instSeq,)) 
+                                   ] 
+                else:
+                    contextItem = xpCtx.modelXbrl.modelDocument.xmlRootElement  # default is standard input instance
+                vb.values = xpCtx.flattenSequence( xpCtx.evaluate(vb.var.selectProg, contextItem=contextItem) )
+                if memoToken is not None:
+                    xpCtx.evaluationMemo[varIndex] = (memoToken, vb.values)
             if xpCtx.formulaOptions.traceVariableExpressionResult:
                 xpCtx.modelXbrl.error( _("General Variable ${0}: select result {1}").format( vb.qname, vb.values),
                         "info", "formula:trace")
@@ -168,6 +226,8 @@ def evaluateVar(xpCtx, varSet, varIndex):
             if vb.qname in xpCtx.inScopeVars: # save overridden value if there was one
                 overriddenInScopeVar = xpCtx.inScopeVars[vb.qname]
             xpCtx.inScopeVars[vb.qname] = evaluationResult
+            xpCtx.bindingSerial += 1
+            xpCtx.bindingSerials[varIndex] = xpCtx.bindingSerial
             if xpCtx.formulaOptions.traceVariableFiltersResult:
                 xpCtx.modelXbrl.error( _("{0} ${1}: bound value {2}").format( vb.resourceElementName, vb.qname, evaluationResult),
                         "info", "formula:trace")
@@ -177,6 +237,62 @@ def evaluateVar(xpCtx, varSet, varIndex):
                 xpCtx.inScopeVars[vb.qname] = overriddenInScopeVar
         xpCtx.varBindings.pop(vb.qname)
         
+def evaluationMemoDepths(varSet):
+    # for each variable, and for each precondition, the position of the innermost variable which its 
+    # filters or expressions reference (-1 for none), its results are memoized for the binding of that 
+    # variable (see evaluationMemoToken), or None, for no memo, where that's the immediately enclosing variable
+    try:
+        return varSet.evaluationMemoDepths
+    except AttributeError:
+        pass
+    varRels = varSet.orderedVariableRelationships
+    positions = dict((varRel.variableQname, i) for i, varRel in enumerate(varRels))
+    def depth(varRefs, position):
+        innermost = max([positions.get(varRef, -1) for varRef in varRefs] or [-1])
+        return innermost if innermost < position - 1 else None
+    groupFilterRefs = set()
+    for varFilterRel in varSet.groupFilterRelationships:
+        if isinstance(varFilterRel.toModelObject, ModelFilter):
+            groupFilterRefs |= varFilterRel.toModelObject.variableRefs()
+    varDepths = []
+    for i, varRel in enumerate(varRels):
+        var = varRel.toModelObject
+        if isinstance(var, ModelFactVariable):
+            varDepths.append(depth(var.variableRefs() | groupFilterRefs, i))
+        elif isinstance(var, ModelGeneralVariable):
+            varDepths.append(depth(var.variableRefs(), i))
+        else:
+            varDepths.append(None)
+    preconditionDepths = [depth(precondition.variableRefs(), len(varRels)) 
+                          for precondition in varSet.preconditions]
+    varSet.evaluationMemoDepths = (varDepths, preconditionDepths)
+    return varSet.evaluationMemoDepths
+
+def evaluationMemoToken(xpCtx, depth):
+    # identifies the current bindings of variables at positions up to depth, as each binding has a new serial
+    if depth is None or xpCtx.formulaOptions.traceVariableFilterWinnowing:
+        return None
+    return xpCtx.bindingSerials[depth] if depth >= 0 else 0
+        
+def indexedCandidateFacts(xpCtx, facts, groupFilterRelationships, filterRelationships):
+    # narrow facts to the intersection of aspect index candidates of the leading filters resolvable
+    # from the index, all filters are then applied to the narrowed facts, as they would be to all facts
+    candidates = None
+    factAspectIndex = None
+    for varFilterRel in groupFilterRelationships + filterRelationships:
+        filter = varFilterRel.toModelObject
+        if isinstance(filter,ModelFilter):
+            if factAspectIndex is None:
+                factAspectIndex = xpCtx.modelXbrl.factAspectIndex()
+            filterCandidates = filter.candidateFacts(xpCtx, factAspectIndex)
+            if filterCandidates is None:
+                break   # so this and later filters see the same facts as without narrowing
+            if not varFilterRel.isComplemented:
+                candidates = filterCandidates if candidates is None else candidates & filterCandidates
+    if candidates is None:
+        return facts
+    return sorted(candidates, key=factAspectIndex["position"].__getitem__)
+
 def filterFacts(xpCtx, vb, facts, filterRelationships, filterType):
     typeLbl = filterType + " " if filterType else ""
     orFilter = filterType == "or"
@@ -185,7 +301,13 @@ def filterFacts(xpCtx, vb, facts, filterRelationships, filterType):
     for varFilterRel in filterRelationships:
         filter = varFilterRel.toModelObject
         if isinstance(filter,ModelFilter):  # relationship not constrained to real filters
+            if xpCtx.profile is not None:
+                startedAt = time.time()
             result = filter.filter(xpCtx, vb, facts, varFilterRel.isComplemented)
+            if xpCtx.profile is not None:
+                xpCtx.profile.record("filter", xpCtx.variableSet, "${0} {1}{2} {3}".format( 
+                                     vb.qname, typeLbl, filter.element.localName, filter.xlinkLabel), 
+                                     time.time() - startedAt, len(facts), len(result))
             if xpCtx.formulaOptions.traceVariableFilterWinnowing:
                 xpCtx.modelXbrl.error( _("Fact Variable ${0} {1} {2} filter {3} passes {4} facts").format( 
                       vb.qname, typeLbl, filter.element.localName, filter.xlinkLabel, len(result)),
@@ -208,7 +330,24 @@ def coverAspectCoverFilterDims(xpCtx, vb, facts, filterRelationships):
             if varFilterRel.isCovered:
                 vb.aspectsCovered |= filter.dimAspectsCovered(vb)
             
-def aspectMatchFilter(xpCtx, facts, aspects, varBindings, filterType):
+def aspectMatchFilter(xpCtx, facts, aspects, varBindings, filterType, indexKey=None):
+    if not xpCtx.formulaOptions.traceVariableFilterWinnowing:
+        aspectBoundFacts = [(aspect, vb.yieldedFact)
+                            for aspect in aspects
+                            for vb in (varBindings if hasattr(varBindings, '__iter__') else (varBindings,))
+                            if not vb.isFallback and vb.hasAspectValueUncovered(aspect)]
+        if not aspectBoundFacts or not facts:
+            return facts
+        # index of facts is reused while a variable's filtered facts are the same for its evaluations
+        factsIndex = xpCtx.factsAspectIndexes.get(indexKey) if indexKey else None
+        if factsIndex is None or factsIndex.facts != facts:
+            factsIndex = FactsAspectIndex(facts)
+            if indexKey:
+                xpCtx.factsAspectIndexes[indexKey] = factsIndex
+        try:
+            return factsIndex.matchingFacts(aspectBoundFacts)
+        except (AttributeError, TypeError, ValueError):
+            pass # aspect values which aren't keyable are matched by the original pairwise comparisons
     for aspect in aspects:
         for vb in (varBindings if hasattr(varBindings, '__iter__') else (varBindings,)):
             if not vb.isFallback and vb.hasAspectValueUncovered(aspect):
@@ -308,6 +447,104 @@ def aspectMatches(fact1, fact2, aspects):
             break
     return matches
 
+ANY_KEY = ("any",) # aspect match key of facts which may match facts of any key
+
+def aspectMatchKey(fact, aspect):
+    # hashable key of aspect value of fact, when aspectMatches(fact1, fact2, aspect) the facts
+    # have equal keys, or fact2 has ANY_KEY (equal keys are confirmed by aspectMatches)
+    if aspect == Aspect.CONCEPT:
+        return fact.concept.qname
+    elif fact.isTuple:
+        return ANY_KEY
+    context = fact.context
+    if aspect == Aspect.PERIOD:
+        if context.isForeverPeriod:
+            return ("forever",)
+        elif context.isStartEndPeriod:
+            return ("duration", context.startDatetime, context.endDatetime)
+        elif context.isInstantPeriod:
+            return ("instant", context.instantDatetime)
+        return ANY_KEY
+    elif aspect == Aspect.ENTITY_IDENTIFIER:
+        return context.entityIdentifier
+    elif aspect in (Aspect.COMPLETE_SEGMENT, Aspect.COMPLETE_SCENARIO):
+        elt = context.segment if aspect == Aspect.COMPLETE_SEGMENT else context.scenario
+        if elt is None:
+            return None
+        return XbrlUtil.sEqualKey(fact.modelXbrl, elt, XbrlUtil.XPATH_EQ, excludeIDs=True)
+    elif aspect in (Aspect.NON_XDT_SEGMENT, Aspect.NON_XDT_SCENARIO):
+        return tuple(XbrlUtil.sEqualKey(fact.modelXbrl, elt, XbrlUtil.XPATH_EQ, excludeIDs=True)
+                     for elt in context.nonDimValues(aspect))
+    elif aspect == Aspect.UNIT:
+        unit = fact.unit
+        if unit is None:
+            return None
+        multiplyBy, divideBy = unit.measures
+        return (tuple(multiplyBy), tuple(divideBy))
+    elif isinstance(aspect, QName):
+        from arelle.ModelObject import ModelDimensionValue
+        dimValue = context.dimValue(aspect)
+        if isinstance(dimValue, ModelDimensionValue):
+            if dimValue.isExplicit:
+                return ("explicit", dimValue.memberQname)
+            typedMember = dimValue.typedMember
+            return ("typed", XbrlUtil.sEqualKey(fact.modelXbrl, typedMember, XbrlUtil.XPATH_EQ, excludeIDs=True)
+                             if typedMember is not None else None)
+        elif isinstance(dimValue, QName):
+            return ("explicit", dimValue)
+        return ANY_KEY # absent dimension is matched by any value
+    
+def aspectMatchKeyed(aspect):
+    # location and all dimensions aren't keyed, they are only matched by aspectMatches
+    return aspect not in (Aspect.LOCATION, Aspect.DIMENSIONS) and (
+           isinstance(aspect, QName) or 
+           aspect in (Aspect.CONCEPT, Aspect.PERIOD, Aspect.ENTITY_IDENTIFIER, Aspect.UNIT,
+                      Aspect.COMPLETE_SEGMENT, Aspect.COMPLETE_SCENARIO,
+                      Aspect.NON_XDT_SEGMENT, Aspect.NON_XDT_SCENARIO))
+
+class FactsAspectIndex:
+    # facts by aspectMatchKey of each aspect, built on first use of an aspect
+    def __init__(self, facts):
+        self.facts = facts
+        self.positions = dict((fact, i) for i, fact in enumerate(facts))
+        self.aspectIndexes = {}
+        
+    def aspectIndex(self, aspect):
+        try:
+            return self.aspectIndexes[aspect]
+        except KeyError:
+            keyFacts = defaultdict(set)
+            anyKeyFacts = set()
+            for fact in self.facts:
+                key = aspectMatchKey(fact, aspect)
+                if key is ANY_KEY:
+                    anyKeyFacts.add(fact)
+                else:
+                    keyFacts[key].add(fact)
+            self.aspectIndexes[aspect] = (keyFacts, anyKeyFacts)
+            return keyFacts, anyKeyFacts
+        
+    def matchingFacts(self, aspectBoundFacts):
+        # facts, in order, which aspectMatches each (aspect, bound fact)
+        if len(self.positions) != len(self.facts):
+            raise ValueError("duplicated facts")
+        candidates = None
+        for aspect, boundFact in aspectBoundFacts:
+            if not aspectMatchKeyed(aspect) or (boundFact.isTuple and aspect != Aspect.CONCEPT):
+                continue # tuple matches any fact's aspect values other than concept
+            keyFacts, anyKeyFacts = self.aspectIndex(aspect)
+            key = aspectMatchKey(boundFact, aspect)
+            aspectCandidates = anyKeyFacts
+            if key is not ANY_KEY and key in keyFacts:
+                aspectCandidates = aspectCandidates | keyFacts[key]
+            candidates = aspectCandidates if candidates is None else candidates & aspectCandidates
+            if not candidates:
+                return []
+        return [fact
+                for fact in (self.facts if candidates is None else 
+                             sorted(candidates, key=self.positions.__getitem__))
+                if all(aspectMatches(boundFact, fact, aspect) for aspect, boundFact in aspectBoundFacts)]
+
 def evaluationIsUnnecessary(thisEval, otherEvals):
     # detects evaluations which are not different (duplicate) and extra fallback evaluations
     r = range(len(thisEval))
@@ -316,6 +553,62 @@ def evaluationIsUnnecessary(thisEval, otherEvals):
             return True
     return False
 
+def evaluationValueKey(value):
+    # hashable key of an evaluation's variable value, values which are == have equal keys
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(evaluationValueKey(v) for v in value))
+    hash(value)   # TypeError if not hashable
+    if value != value:
+        raise TypeError("NaN") # not equal to itself, can't be matched by hash lookup
+    return value
+
+class Evaluations(list):
+    # completed evaluations of a variable set, with sets of hash keys of the evaluations'
+    # values at each pattern of positions that isUnnecessary has compared (positions which
+    # aren't None in the evaluation tested), so finding a subsuming evaluation is a set lookup
+    def __init__(self):
+        super().__init__()
+        self.evaluationsValueKeys = []
+        self.patternKeys = {}
+        self.isHashable = True
+        self.unnecessaryCount = 0   # evaluations skipped
+        
+    def append(self, evaluation):
+        super().append(evaluation)
+        if self.isHashable:
+            try:
+                valueKeys = tuple(evaluationValueKey(value) for value in evaluation)
+            except TypeError:
+                self.notHashable()
+                return
+            self.evaluationsValueKeys.append(valueKeys)
+            for pattern, keys in self.patternKeys.items():
+                keys.add(tuple(valueKeys[i] for i in pattern))
+                
+    def notHashable(self):
+        # values which can't be hashed, use linear comparison for this variable set
+        self.isHashable = False
+        self.evaluationsValueKeys = None
+        self.patternKeys = None
+            
+    def isUnnecessary(self, thisEval):
+        # same result as evaluationIsUnnecessary(thisEval, self)
+        if self.isHashable:
+            pattern = tuple(i for i, value in enumerate(thisEval) if value is not None)
+            try:
+                key = tuple(evaluationValueKey(thisEval[i]) for i in pattern)
+            except TypeError:
+                self.notHashable()
+            else:
+                try:
+                    keys = self.patternKeys[pattern]
+                except KeyError:
+                    keys = self.patternKeys[pattern] = set(
+                                tuple(valueKeys[i] for i in pattern)
+                                for valueKeys in self.evaluationsValueKeys)
+                return key in keys
+        return evaluationIsUnnecessary(thisEval, self)
+        
 def produceOutputFact(xpCtx, formula, result):
     priorErrorCount = len(xpCtx.modelXbrl.errors)
     
@@ -704,6 +997,10 @@ class VariableBinding:
         elif self.isParameter: return _("Parameter")
         
     def factsPartitions(self, aspects):
+        try:
+            return self.hashedFactsPartitions(aspects)
+        except (AttributeError, TypeError, ValueError):
+            pass # aspect values which aren't keyable are partitioned by pairwise comparisons
         factsPartitions = []
         for fact in self.facts:
             matched = False
@@ -716,9 +1013,38 @@ class VariableBinding:
                 factsPartitions.append([fact,])
         return factsPartitions
  
+    def hashedFactsPartitions(self, aspects):
+        # same partitions as factsPartitions, comparing each fact only to partitions whose first
+        # fact has the same aspect match keys, or has ANY_KEY or is a tuple (which may match)
+        keyedAspects = [aspect for aspect in aspects if aspectMatchKeyed(aspect)]
+        factsPartitions = []
+        keyPartitions = defaultdict(list)
+        anyKeyPartitions = []
+        for fact in self.facts:
+            key = tuple(aspectMatchKey(fact, aspect) for aspect in keyedAspects)
+            if fact.isTuple:
+                candidates = range(len(factsPartitions))
+            else:
+                candidates = heapq.merge(keyPartitions.get(key, ()), anyKeyPartitions)
+            for i in candidates:
+                if aspectMatches(fact, factsPartitions[i][0], aspects):
+                    factsPartitions[i].append(fact)
+                    break
+            else:
+                if fact.isTuple or ANY_KEY in key:
+                    anyKeyPartitions.append(len(factsPartitions))
+                else:
+                    keyPartitions[key].append(len(factsPartitions))
+                factsPartitions.append([fact,])
+        return factsPartitions
+ 
     def matchesSubPartitions(self, partition, aspects):
         if self.var.matches == "true":
             return [partition]
+        try:
+            return self.hashedMatchesSubPartitions(partition, aspects)
+        except (AttributeError, TypeError, ValueError):
+            pass # aspect values which aren't keyable are partitioned by pairwise comparisons
         subPartitions = []
         for fact in partition:
             foundSubPartition = False
@@ -736,6 +1062,30 @@ class VariableBinding:
                 subPartitions.append([fact,])
         return subPartitions
  
+    def hashedMatchesSubPartitions(self, partition, aspects):
+        # same sub partitions as matchesSubPartitions, only comparing each fact to sub partitions
+        # having a fact of the same aspect match keys, or of ANY_KEY or a tuple (which may match)
+        keyedAspects = [aspect for aspect in aspects if aspectMatchKeyed(aspect)]
+        subPartitions = []
+        keySubPartitions = defaultdict(set)
+        anyKeySubPartitions = set()
+        for fact in partition:
+            key = tuple(aspectMatchKey(fact, aspect) for aspect in keyedAspects)
+            for i, subPartition in enumerate(subPartitions):
+                if (fact.isTuple or i in anyKeySubPartitions or i in keySubPartitions.get(key, ())) and \
+                   any(aspectMatches(fact, fact2, aspects) for fact2 in subPartition):
+                    continue # a matching fact is already in this sub partition
+                break
+            else:
+                i = len(subPartitions)
+                subPartitions.append([])
+            subPartitions[i].append(fact)
+            if fact.isTuple or ANY_KEY in key:
+                anyKeySubPartitions.add(i)
+            else:
+                keySubPartitions[key].add(i)
+        return subPartitions
+ 
     @property
     def evaluationResults(self):
         if self.isFactVar:
@@ -0,0 +1,86 @@
+'''
+Created on Oct 18, 2026
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import csv, json, os, time
+
+columns = ("kind", "variableSet", "name", "count", "secs", "factsIn", "factsOut", "cacheHits", "cacheLookups")
+
+def objectLabel(modelObject):
+    if modelObject is None:
+        return ""
+    return modelObject.id or getattr(modelObject, "xlinkLabel", None) or modelObject.localName
+
+class FormulaProfile:
+    # accumulates formula evaluation costs of a validation, by (kind, variable set, name):
+    #   variableSet: evaluations of the variable set, cache is of evaluations found unnecessary
+    #   index: fact aspect index narrowing of a fact variable's facts before its filters
+    #   filter: facts winnowed by each filter of a fact variable, in filtering order
+    #   expression: evaluations of each xpath program, cache is of its compiled program
+    # times are wall clock and inclusive, e.g. an assertion's time includes its filters and expressions
+    def __init__(self):
+        self.entries = {}
+
+    def entry(self, kind, varSet, name):
+        key = (kind, objectLabel(varSet), name)
+        try:
+            return self.entries[key]
+        except KeyError:
+            entry = self.entries[key] = [0, 0.0, 0, 0, 0, 0]
+            return entry
+
+    def record(self, kind, varSet, name, secs, factsIn=0, factsOut=0, cacheHits=0, cacheLookups=0):
+        entry = self.entry(kind, varSet, name)
+        entry[0] += 1
+        entry[1] += secs
+        entry[2] += factsIn
+        entry[3] += factsOut
+        entry[4] += cacheHits
+        entry[5] += cacheLookups
+
+    def merge(self, other):
+        # add entries of a profile accumulated elsewhere, such as by a forked evaluation process
+        for key, otherEntry in other.entries.items():
+            entry = self.entries.setdefault(key, [0, 0.0, 0, 0, 0, 0])
+            for i, value in enumerate(otherEntry):
+                entry[i] += value
+
+    def evaluate(self, xpCtx, exprStack, contextItem, resultStack, parentOp):
+        # XPathContext.evaluate of a parsed program, timed
+        from arelle.XPathContext import compileProg
+        progHeader = exprStack[0]
+        startedAt = time.time()
+        isCompiled = progHeader.compiledProg is not None
+        if not isCompiled:
+            progHeader.compiledProg = compileProg(exprStack)
+        try:
+            return progHeader.compiledProg(xpCtx, contextItem, resultStack, parentOp)
+        finally:
+            self.record("expression", xpCtx.variableSet,
+                        "{0} {1}: {2}".format(objectLabel(progHeader.modelObject), progHeader.name, progHeader.sourceStr),
+                        time.time() - startedAt, cacheHits=isCompiled, cacheLookups=1)
+
+    def rows(self):
+        # most costly first
+        return [key + tuple(entry)
+                for key, entry in sorted(self.entries.items(), key=lambda item: (-item[1][1], item[0]))]
+
+    def save(self, filename, modelXbrl):
+        from arelle import XPathParser
+        rows = self.rows()
+        rows.append(("parseCache", "", "xpath expressions parsed", 0, 0.0, 0, 0,
+                     XPathParser.parseCacheHits, XPathParser.parseCacheLookups))
+        try:
+            if os.path.splitext(filename)[1] == ".json":
+                with open(filename, "w") as f:
+                    json.dump([dict(zip(columns, row)) for row in rows], f, indent=1)
+            else:
+                with open(filename, "w", newline='') as f:
+                    csvWriter = csv.writer(f, dialect="excel")
+                    csvWriter.writerow(columns)
+                    csvWriter.writerows(rows)
+        except EnvironmentError as err:
+            modelXbrl.error(_("Formula profile {0} not saved: {1}").format(filename, err),
+                            "err", "arelle:formulaProfile")
@@ -5,7 +5,12 @@ Created on Oct 3, 2010
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
 import xml.dom.minidom, xml.parsers.expat, os
-from arelle import (XbrlConst, XmlUtil, UrlUtil, ModelObject, ValidateFilingText, XmlValidate)
+from arelle import (XbrlConst, XmlUtil, UrlUtil, ModelObject, ValidateFilingText, XmlValidate, StreamingInstance)
+try:
+    from arelle import XmlLxml
+except ImportError: # lxml not installed, documents are parsed by minidom
+    class XmlLxml:
+        class XMLSyntaxError(Exception): pass
 from arelle.ModelValue import (qname)
 
 def load(modelXbrl, uri, base=None, isEntry=False, isIncluded=None, namespace=None, reloadCache=False):
@@ -24,18 +29,16 @@ def load(modelXbrl, uri, base=None, isEntry=False, isIncluded=None, namespace=No
                 "err", "EFM.6.22.02", "GFM.1.1.3", "SBR.NL.2.1.0.06")
         if blocked:
             return None
-    if normalizedUri in modelXbrl.modelManager.disclosureSystem.mappedFiles:
-        mappedUri = modelXbrl.modelManager.disclosureSystem.mappedFiles[normalizedUri]
-    else:  # handle mapped paths
-        mappedUri = normalizedUri
-        for mapFrom, mapTo in modelXbrl.modelManager.disclosureSystem.mappedPaths:
-            if normalizedUri.startswith(mapFrom):
-                mappedUri = mapTo + normalizedUri[len(mapFrom):]
-                break
+    mappedUri = mapUri(modelXbrl, normalizedUri)
+    discoveryScheduler = getattr(modelXbrl, "discoveryScheduler", None)
+    prefetchedXmlDocument = None
     if modelXbrl.fileSource.isInArchive(mappedUri):
         filepath = mappedUri
     else:
-        filepath = modelXbrl.modelManager.cntlr.webCache.getfilename(mappedUri, reload=reloadCache)
+        if discoveryScheduler is not None and discoveryScheduler.isScheduled(mappedUri):
+            filepath, prefetchedXmlDocument = discoveryScheduler.take(mappedUri)
+        else:
+            filepath = modelXbrl.modelManager.cntlr.webCache.getfilename(mappedUri, reload=reloadCache)
         if filepath:
             uri = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(filepath)
     if filepath is None: # error such as HTTPerror is already logged
@@ -50,16 +53,35 @@ def load(modelXbrl, uri, base=None, isEntry=False, isIncluded=None, namespace=No
     if modelDocument:
         return modelDocument
     
+    if isEntry and StreamingInstance.isStreamable(modelXbrl, mappedUri, filepath):
+        modelDocument = StreamingInstance.load(modelXbrl, mappedUri, filepath)
+        if modelDocument is not None:
+            return modelDocument
+    
     # load XML and determine type of model document
-    modelXbrl.modelManager.showStatus(_("parsing {0}").format(uri))
+    dtsCache = modelXbrl.modelManager.dtsCache
+    if reloadCache:
+        dtsCache.invalidate(mappedUri)
+    xmlDocument = dtsCache.checkout(modelXbrl, mappedUri, filepath)
+    if xmlDocument is not None and prefetchedXmlDocument is not None:
+        prefetchedXmlDocument.unlink() # cached copy was returned to the cache while prefetching
+        prefetchedXmlDocument = None
     file = None
     try:
-        if modelXbrl.modelManager.validateDisclosureSystem:
-            file = ValidateFilingText.checkfile(modelXbrl,filepath)
-        else:
-            file = modelXbrl.fileSource.file(filepath)
-        xmlDocument = xml.dom.minidom.parse(file)
-        file.close()
+        if xmlDocument is None: # not a previously parsed taxonomy document
+            if prefetchedXmlDocument is not None:
+                xmlDocument = prefetchedXmlDocument
+            else:
+                modelXbrl.modelManager.showStatus(_("parsing {0}").format(uri))
+                if modelXbrl.modelManager.validateDisclosureSystem:
+                    file = ValidateFilingText.checkfile(modelXbrl,filepath)
+                else:
+                    file = modelXbrl.fileSource.file(filepath)
+                xmlDocument = parse(modelXbrl.modelManager, file)
+                file.close()
+            if xmlDocument.documentElement is not None and \
+               (xmlDocument.documentElement.namespaceURI, xmlDocument.documentElement.localName) in cacheableRootElements:
+                dtsCache.add(modelXbrl, mappedUri, filepath, xmlDocument)
     except EnvironmentError as err:
         modelXbrl.error(
                 "{0}: file error: {1}".format(
@@ -70,6 +92,7 @@ def load(modelXbrl, uri, base=None, isEntry=False, isIncluded=None, namespace=No
             file.close()
         return None
     except (xml.parsers.expat.ExpatError,
+            XmlLxml.XMLSyntaxError,
             xml.dom.DOMException,
             ValueError) as err:  # ValueError raised on bad format of qnames, xmlns'es, or parameters
         modelXbrl.error(
@@ -81,6 +104,9 @@ def load(modelXbrl, uri, base=None, isEntry=False, isIncluded=None, namespace=No
             file.close()
         return None
     
+    if discoveryScheduler is not None and prefetchedXmlDocument is None:
+        discoveryScheduler.schedule(xmlDocument, filepath)
+    
     # identify document
     #modelXbrl.modelManager.addToLog("discovery: {0}".format(
     #            os.path.basename(uri)))
@@ -171,6 +197,20 @@ def load(modelXbrl, uri, base=None, isEntry=False, isIncluded=None, namespace=No
             break
     return modelDocument
 
+def mapUri(modelXbrl, normalizedUri):
+    if normalizedUri in modelXbrl.modelManager.disclosureSystem.mappedFiles:
+        return modelXbrl.modelManager.disclosureSystem.mappedFiles[normalizedUri]
+    # handle mapped paths
+    for mapFrom, mapTo in modelXbrl.modelManager.disclosureSystem.mappedPaths:
+        if normalizedUri.startswith(mapFrom):
+            return mapTo + normalizedUri[len(mapFrom):]
+    return normalizedUri
+
+def parse(modelManager, file):
+    if modelManager.useLxml:
+        return XmlLxml.parse(file)
+    return xml.dom.minidom.parse(file)
+
 def create(modelXbrl, type, uri, schemaRefs=None, isEntry=False):
     normalizedUri = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(uri, None)
     if isEntry:
@@ -246,6 +286,7 @@ class Type:
 
 # constants for parsing
 xsdModelObjects = {"element", "attribute", "simpleType", "complexType", "enumeration"}
+cacheableRootElements = {(XbrlConst.xsd, "schema"), (XbrlConst.link, "linkbase")}
 
 class ModelDocument:
     
@@ -267,6 +308,7 @@ class ModelDocument:
         self.schemaLocationElements = set()
         self.referencedNamespaces = set()
         self.inDTS = False
+        self.isStreamed = False # instance facts discovered while parsing, see StreamingInstance
 
     def objectId(self,refId=""):
         return "_{0}_{1}".format(refId, self.objectIndex)
@@ -294,6 +336,7 @@ class ModelDocument:
         return ("{0}[{1}]{2})".format(self.__class__.__name__, self.objectId(),self.propertyView))
 
     def close(self, visited):
+        modelXbrl = self.modelXbrl
         visited.append(self)
         for referencedDocument in self.referencesDocument.keys():
             if visited.count(referencedDocument) == 0:
@@ -314,7 +357,8 @@ class ModelDocument:
         self.referencedNamespaces = set()
         if self.xmlDocument:
             del self.xmlDocument.modelDocument
-            self.xmlDocument.unlink()
+            if modelXbrl is None or not modelXbrl.modelManager.dtsCache.release(self.xmlDocument):
+                self.xmlDocument.unlink()
             self.xmlDocument = None
         visited.remove(self)
         
@@ -528,6 +572,11 @@ class ModelDocument:
                             elif xlinkType == "arc":
                                 arcQn = qname(linkElement)
                                 arcrole = linkElement.getAttributeNS(XbrlConst.xlink, "arcrole")
+                                modelLink.arcs.append((linkElement, 
+                                                       arcrole if linkElement.hasAttributeNS(XbrlConst.xlink, "arcrole") else None,
+                                                       arcQn,
+                                                       linkElement.getAttributeNS(XbrlConst.xlink, "from"),
+                                                       linkElement.getAttributeNS(XbrlConst.xlink, "to")))
                                 if arcrole not in arcrolesFound:
                                     if linkrole == "":
                                         linkrole = XbrlConst.defaultLinkRole
@@ -618,10 +667,12 @@ class ModelDocument:
                             modelContext.qnameDims[modelDimValue.dimensionQname] = modelDimValue # both seg and scen
                         else:
                             containerNonDimValues.append(sElt)
+        self.modelXbrl.indexContext(modelContext)
                             
     def unitDiscover(self, unitElement):
         id = unitElement.getAttribute("id")
-        self.modelXbrl.units[id] = ModelObject.createUnit(self,unitElement)
+        self.modelXbrl.units[id] = modelUnit = ModelObject.createUnit(self,unitElement)
+        self.modelXbrl.indexUnit(modelUnit)
                 
     def inlineXbrlDiscover(self, htmlElement):
         self.schemaLinkbaseRefsDiscover(htmlElement)
@@ -667,10 +718,12 @@ class ModelDocument:
             tuple.unorderedTupleFacts.append((modelFact.order, modelFact.objectIndex))
         else:
             self.modelXbrl.facts.append(modelFact)
+        self.modelXbrl.factIndexes.clear()
                 
     def factDiscover(self, factElement, modelFacts):
         modelFact = ModelObject.createFact(self, factElement)
         modelFacts.append( modelFact )
+        self.modelXbrl.factIndexes.clear()
         self.modelXbrl.factsInInstance.append( modelFact )
         id = modelFact.id
         if id is not None:
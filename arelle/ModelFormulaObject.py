@@ -166,6 +166,8 @@ class ModelFormulaResource(ModelResource):
         if varRefSet is None: varRefSet = set()
         if progs:
             XPathParser.variableReferences(progs, varRefSet, self.element)
+        # every program parsed by compile, including those not passed as progs by the subclass
+        XPathParser.variableReferences(self.compiledProgs, varRefSet, self.element)
         for arcrole in self.descendantArcroles:
             for modelRel in self.modelXbrl.relationshipSet(arcrole).fromModelObject(self):
                 toModelObject = modelRel.toModelObject
@@ -173,6 +175,18 @@ class ModelFormulaResource(ModelResource):
                     modelRel.toModelObject.variableRefs(varRefSet=varRefSet)
         return varRefSet
     
+    @property
+    def compiledProgs(self):
+        # parsed programs are the resource's ...Prog attributes, and ...Progs lists (or dicts of lists)
+        progs = []
+        for name, value in self.__dict__.items():
+            if name.endswith("Prog"):
+                progs.append(value)
+            elif name.endswith("Progs"):
+                for prog in (value.values() if isinstance(value, dict) else value):
+                    progs.append(getattr(prog, "qnameExprProg", prog)) # explicit dimension MemberModel
+        return progs
+    
 class ModelAssertionSet(ModelFormulaResource):
     def __init__(self, modelDocument, element):
         super().__init__(modelDocument, element)
@@ -708,6 +722,11 @@ class ModelFilter(ModelFormulaResource):
     def filter(self, xpCtx, varBinding, facts, cmplmt):
         return facts
     
+    def candidateFacts(self, xpCtx, factAspectIndex):
+        # set of facts containing all facts which pass (uncomplemented) filter, from the
+        # modelXbrl.factAspectIndex, or None if the filter can't be resolved by the index
+        return None
+    
     @property
     def propertyView(self):
         return (("label", self.xlinkLabel),)
@@ -919,6 +938,12 @@ class ModelConceptName(ModelFilter):
         return [fact for fact in facts 
                 if cmplmt ^ (fact.qname in self.conceptQnames | self.evalQnames(xpCtx,fact))] 
     
+    def candidateFacts(self, xpCtx, factAspectIndex):
+        if self.qnameExpressionProgs:
+            return None
+        return set().union(*[factAspectIndex.get(("concept", conceptQname), ())
+                             for conceptQname in self.conceptQnames])
+    
     @property
     def propertyView(self):
         return (("label", self.xlinkLabel),
@@ -1598,6 +1623,9 @@ class ModelForever(ModelFilter):
         return [fact for fact in facts 
                 if cmplmt ^ (not fact.isItem or fact.context.isForeverPeriod)] 
 
+    def candidateFacts(self, xpCtx, factAspectIndex):
+        return factAspectIndex.get(("forever",), set()) | factAspectIndex.get(("nonItem",), set())
+
     def aspectsCovered(self, varBinding):
         return {Aspect.PERIOD}
         
@@ -1797,6 +1825,20 @@ class ModelExplicitDimension(ModelFilter):
                 outFacts.append(fact)
         return outFacts 
     
+    def candidateFacts(self, xpCtx, factAspectIndex):
+        # only for static dimension and member qnames matched without a relationship network
+        dimQname = self.dimQname
+        dimConcept = xpCtx.modelXbrl.qnameConcepts.get(dimQname)
+        if not dimConcept or not dimConcept.isExplicitDimension or len(self.memberProgs) == 0:
+            return None
+        candidates = set(factAspectIndex.get(("nonItem",), ()))
+        for memberModel in self.memberProgs:
+            if (not memberModel.qname or memberModel.qname not in xpCtx.modelXbrl.qnameConcepts or
+                (memberModel.axis and memberModel.linkrole and memberModel.arcrole)):
+                return None
+            candidates |= factAspectIndex.get(("dimension", dimQname, memberModel.qname), set())
+        return candidates
+    
     @property
     def viewExpression(self):
         return XmlUtil.innerTextList(self.element)
@@ -2168,6 +2210,12 @@ class ModelSingleMeasure(ModelFilter):
                              fact.unit.isSingleMeasure and
                              (fact.unit.measures[0][0] == self.evalQname(xpCtx,fact)))] 
     
+    def candidateFacts(self, xpCtx, factAspectIndex):
+        measureQname = self.measureQname
+        if not measureQname:
+            return None
+        return factAspectIndex.get(("measure", measureQname), set())
+    
     @property
     def propertyView(self):
         return (("label", self.xlinkLabel),
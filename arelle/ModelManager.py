@@ -5,7 +5,7 @@ Created on Oct 3, 2010
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
 import gc, sys, traceback
-from arelle import (ModelXbrl, Validate, DisclosureSystem)
+from arelle import (ModelXbrl, Validate, DisclosureSystem, DtsCache)
 
 def initialize(cntlr):
     modelManager = ModelManager(cntlr)
@@ -19,6 +19,13 @@ class ModelManager:
         self.cntlr = cntlr
         self.validateDisclosureSystem = False
         self.disclosureSystem = DisclosureSystem.DisclosureSystem(self)
+        self.dtsCache = DtsCache.DtsCache(self)
+        self.useLxml = False    # parse documents with lxml instead of minidom
+        self.discoveryWorkers = 0   # threads fetching and parsing DTS documents ahead of discovery, 0 for none
+        self.streamInstances = False    # stream facts of entry instances instead of building their DOM
+        self.xpathParseCache = False    # save and reuse parsed formula xpath expressions in the web cache
+        self.formulaProfileFile = None    # file to save formula evaluation costs into, csv or json
+        self.formulaWorkers = 0    # processes evaluating assertions, 0 for none
         self.validateCalcLB = False
         self.validateInferDecimals = False
         self.validateUtr = False
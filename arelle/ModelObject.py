@@ -49,6 +49,9 @@ def createRelationship(modelDocument, arcElement, fromModelObject, toModelObject
 def createFact(modelDocument, element):
     return ModelFact(modelDocument, element)
 
+def createStreamFact(modelDocument, element):
+    return ModelStreamFact(modelDocument, element)
+
 def createInlineFact(modelDocument, element):
     return ModelInlineFact(modelDocument, element)
 
@@ -846,10 +849,26 @@ class ModelLink(ModelObject):
     def __init__(self, modelDocument, element):
         super().__init__(modelDocument, element)
         self.labeledResources = defaultdict(list)
+        self.arcs = [] # (arcElement, arcrole, arcQname, fromLabel, toLabel) of arc children, see linkbaseDiscover
+        self._modelRelationships = None
         
     @property
     def role(self):
         return self.element.getAttributeNS(XbrlConst.xlink, "role")
+    
+    @property
+    def modelRelationships(self):
+        # relationships of arcs with arcroles, created once and shared by all relationship sets of the link
+        if self._modelRelationships is None:
+            self._modelRelationships = []
+            for arcElement, arcrole, arcQname, fromLabel, toLabel in self.arcs:
+                if arcrole is not None:
+                    for fromResource in self.labeledResources[fromLabel]:
+                        for toResource in self.labeledResources[toLabel]:
+                            self._modelRelationships.append(
+                                createRelationship(self.modelDocument, arcElement, 
+                                                   fromResource.dereference(), toResource.dereference()))
+        return self._modelRelationships
         
     def modelResourceOfResourceElement(self,resourceElement):
         label = resourceElement.getAttributeNS(XbrlConst.xlink, "label")
@@ -915,6 +934,30 @@ class ModelRelationship(ModelObject):
         super().__init__(modelDocument, arcElement)
         self.fromModelObject = fromModelObject
         self.toModelObject = toModelObject
+        # relationships are shared by relationship sets, resolve arc attributes once
+        self.arcrole = arcElement.getAttributeNS(XbrlConst.xlink, "arcrole")
+        if not arcElement.hasAttribute("order"):
+            self.order = 1.0
+        else:
+            try:
+                self.order = float(arcElement.getAttribute("order"))
+            except (ValueError) :
+                self.order = float("nan")
+        self.priority = 0
+        if arcElement.hasAttribute("priority"):
+            try:
+                self.priority = int(arcElement.getAttribute("priority"))
+            except (ValueError) :
+                pass # XBRL validation error needed
+        if not arcElement.hasAttribute("weight"):
+            self.weight = None
+        else:
+            try:
+                self.weight = float(arcElement.getAttribute("weight"))
+            except (ValueError) :
+                # XBRL validation error needed
+                self.weight = float("nan")
+        self.use = arcElement.getAttribute("use") if arcElement.hasAttribute("use") else None
         
     @property
     def fromLabel(self):
@@ -923,43 +966,6 @@ class ModelRelationship(ModelObject):
     @property
     def toLabel(self):
         return self.element.getAttributeNS(XbrlConst.xlink, "to")
-        
-    @property
-    def arcrole(self):
-        return self.element.getAttributeNS(XbrlConst.xlink, "arcrole")
-
-    @property
-    def order(self):
-        if not self.element.hasAttribute("order"):
-            return 1.0
-        try:
-            return float(self.element.getAttribute("order"))
-        except (ValueError) :
-            return float("nan")
-
-    @property
-    def priority(self):
-        if not self.element.hasAttribute("priority"):
-            return 0
-        try:
-            return int(self.element.getAttribute("priority"))
-        except (ValueError) :
-            # XBRL validation error needed
-            return 0
-
-    @property
-    def weight(self):
-        if not self.element.hasAttribute("weight"):
-            return None
-        try:
-            return float(self.element.getAttribute("weight"))
-        except (ValueError) :
-            # XBRL validation error needed
-            return float("nan")
-
-    @property
-    def use(self):
-        return self.element.getAttribute("use") if self.element.hasAttribute("use") else None
     
     @property
     def isProhibited(self):
@@ -1041,7 +1047,13 @@ class ModelRelationship(ModelObject):
         
     @property
     def equivalenceKey(self):
-
+        try:
+            return self._equivalenceKey
+        except AttributeError:
+            self._equivalenceKey = self.equivalenceKey_()
+            return self._equivalenceKey
+        
+    def equivalenceKey_(self):
         return (self.qname, 
                 self.linkQname,
                 self.linkrole,  # needed when linkrole=None merges multiple links
@@ -1098,14 +1110,29 @@ class ModelRelationship(ModelObject):
         return None
            
 class ModelFact(ModelObject):
+    keepsElement = True
+    
     def __init__(self, modelDocument, element):
         super().__init__(modelDocument, element)
         self.modelTupleFacts = []
+        # attributes are read from the fact's row of the fact table (append sets self.row)
+        modelDocument.modelXbrl.factTable.append(self, element)
         
     def __del__(self):
         super().__del__()
         self.modelTupleFacts = []
         
+    def elementConceptQname(self):
+        return ModelValue.qname(self.element)
+        
+    @property
+    def qname(self):
+        return self.modelXbrl.factTable.qname(self.row)
+    
+    @property
+    def id(self):
+        return self.modelXbrl.factTable.id(self.row)
+    
     @property
     def concept(self):
         concept = self.modelXbrl.qnameConcepts.get(self.qname)
@@ -1113,7 +1140,7 @@ class ModelFact(ModelObject):
         
     @property
     def contextID(self):
-        return self.element.getAttribute("contextRef") if self.element.hasAttribute("contextRef") else None
+        return self.modelXbrl.factTable.contextID(self.row)
 
     @property
     def context(self):
@@ -1126,7 +1153,7 @@ class ModelFact(ModelObject):
     
     @property
     def unitID(self):
-        return self.element.getAttribute("unitRef") if self.element.hasAttribute("unitRef") else None
+        return self.modelXbrl.factTable.unitID(self.row)
 
     @property
     def isItem(self):
@@ -1178,31 +1205,23 @@ class ModelFact(ModelObject):
 
     @property
     def decimals(self):
-        try:
-            return self._decimals
-        except AttributeError:
-            if self.element.hasAttribute("decimals"):
-                self._decimals = self.element.getAttribute("decimals")
-            else:   #check for fixed decimals on type
-                type = self.concept.type
-                self._decimals = type.fixedOrDefaultAttrValue("decimals") if type else None
-            return  self._decimals
+        decimals = self.modelXbrl.factTable.decimals(self.row)
+        if decimals is None:   #check for fixed decimals on type
+            type = self.concept.type
+            decimals = type.fixedOrDefaultAttrValue("decimals") if type else None
+        return decimals
 
     @property
     def precision(self):
-        try:
-            return self._precision
-        except AttributeError:
-            if self.element.hasAttribute("precision"):
-                self._precision = self.element.getAttribute("precision")
-            else:   #check for fixed decimals on type
-                type = self.concept.type
-                self._precision = type.fixedOrDefaultAttrValue("precision") if type else None
-            return  self._precision
+        precision = self.modelXbrl.factTable.precision(self.row)
+        if precision is None:   #check for fixed precision on type
+            type = self.concept.type
+            precision = type.fixedOrDefaultAttrValue("precision") if type else None
+        return precision
 
     @property
     def xmlLang(self):
-        lang = self.element.getAttribute("xml:lang")
+        lang = self.modelXbrl.factTable.xmlLang(self.row)
         if lang == "" and self.modelXbrl.modelManager.validateDisclosureSystem:
             concept = self.concept
             if concept is not None and not concept.isNumeric:
@@ -1211,11 +1230,19 @@ class ModelFact(ModelObject):
     
     @property
     def xsiNil(self):
-        return self.element.getAttributeNS(XbrlConst.xsi,"nil") if self.element.hasAttributeNS(XbrlConst.xsi,"nil") else "false"
+        return "true" if self.modelXbrl.factTable.isNil(self.row) else "false"
     
     @property
     def isNil(self):
-        return self.xsiNil == "true"
+        return self.modelXbrl.factTable.isNil(self.row)
+    
+    @property
+    def text(self):
+        return XmlUtil.text(self.element)
+    
+    @property
+    def numericValue(self): # float of value of a numeric item, NaN if nil, not numeric or invalid
+        return self.modelXbrl.factTable.numericValue(self.row)
     
     @property
     def value(self):
@@ -1256,7 +1283,7 @@ class ModelFact(ModelObject):
     @property
     def vEqValue(self): #v-equals value (numeric or string)
         if self.concept.isNumeric:
-            return float(self.value)
+            return self.numericValue
         return self.value
     
     def isVEqualTo(self, other):
@@ -1272,7 +1299,7 @@ class ModelFact(ModelObject):
             if other.concept.isNumeric:
                 if not self.unit.isEqualTo(other.unit):
                     return False
-                return float(self.value) == float(other.value)
+                return self.numericValue == other.numericValue
             else:
                 return False
         return self.value.strip() == other.value.strip()
@@ -1296,29 +1323,60 @@ class ModelFact(ModelObject):
     def __repr__(self):
         return ("fact({0}{1}{2}, '{3}')".format(
                 self.qname, 
-                ', ' + self.contextID if self.element.hasAttribute("contextRef") else '', 
-                ', ' + self.unitID if self.element.hasAttribute("unitRef") else '', 
+                ', ' + self.contextID if self.contextID is not None else '', 
+                ', ' + self.unitID if self.unitID is not None else '', 
                 self.effectiveValue.strip() if self.isItem else '(tuple)'))
     
     @property
     def viewConcept(self):
         return self.concept
 
-class ModelInlineFact(ModelFact):
+class ModelStreamFact(ModelFact):
+    # item fact of a streamed instance, its row of the fact table is kept, its element discarded
+    keepsElement = False
+    
     def __init__(self, modelDocument, element):
         super().__init__(modelDocument, element)
+        self.element = None
         
     @property
-    def qname(self):
-        return self.prefixedNameQname(self.element.getAttribute("name")) if self.element.hasAttribute("name") else None
-
+    def text(self):
+        return self.modelXbrl.factTable.text(self.row)
+    
     @property
-    def contextID(self):
-        return self.element.getAttribute("contextRef") if self.element.hasAttribute("contextRef") else None
+    def elementQname(self):
+        return self.qname
+    
+    @property
+    def localName(self):
+        return self.qname.localName
+    
+    @property
+    def parentElement(self):
+        return self.modelDocument.xmlRootElement
 
     @property
-    def unitID(self):
-        return self.element.getAttribute("unitRef") if self.element.hasAttribute("unitRef") else None
+    def parentQname(self):
+        return ModelValue.qname(self.modelDocument.xmlRootElement)
+    
+    @property
+    def ancestorQnames(self):
+        return {self.parentQname}
+    
+    @property
+    def innerText(self):
+        return self.text
+    
+    @property
+    def fractionValue(self): # fractions have numerator and denominator elements, so are not streamed
+        return ("", "")
+
+class ModelInlineFact(ModelFact):
+    def __init__(self, modelDocument, element):
+        super().__init__(modelDocument, element)
+        
+    def elementConceptQname(self):
+        return self.prefixedNameQname(self.element.getAttribute("name")) if self.element.hasAttribute("name") else None
 
     @property
     def sign(self):
@@ -1415,6 +1473,7 @@ class ModelContext(ModelObject):
         self.segNonDimValues = []
         self.scenNonDimValues = []
         self._isEqualTo = {}
+        self._aspectKey = {}
         
     def __del__(self):
         super().__del__()
@@ -1425,6 +1484,7 @@ class ModelContext(ModelObject):
         self.segNonDimValues = None
         self.scenNonDimValues = None
         self._isEqualTo = None
+        self._aspectKey = None
 
     @property
     def isStartEndPeriod(self):
@@ -1589,6 +1649,9 @@ class ModelContext(ModelObject):
             return result
         
     def isEqualTo_(self, cntx2, dimensionalAspectModel):
+        # contexts with different aspect keys are not equal (as with the indexes by aspect key)
+        if self.aspectKey(dimensionalAspectModel) != cntx2.aspectKey(dimensionalAspectModel):
+            return False
         if not self.isPeriodEqualTo(cntx2) or not self.isEntityIdentifierEqualTo(cntx2):
             return False
         if dimensionalAspectModel:
@@ -1623,6 +1686,70 @@ class ModelContext(ModelObject):
         
         return True
 
+    # hash key of period, entity identifier, dimensions and segment/scenario contents,
+    # keyed by the same typed values and equality modes as isEqualTo_ compares them, so
+    # contexts which are isEqualTo have equal keys, equal keys are confirmed by isEqualTo
+    def aspectKey(self, dimensionalAspectModel=None):
+        if dimensionalAspectModel is None: dimensionalAspectModel = self.modelXbrl.hasXDT
+        try:
+            return self._aspectKey[dimensionalAspectModel]
+        except KeyError:
+            try:
+                key = self.aspectKey_(dimensionalAspectModel)
+            except ValueError: # malformed date, context is keyed by itself
+                key = ("error", self.objectIndex)
+            self._aspectKey[dimensionalAspectModel] = key
+            return key
+        
+    def aspectKey_(self, dimensionalAspectModel):
+        if self.isForeverPeriod:
+            periodKey = ("forever",)
+        elif self.isStartEndPeriod:
+            periodKey = ("duration", self.startDatetime, self.endDatetime)
+        elif self.isInstantPeriod:
+            periodKey = ("instant", self.instantDatetime)
+        else: # not equal to any context
+            periodKey = ("none", self.objectIndex)
+        if dimensionalAspectModel:
+            dimsKey = frozenset((dimQname, 
+                                 dimValue.memberQname if dimValue.isExplicit else
+                                 XbrlUtil.sEqualKey(self.modelXbrl, dimValue.typedMember, 
+                                                    XbrlUtil.XPATH_EQ, excludeIDs=True))
+                                for dimQname, dimValue in self.qnameDims.items())
+            return (periodKey, self.entityIdentifier, dimsKey,
+                    tuple(XbrlUtil.sEqualKey(self.modelXbrl, elt) for elt in self.segNonDimValues),
+                    tuple(XbrlUtil.sEqualKey(self.modelXbrl, elt) for elt in self.scenNonDimValues))
+        segment = self.segment
+        scenario = self.scenario
+        return (periodKey, self.entityIdentifier,
+                XbrlUtil.sEqualKey(self.modelXbrl, segment) if segment else None,
+                XbrlUtil.sEqualKey(self.modelXbrl, scenario) if scenario else None)
+        
+    # hash keys of this context for ModelXbrl.matchContext, with dims keyed by explicit members
+    @property
+    def matchKeys(self):
+        try:
+            return self._matchKeys
+        except AttributeError:
+            periodKeys = []
+            try:
+                if self.isInstantPeriod:
+                    periodKeys.append(("instant", ModelValue.dateUnionKey(self.instantDatetime, instantEndDate=True)))
+                if self.isStartEndPeriod:
+                    periodKeys.append(("duration", ModelValue.dateUnionKey(self.startDatetime), 
+                                       ModelValue.dateUnionKey(self.endDatetime, instantEndDate=True)))
+            except ValueError:
+                pass
+            if self.isForeverPeriod:
+                periodKeys.append(("forever",))
+            dimsKey = frozenset((dimQname, dimValue.memberQname if dimValue.isExplicit else None)
+                                for dimQname, dimValue in self.qnameDims.items())
+            entityIdentifier = self.entityIdentifier
+            self._matchKeys = [(entityIdentifier, periodKey, dims)
+                               for periodKey in periodKeys
+                               for dims in (None, dimsKey)]
+            return self._matchKeys
+
     @property
     def propertyView(self):
         scheme, entityId = self.entityIdentifier
@@ -1746,6 +1873,10 @@ class ModelUnit(ModelObject):
         '''
         return self.measures == unit2.measures
     
+    def aspectKey(self): # hash key, equal for units which are isEqualTo
+        multiplyBy, divideBy = self.measures
+        return (tuple(multiplyBy), tuple(divideBy))
+    
     @property
     def value(self):
         mul, div = self.measures
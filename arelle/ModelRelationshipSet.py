@@ -16,23 +16,10 @@ def create(modelXbrl, arcrole, linkrole=None, linkqname=None, arcqname=None, inc
 def ineffectiveArcs(baseSetModelLinks, arcrole, arcqname=None):
     relationships = defaultdict(list)
     for modelLink in baseSetModelLinks:
-        arcs = []
-        for linkChild in modelLink.element.childNodes:
-            if linkChild.nodeType == 1 and \
-               linkChild.getAttributeNS(XbrlConst.xlink, "type") == "arc" and \
-               arcrole == linkChild.getAttributeNS(XbrlConst.xlink, "arcrole") and \
-               (arcqname is None or arcqname == linkChild):
-                arcs.append(linkChild)
-                    
-        # build network
-        for arcElement in arcs:
-            arcrole = arcElement.getAttributeNS(XbrlConst.xlink, "arcrole")
-            fromLabel = arcElement.getAttributeNS(XbrlConst.xlink, "from")
-            toLabel = arcElement.getAttributeNS(XbrlConst.xlink, "to")
-            for fromResource in modelLink.labeledResources[fromLabel]:
-                for toResource in modelLink.labeledResources[toLabel]:
-                    modelRel = ModelObject.createRelationship(modelLink.modelDocument, arcElement, fromResource.dereference(), toResource.dereference())
-                    relationships[modelRel.equivalenceKey].append(modelRel)
+        for modelRel in modelLink.modelRelationships:
+            if arcrole == modelRel.arcrole and \
+               (arcqname is None or arcqname == modelRel.qname):
+                relationships[modelRel.equivalenceKey].append(modelRel)
     # determine ineffective relationships
     ineffectives = []
     for equivalenceKey, relationship in relationships.items():
@@ -57,6 +44,36 @@ def ineffectiveArcs(baseSetModelLinks, arcrole, arcqname=None):
             priorRel = rel
     return ineffectives
 
+def baseSetRelationships(modelXbrl, baseSetKey):
+    # relationships of the base set with prohibition and override resolved, prohibiting
+    # relationships included, from the relationships of each link's arcs
+    arcrole, linkrole, linkqname, arcqname = baseSetKey
+    if arcrole == "XBRL-dimensions": # all dimensional relationship arcroles
+        isBaseSetArcrole = XbrlConst.isDimensionArcrole
+    elif arcrole == "XBRL-formulae": # all formula relationship arcroles
+        isBaseSetArcrole = XbrlConst.isFormulaArcrole
+    elif arcrole == "EU-rendering":
+        isBaseSetArcrole = XbrlConst.isEuRenderingArcrole
+    elif arcrole == "XBRL-footnotes": # all footnote relationship arcroles
+        isBaseSetArcrole = lambda arcrole: True
+    else:
+        isBaseSetArcrole = None
+    relationships = {}
+    for modelLink in modelXbrl.baseSets.get(baseSetKey, ()):
+        if isBaseSetArcrole is None and linkqname is not None and linkqname != modelLink.qname:
+            continue
+        for modelRel in modelLink.modelRelationships:
+            if isBaseSetArcrole is not None:
+                if not isBaseSetArcrole(modelRel.arcrole):
+                    continue
+            elif arcrole != modelRel.arcrole or (arcqname is not None and arcqname != modelRel.qname):
+                continue
+            modelRelEquivalenceKey = modelRel.equivalenceKey    # this is a complex tuple to compute, get once for below
+            if modelRelEquivalenceKey not in relationships or \
+               modelRel.priorityOver(relationships[modelRelEquivalenceKey]):
+                relationships[modelRelEquivalenceKey] = modelRel
+    return list(relationships.values())
+
 def baseSetArcroles(modelXbrl):
     # returns sorted list of tuples of arcrole basename and uri
     return sorted(set((XbrlConst.baseSetArcroleLabel(b[0]),b[0]) for b in modelXbrl.baseSets.keys()))
@@ -78,56 +95,9 @@ class ModelRelationshipSet:
         baseSetKey = (arcrole, linkrole, linkqname, arcqname) 
         relationshipSetKey = (arcrole, linkrole, linkqname, arcqname, includeProhibits) 
             
-        # base sets does not care about the #includeProhibits
-        if baseSetKey in self.modelXbrl.baseSets:
-            modelLinks = self.modelXbrl.baseSets[baseSetKey]
-        else:
-            modelLinks = []
-        
-        # gather arcs
-        relationships = {}
-        isDimensionRel =  self.arcrole == "XBRL-dimensions" # all dimensional relationship arcroles
-        isFormulaRel =  self.arcrole == "XBRL-formulae" # all formula relationship arcroles
-        isEuRenderingRel = self.arcrole == "EU-rendering"
-        isFootnoteRel =  self.arcrole == "XBRL-footnotes" # all footnote relationship arcroles
-        
-        for modelLink in modelLinks:
-            arcs = []
-            linkEltQname = modelLink.qname
-            for linkChild in modelLink.element.childNodes:
-                if linkChild.nodeType == 1 and \
-                   linkChild.getAttributeNS(XbrlConst.xlink, "type") == "arc" and \
-                   linkChild.hasAttributeNS(XbrlConst.xlink, "arcrole"):
-                    linkChildArcrole = linkChild.getAttributeNS(XbrlConst.xlink, "arcrole")
-                    linkChildQname = linkChild
-                    if isFootnoteRel:
-                        arcs.append(linkChild)
-                    elif isDimensionRel: 
-                        if XbrlConst.isDimensionArcrole(linkChildArcrole):
-                            arcs.append(linkChild)
-                    elif isFormulaRel:
-                        if XbrlConst.isFormulaArcrole(linkChildArcrole):
-                            arcs.append(linkChild)
-                    elif isEuRenderingRel:
-                        if XbrlConst.isEuRenderingArcrole(linkChildArcrole):
-                            arcs.append(linkChild)
-                    elif arcrole == linkChildArcrole and \
-                         (arcqname is None or arcqname == linkChildQname) and \
-                         (linkqname is None or linkqname == linkEltQname):
-                        arcs.append(linkChild)
-                        
-            # build network
-            for arcElement in arcs:
-                arcrole = arcElement.getAttributeNS(XbrlConst.xlink, "arcrole")
-                fromLabel = arcElement.getAttributeNS(XbrlConst.xlink, "from")
-                toLabel = arcElement.getAttributeNS(XbrlConst.xlink, "to")
-                for fromResource in modelLink.labeledResources[fromLabel]:
-                    for toResource in modelLink.labeledResources[toLabel]:
-                        modelRel = ModelObject.createRelationship(modelLink.modelDocument, arcElement, fromResource.dereference(), toResource.dereference())
-                        modelRelEquivalenceKey = modelRel.equivalenceKey    # this is a complex tuple to compute, get once for below
-                        if modelRelEquivalenceKey not in relationships or \
-                           modelRel.priorityOver(relationships[modelRelEquivalenceKey]):
-                            relationships[modelRelEquivalenceKey] = modelRel
+        # base set relationships, with prohibition and override resolved, do not depend on includeProhibits
+        if baseSetKey not in modelXbrl.baseSetRelationships:
+            modelXbrl.baseSetRelationships[baseSetKey] = baseSetRelationships(modelXbrl, baseSetKey)
 
         #reduce effective arcs and order relationships...
         self.modelRelationships = []
@@ -135,8 +105,10 @@ class ModelRelationshipSet:
         self.modelRelationshipsTo = None
         self.modelConceptRoots = None
         self.modellinkRoleUris = None
+        self.modelLabelIndex = None # label resources by (from object, role), see labels
+        self.labelResolutions = {} # language resolved labels, see label
         orderRels = defaultdict(list)
-        for modelRel in relationships.values():
+        for modelRel in modelXbrl.baseSetRelationships[baseSetKey]:
             if includeProhibits or not modelRel.isProhibited:
                 orderRels[modelRel.order].append(modelRel)
         for order in sorted(orderRels.keys()):
@@ -213,31 +185,51 @@ class ModelRelationshipSet:
                 visited.discard(toConcept)
         return False
     
+    def labels(self, modelFrom, role):
+        # label (or reference, footnote, message) resources of modelFrom with role, in relationship order
+        if self.modelLabelIndex is None:
+            self.modelLabelIndex = defaultdict(list)
+            for modelRel in self.modelRelationships:
+                fromModelObject = modelRel.fromModelObject
+                toModelObject = modelRel.toModelObject
+                if fromModelObject and isinstance(toModelObject, ModelObject.ModelResource):
+                    self.modelLabelIndex[fromModelObject, toModelObject.role].append(toModelObject)
+        return self.modelLabelIndex.get((modelFrom, role), ())
+    
     def label(self, modelFrom, role, lang, returnMultiple=False, returnText=True):
+        # language fallback is resolved once per (from object, role, lang), views and validations reuse it
+        resolutionKey = (modelFrom, role, lang, returnMultiple, returnText)
+        try:
+            labels = self.labelResolutions[resolutionKey]
+        except KeyError:
+            labels = self.labelResolutions[resolutionKey] = self.resolveLabel(modelFrom, role, lang, returnMultiple, returnText)
+        if returnMultiple and labels is not None:
+            return list(labels)
+        return labels
+        
+    def resolveLabel(self, modelFrom, role, lang, returnMultiple, returnText):
         shorterLangInLabel = longerLangInLabel = None
         shorterLangLabels = longerLangLabels = None
         langLabels = []
-        for modelLabelRel in self.fromModelObject(modelFrom):
-            label = modelLabelRel.toModelObject
-            if role == label.role:
-                labelLang = label.xmlLang
-                text = label.text if returnText else label
-                if lang is None or len(lang) == 0 or lang == labelLang:
-                    langLabels.append(text)
-                    if not returnMultiple:
-                        break
-                elif labelLang.startswith(lang):
-                    if not longerLangInLabel or len(longerLangInLabel) > len(labelLang):
-                        longerLangInLabel = labelLang
-                        longerLangLabels = [text,]
-                    else:
-                        longerLangLabels.append(text)
-                elif lang.startswith(labelLang):
-                    if not shorterLangInLabel or len(shorterLangInLabel) < len(labelLang):
-                        shorterLangInLabel = labelLang
-                        shorterLangLabels = [text,]
-                    else:
-                        shorterLangLabels.append(text)
+        for label in self.labels(modelFrom, role):
+            labelLang = label.xmlLang
+            text = label.text if returnText else label
+            if lang is None or len(lang) == 0 or lang == labelLang:
+                langLabels.append(text)
+                if not returnMultiple:
+                    break
+            elif labelLang.startswith(lang):
+                if not longerLangInLabel or len(longerLangInLabel) > len(labelLang):
+                    longerLangInLabel = labelLang
+                    longerLangLabels = [text,]
+                else:
+                    longerLangLabels.append(text)
+            elif lang.startswith(labelLang):
+                if not shorterLangInLabel or len(shorterLangInLabel) < len(labelLang):
+                    shorterLangInLabel = labelLang
+                    shorterLangLabels = [text,]
+                else:
+                    shorterLangLabels.append(text)
         if langLabels:
             if returnMultiple: return langLabels
             else: return langLabels[0]
@@ -4,7 +4,7 @@ Created on Jan 4, 2011
 @author: Mark V Systems Limited
 (c) Copyright 2011 Mark V Systems Limited, All rights reserved.
 '''
-import xml.dom, re, copy, datetime
+import xml.dom, re, copy, datetime, threading, weakref, itertools
 
 def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, prefixException=None):
     # either value can be an xml.dom Node: if no name then qname is element tag quanem
@@ -18,7 +18,7 @@ def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, pre
             value = name
             name = None
         else:
-            return QName(value.prefix, value.namespaceURI, value.localName)
+            return internedQname(value.prefix, value.namespaceURI, value.localName)
     elif isinstance(name, xml.dom.Node):
         element = name
         name = None
@@ -50,12 +50,12 @@ def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, pre
             prefix = None
             localName = names[0]
             if noPrefixIsNoNamespace:
-                return QName(None, None, localName)
+                return internedQname(None, None, localName)
         else:
             prefix = names[0]
             localName = names[2]
     if namespaceURI:
-        return QName(prefix, namespaceURI, localName)
+        return internedQname(prefix, namespaceURI, localName)
     elif element:
         from arelle import (XmlUtil)
         namespaceURI = XmlUtil.xmlns(element, prefix)
@@ -63,16 +63,53 @@ def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, pre
         if prefix: 
             if castException: raise castException
             return None  # error, prefix not found
-    return QName(prefix, namespaceURI, localName)
+    return internedQname(prefix, namespaceURI, localName)
+
+# process-wide QName table, each (namespaceURI, localName) has a small integer id, which QNames
+# compare and hash by, and qname() returns one QName object for each prefix, namespaceURI and localName;
+# both tables hold their entries weakly, so the names of unloaded DTSes (such as each filing's
+# extension namespace in a long running process) are released with their last QName
+class QNameId:
+    __slots__ = ("id", "__weakref__")
+    def __init__(self, id):
+        self.id = id
+
+qnameIds = weakref.WeakValueDictionary() # QNameId, held by each QName of the (namespaceURI, localName)
+qnameIdsLock = threading.Lock()
+qnameIdCounter = itertools.count() # ids are not reused, a released id may still be in a hash table
+internedQnames = weakref.WeakValueDictionary()
+internedQnamesLock = threading.Lock()
+
+def qnameId(namespaceURI, localName):
+    nameId = qnameIds.get((namespaceURI, localName))
+    if nameId is None:
+        with qnameIdsLock:
+            nameId = qnameIds.get((namespaceURI, localName))
+            if nameId is None:
+                nameId = qnameIds[namespaceURI, localName] = QNameId(next(qnameIdCounter))
+    return nameId
+
+def internedQname(prefix, namespaceURI, localName):
+    qn = internedQnames.get((prefix, namespaceURI, localName))
+    if qn is None:
+        with internedQnamesLock:
+            qn = internedQnames.get((prefix, namespaceURI, localName))
+            if qn is None:
+                qn = internedQnames[prefix, namespaceURI, localName] = QName(prefix, namespaceURI, localName)
+    return qn
 
 class QName:
     def __init__(self,prefix,namespaceURI,localName):
         self.prefix = prefix
         self.namespaceURI = namespaceURI
         self.localName = localName
-        self.hash = ((hash(namespaceURI) * 1000003) & 0xffffffff) ^ hash(localName)
+        self.nameId = qnameId(namespaceURI, localName) # keeps the id of namespaceURI and localName in the QName table
+        self.hash = self.nameId.id
     def __hash__(self):
         return self.hash
+    def __reduce__(self):
+        # ids are assigned per process, so the QName is interned again when unpickled
+        return (internedQname, (self.prefix, self.namespaceURI, self.localName))
     def nsname(self):
         if self.namespaceURI:
             return '{{{0}}}{1}'.format(self.namespaceURI, self.localName)
@@ -93,8 +130,7 @@ class QName:
         el
         '''
         if isinstance(other,QName):
-            return self.hash == other.hash and \
-                    self.namespaceURI == other.namespaceURI and self.localName == other.localName
+            return self.hash == other.hash
         elif isinstance(other,xml.dom.Node) and other.nodeType == 1:
             return self.namespaceURI == other.namespaceURI and self.localName == other.localName
         return False
@@ -206,6 +242,8 @@ class DateTime(datetime.datetime):
         return dateTime
     def __copy__(self):
         return DateTime(self.year, self.month, self.day, self.hour, self.minute, self.second, self.microsecond, self.tzinfo, self.dateOnly)
+    def __reduce__(self):
+        return (DateTime, (self.year, self.month, self.day, self.hour, self.minute, self.second, self.microsecond, self.tzinfo, self.dateOnly))
     def addYearMonthDuration(self, other, sign):
         m = self.month + sign * other.months
         y = self.year + sign * other.years + m // 12
@@ -234,17 +272,16 @@ class DateTime(datetime.datetime):
                 return DateTime(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond, dt.tzinfo, self.dateOnly)
     
 def dateUnionEqual(dateUnion1, dateUnion2, instantEndDate=False):
-    if isinstance(dateUnion1,DateTime):
-        if instantEndDate and dateUnion1.dateOnly:
-            dateUnion1 += datetime.timedelta(1)
-    elif isinstance(dateUnion1,datetime.date):
-        dateUnion1 = dateTime(dateUnion1, addOneDay=instantEndDate)
-    if isinstance(dateUnion2,DateTime):
-        if instantEndDate and dateUnion2.dateOnly:
-            dateUnion2 += datetime.timedelta(1)
-    elif isinstance(dateUnion2,datetime.date):
-        dateUnion2 = dateTime(dateUnion2, addOneDay=instantEndDate)
-    return dateUnion1 == dateUnion2
+    return dateUnionKey(dateUnion1, instantEndDate) == dateUnionKey(dateUnion2, instantEndDate)
+
+def dateUnionKey(dateUnion, instantEndDate=False):
+    # hashable value, equal for date unions which are dateUnionEqual
+    if isinstance(dateUnion,DateTime):
+        if instantEndDate and dateUnion.dateOnly:
+            dateUnion += datetime.timedelta(1)
+    elif isinstance(dateUnion,datetime.date):
+        dateUnion = dateTime(dateUnion, addOneDay=instantEndDate)
+    return dateUnion
         
 def yearMonthDuration(value):
     minus, hasYr, yrs, hasMo, mos, hasDay, days, hasTime, hasHr, hrs, hasMin, mins, hasSec, secs = durationPattern.match(value).groups()
@@ -6,30 +6,38 @@ Created on Oct 3, 2010
 '''
 from collections import defaultdict
 import sys, traceback
+from arelle import FactTable
+from arelle.ModelValue import QName
 
 def load(modelManager, url, nextaction, base=None):
-    from arelle import (ModelDocument, FileSource)
+    from arelle import (ModelDocument, FileSource, DiscoveryScheduler)
     modelXbrl = create(modelManager)
     if isinstance(url,FileSource.FileSource):
         modelXbrl.fileSource = url
         url = modelXbrl.fileSource.url
     else:
         modelXbrl.fileSource = FileSource.FileSource(url)
-    modelXbrl.modelDocument = ModelDocument.load(modelXbrl, url, base, isEntry=True)
-    # at this point DTS is fully discovered but schemaLocated xsd's are not yet loaded
-    modelDocumentsSchemaLocated = set()
-    while True: # need this logic because each new pass may add new urlDocs
-        modelDocuments = set(modelXbrl.urlDocs.values()) - modelDocumentsSchemaLocated
-        if not modelDocuments:
-            break
-        modelDocument = modelDocuments.pop()
-        modelDocumentsSchemaLocated.add(modelDocument)
-        modelDocument.loadSchemalocatedSchemas()
+    if modelManager.discoveryWorkers > 0:
+        modelXbrl.discoveryScheduler = DiscoveryScheduler.DiscoveryScheduler(modelXbrl, modelManager.discoveryWorkers)
+    try:
+        modelXbrl.modelDocument = ModelDocument.load(modelXbrl, url, base, isEntry=True)
+        # at this point DTS is fully discovered but schemaLocated xsd's are not yet loaded
+        modelDocumentsSchemaLocated = set()
+        while True: # need this logic because each new pass may add new urlDocs
+            modelDocuments = set(modelXbrl.urlDocs.values()) - modelDocumentsSchemaLocated
+            if not modelDocuments:
+                break
+            modelDocument = modelDocuments.pop()
+            modelDocumentsSchemaLocated.add(modelDocument)
+            modelDocument.loadSchemalocatedSchemas()
+    finally:
+        if modelXbrl.discoveryScheduler is not None:
+            modelXbrl.discoveryScheduler.close()
+            modelXbrl.discoveryScheduler = None
         
     #from arelle import XmlValidate
     #uncomment for trial use of lxml xml schema validation of entry document
     #XmlValidate.xmlValidate(modelXbrl.modelDocument)
-    modelManager.cntlr.webCache.saveUrlCheckTimes()
     modelManager.showStatus(_("xbrl loading finished, {0}...").format(nextaction))
     return modelXbrl
 
@@ -47,6 +55,8 @@ class ModelXbrl:
     
     def __init__(self, modelManager):
         self.modelManager = modelManager
+        self.validationResults = {} # kept across reloads, see ValidateIncremental
+        self.messageCaptures = [] # lists of messages being captured, see captureMessages
         self.init()
         
     def init(self, keepViews=False):
@@ -64,11 +74,17 @@ class ModelXbrl:
         self.qnameTypes = {} # contains ModelTypes by Py key {ns}localname of type
         self.baseSets = defaultdict(list) # contains ModelLinks for keys arcrole, arcrole#linkrole
         self.relationshipSets = {} # contains ModelRelationshipSets by bas set keys
+        self.baseSetRelationships = {} # effective and prohibiting relationships by base set key, see ModelRelationshipSet
         self.qnameDimensionDefaults = {} # contains qname of dimension (index) and default member(value)
+        self.drsClosures = {} # hypercubes of primary items, see ValidateXbrlDimensions.drsClosure
         self.facts = []
         self.factsInInstance = []
+        self.factTable = FactTable.FactTable(self)
+        self.factIndexes = {} # hash indexes of facts, cleared when facts are discovered, see factIndex
         self.contexts = {}
         self.units = {}
+        self.contextIndexes = {} # hash indexes of contexts, by kind of key, see indexContext
+        self.unitIndex = None
         self.modelObjects = []
         self.qnameParameters = {}
         self.modelVariableSets = set()
@@ -83,6 +99,7 @@ class ModelXbrl:
         self.hasEuRendering = False
         self.hasFormulae = False
         self.formulaOutputInstance = None
+        self.discoveryScheduler = None
 
     def close(self):
         self.closeViews()
@@ -104,10 +121,17 @@ class ModelXbrl:
         self.qnameTypes = {}
         self.baseSets = defaultdict(list)
         self.relationshipSets = {}
+        self.baseSetRelationships = {} # effective and prohibiting relationships by base set key, see ModelRelationshipSet
+        self.drsClosures = {}
+        self.validationResults = {}
         self.facts = []
         self.factsInInstance = []
+        self.factTable = FactTable.FactTable(self)
+        self.factIndexes = {} # hash indexes of facts, cleared when facts are discovered, see factIndex
         self.contexts = {}
         self.units = {}
+        self.contextIndexes = {} # hash indexes of contexts, by kind of key, see indexContext
+        self.unitIndex = None
         self.modelObjects = []
         self.qnameParameters = {}
         self.modelParameters = set()
@@ -126,6 +150,7 @@ class ModelXbrl:
             self.formulaOutputInstance.close()
             
     def reload(self,nextaction,reloadCache=False):
+        # validationResults are kept, so checks of unchanged documents are not rerun (see ValidateIncremental)
         from arelle import ModelDocument
         self.init(keepViews=True)
         self.modelDocument = ModelDocument.load(self, self.fileSource.url, isEntry=True, reloadCache=reloadCache)
@@ -167,13 +192,68 @@ class ModelXbrl:
         return self.matchSubstitutionGroup(elementQname, {
                   qn:(qn is not None) for qn in (subsGrpQnames if hasattr(subsGrpQnames, '__iter__') else (subsGrpQnames,)) + (None,)})
     
+    def contextsByAspectKey(self, dimensionalAspectModel=None):
+        # lists of contexts with equal aspect keys, in document order, contexts in a list
+        # are candidates for isEqualTo, contexts in different lists are not equal
+        if dimensionalAspectModel is None: dimensionalAspectModel = self.hasXDT
+        indexKey = ("aspect", dimensionalAspectModel)
+        if indexKey not in self.contextIndexes:
+            index = self.contextIndexes[indexKey] = defaultdict(list)
+            for c in self.contexts.values():
+                index[c.aspectKey(dimensionalAspectModel)].append(c)
+        return self.contextIndexes[indexKey]
+    
+    def contextsByMatchKey(self):
+        if "match" not in self.contextIndexes:
+            index = self.contextIndexes["match"] = defaultdict(list)
+            for c in self.contexts.values():
+                for matchKey in c.matchKeys:
+                    index[matchKey].append(c)
+        return self.contextIndexes["match"]
+    
+    def unitsByAspectKey(self):
+        if self.unitIndex is None:
+            self.unitIndex = defaultdict(list)
+            for u in self.units.values():
+                self.unitIndex[u.aspectKey()].append(u)
+        return self.unitIndex
+    
+    def indexContext(self, modelContext):
+        # add discovered context to indexes already built
+        for indexKey, index in self.contextIndexes.items():
+            if indexKey == "match":
+                for matchKey in modelContext.matchKeys:
+                    index[matchKey].append(modelContext)
+            else:
+                index[modelContext.aspectKey(indexKey[1])].append(modelContext)
+    
+    def indexUnit(self, modelUnit):
+        if self.unitIndex is not None:
+            self.unitIndex[modelUnit.aspectKey()].append(modelUnit)
+    
     def matchContext(self, scheme, identifier, periodType, start, end, dims, segOCCs, scenOCCs):
         from arelle.ModelFormulaObject import Aspect
-        from arelle.ModelValue import dateUnionEqual
+        from arelle.ModelValue import (dateUnionEqual, dateUnionKey)
         from arelle.XbrlUtil import sEqual
         if dims: segAspect, scenAspect = (Aspect.NON_XDT_SEGMENT, Aspect.NON_XDT_SCENARIO)
         else: segAspect, scenAspect = (Aspect.COMPLETE_SEGMENT, Aspect.COMPLETE_SCENARIO)
-        for c in self.contexts.values():
+        # candidate contexts have the entity identifier, period and explicit dimension members
+        if periodType == "instant":
+            periodKey = ("instant", dateUnionKey(end, instantEndDate=True))
+        elif periodType == "duration":
+            periodKey = ("duration", dateUnionKey(start), dateUnionKey(end, instantEndDate=True))
+        else:
+            periodKey = (periodType,)
+        if dims is None:
+            dimsKey = None
+        else:
+            from arelle.ModelObject import ModelDimensionValue
+            dimsKey = frozenset((dimQname, 
+                                 dimValue if isinstance(dimValue, QName) else
+                                 dimValue.memberQname if isinstance(dimValue, ModelDimensionValue) and dimValue.isExplicit else
+                                 None)
+                                for dimQname, dimValue in dims.items())
+        for c in self.contextsByMatchKey().get(((scheme, identifier), periodKey, dimsKey), ()):
             if (c.entityIdentifier == (scheme, identifier) and
                 ((c.isInstantPeriod and periodType == "instant" and dateUnionEqual(c.instantDatetime, end, instantEndDate=True)) or
                  (c.isStartEndPeriod and periodType == "duration" and dateUnionEqual(c.startDatetime, start) and dateUnionEqual(c.endDatetime, end, instantEndDate=True)) or
@@ -195,15 +275,104 @@ class ModelXbrl:
     def matchUnit(self, multiplyBy, divideBy):
         multiplyBy.sort()
         divideBy.sort()
-        for u in self.units.values():
+        for u in self.unitsByAspectKey().get((tuple(multiplyBy), tuple(divideBy)), ()):
             if u.measures == (multiplyBy,divideBy):
                 return u
         return None
     
+    def factIndex(self):
+        # lists of facts in document order by (qname, contextID, unitID, xmlLang, parent),
+        # where xmlLang is the fact's xmlLang ("" if none, or the disclosure system default for non-numeric
+        # facts when validating a disclosure system) and parent is the tuple fact, or None in the instance element
+        defaultXmlLang = self.modelManager.disclosureSystem.defaultXmlLang if self.modelManager.validateDisclosureSystem else None
+        if "key" not in self.factIndexes or self.factIndexes["defaultXmlLang"] != defaultXmlLang:
+            index = {}
+            langs = set()
+            factTable = self.factTable
+            qnames, conceptIds = factTable.qnames, factTable.conceptIds
+            strings, contextIds, unitIds, langIds = (factTable.strings, factTable.contextIds,
+                                                     factTable.unitIds, factTable.langIds)
+            parentFacts = [(None, self.facts)]
+            while parentFacts:
+                parent, facts = parentFacts.pop()
+                for f in facts:
+                    row = f.row
+                    lang = strings[langIds[row]] or ""
+                    if not lang and defaultXmlLang:
+                        concept = f.concept
+                        if concept is not None and not concept.isNumeric:
+                            lang = defaultXmlLang
+                    key = (qnames[conceptIds[row]], strings[contextIds[row]], strings[unitIds[row]], lang, parent)
+                    try:
+                        index[key].append(f)
+                    except KeyError:
+                        index[key] = [f]
+                        langs.add(lang)
+                    if f.modelTupleFacts:
+                        parentFacts.append((f, f.modelTupleFacts))
+            self.factIndexes["key"] = index
+            self.factIndexes["langs"] = langs
+            self.factIndexes["defaultXmlLang"] = defaultXmlLang
+        return self.factIndexes["key"]
+    
+    def factsByKey(self, qname, contextID, unitID, xmlLang=None, parent=None):
+        # facts with the key, of any xml:lang if xmlLang is None
+        index = self.factIndex()
+        if xmlLang is None:
+            return [f 
+                    for lang in self.factIndexes["langs"]
+                    for f in index.get((qname, contextID, unitID, lang, parent), ())]
+        return index.get((qname, contextID, unitID, xmlLang, parent), [])
+    
+    def factsByQname(self, qname):
+        # facts of the instance element (not in tuples) with the concept qname, in document order
+        if "qname" not in self.factIndexes:
+            index = defaultdict(list)
+            for f in self.facts:
+                index[f.qname].append(f)
+            self.factIndexes["qname"] = index
+        return self.factIndexes["qname"].get(qname, [])
+    
+    def factAspectIndex(self):
+        # sets of factsInInstance by aspect value, for formula filters to resolve candidate facts
+        # by intersection: ("concept", qname), ("forever",), ("nonItem",),
+        # ("dimension", dimQname, memberQname) including defaults, ("measure", qname) of single
+        # measure numeric facts, and "position" of each fact in factsInInstance for ordering
+        if "aspect" not in self.factIndexes:
+            index = defaultdict(set)
+            positions = {}
+            contextDimKeys = {}
+            for i, f in enumerate(self.factsInInstance):
+                positions[f] = i
+                index[("concept", f.qname)].add(f)
+                if not f.isItem:
+                    index[("nonItem",)].add(f)
+                    continue
+                context = f.context
+                if context is not None:
+                    if context.isForeverPeriod:
+                        index[("forever",)].add(f)
+                    try:
+                        dimKeys = contextDimKeys[context]
+                    except KeyError:
+                        dimKeys = contextDimKeys[context] = [
+                                    ("dimension", dimQname, memQname)
+                                    for dimQname in context.dimAspects
+                                    for memQname in (context.dimMemberQname(dimQname),)
+                                    if memQname]
+                    for dimKey in dimKeys:
+                        index[dimKey].add(f)
+                if f.isNumeric:
+                    unit = f.unit
+                    if unit is not None and unit.isSingleMeasure:
+                        index[("measure", unit.measures[0][0])].add(f)
+            index["position"] = positions
+            self.factIndexes["aspect"] = index
+        return self.factIndexes["aspect"]
+
     def matchFact(self, otherFact):
-        for fact in self.facts:
-            if (fact.qname == otherFact.qname and
-                fact.isVEqualTo(otherFact)):
+        for fact in self.factsByQname(otherFact.qname):
+            if fact.isVEqualTo(otherFact):
                 if not fact.isNumeric:
                     if fact.xmlLang == otherFact.xmlLang:
                         return fact
@@ -239,7 +408,26 @@ class ModelXbrl:
                             modelObject,
                             err, traceback.format_tb(sys.exc_info()[2])))
         
+    def captureMessages(self, logMessages=True):
+        # messages of error() are also appended, as (message, severity, codes), to the returned list,
+        # until endCaptureMessages, so they can be logged again by error() (e.g., for a reused check);
+        # if not logMessages they are only captured (e.g., to be logged by another process)
+        messages = []
+        self.messageCaptures.append((messages, logMessages))
+        return messages
+    
+    def endCaptureMessages(self, messages):
+        for i in range(len(self.messageCaptures) - 1, -1, -1):
+            if self.messageCaptures[i][0] is messages: # not ==, another capture may have equal messages
+                del self.messageCaptures[i]
+                break
+        
     def error(self, message, severity=None, *argCodes):
+        isLogged = True
+        for messages, logMessages in self.messageCaptures:
+            messages.append((message, severity, argCodes))
+            if not logMessages:
+                isLogged = False
         code = None
         hasRejectedCode = False
         for argCode in argCodes:
@@ -264,7 +452,7 @@ class ModelXbrl:
             if hasRejectedCode:
                 return # ignore if wrong disclosure system mode
             logString = message
-        if severity != 'asrtNoLog':
+        if severity != 'asrtNoLog' and isLogged:
             self.modelManager.addToLog(logString)
             
         if severity == 'err': self.logCountErr += 1
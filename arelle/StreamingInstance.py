@@ -0,0 +1,110 @@
+'''
+Created on Oct 18, 2026
+
+Streaming loader for very large XBRL instances
+
+ModelDocument.instanceDiscover builds the model from a complete DOM of the instance,
+so an instance with millions of facts needs memory for every fact element, its
+attributes and text nodes, in addition to the model objects.  When streaming, the
+entry instance is parsed by lxml iterparse instead, and each child of xbrli:xbrl is
+discovered as its end tag is parsed:
+
+  schemaRef and linkbaseRef elements discover the DTS (they precede the facts),
+  contexts and units are discovered as usual and their elements kept,
+  item facts without child elements become ModelStreamFact records holding their
+    attributes and text, and their elements are removed from the tree,
+  tuple facts (and fraction items) are discovered as usual and their elements kept,
+  roleRefs, arcroleRefs and footnote links are discovered when the instance has
+    been parsed, as their locators refer to facts by id.
+
+Instance validation (ValidateXbrl, calculations, dimensions) and the fact list views
+use fact properties and so run on streamed facts.  Formulae navigate fact elements
+and are not evaluated for a streamed instance.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import os
+from arelle import (XbrlConst, XmlUtil, ModelObject)
+try:
+    from arelle import XmlLxml
+except ImportError: # streaming requires lxml
+    XmlLxml = None
+
+instanceRootElements = {(XbrlConst.xbrli, "xbrl"), (XbrlConst.link, "xbrl")}
+
+def isStreamable(modelXbrl, mappedUri, filepath):
+    modelManager = modelXbrl.modelManager
+    # disclosure system validation checks the instance text before parsing it
+    return (modelManager.streamInstances and XmlLxml is not None and
+            not modelManager.validateDisclosureSystem and
+            not modelXbrl.fileSource.isInArchive(mappedUri) and
+            os.path.isfile(filepath))
+
+def load(modelXbrl, mappedUri, filepath):
+    # returns the streamed instance modelDocument, or None if the entry is not an instance
+    from arelle.ModelDocument import (ModelDocument, Type)
+    modelDocument = None
+    try:
+        with open(filepath, "rb") as file:
+            depth = 0
+            for event, element in XmlLxml.iterparse(file):
+                if event == "start":
+                    if depth == 0:
+                        if (element.namespaceURI, element.localName) not in instanceRootElements:
+                            return None # not an instance, load parses it as a document
+                        modelXbrl.modelManager.showStatus(_("streaming {0}").format(mappedUri))
+                        tree = element.getroottree()
+                        xmlDocument = XmlLxml.LxmlDocument(tree, tree.docinfo.encoding)
+                        modelDocument = ModelDocument(modelXbrl, Type.INSTANCE, mappedUri, filepath, xmlDocument)
+                        modelDocument.xmlRootElement = element
+                        modelDocument.schemaLocationElements.add(element)
+                        modelDocument.inDTS = True
+                        modelDocument.isStreamed = True
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 1:
+                        instanceChildDiscover(modelDocument, element)
+    except EnvironmentError as err:
+        if modelDocument is None:
+            return None # load reports the error
+        modelXbrl.error(
+                "{0}: file error: {1}".format(
+                os.path.basename(filepath), err),
+                "err", "IOerror")
+    except XmlLxml.XMLSyntaxError as err:
+        if modelDocument is None:
+            return None
+        modelXbrl.error(
+                "{0}: import error: {1}".format(
+                os.path.basename(filepath), err),
+                "err", "XMLsyntax")
+    if modelDocument is not None:
+        modelDocument.linkbaseDiscover(modelDocument.xmlRootElement, inInstance=True)
+    return modelDocument
+
+def instanceChildDiscover(modelDocument, element):
+    ln = element.localName
+    ns = element.namespaceURI
+    if ns == XbrlConst.xbrli:
+        if ln == "context":
+            modelDocument.contextDiscover(element)
+        elif ln == "unit":
+            modelDocument.unitDiscover(element)
+    elif ns == XbrlConst.link:
+        if ln == "schemaRef" or ln == "linkbaseRef":
+            modelDocument.schemaLinkbaseRefDiscover(element)
+        # roleRefs, arcroleRefs and footnoteLinks are kept for linkbaseDiscover
+    else:
+        if XmlUtil.hasChild(element, "*", "*"): # tuple or fraction
+            modelDocument.factDiscover(element, modelDocument.modelXbrl.facts)
+        else:
+            modelXbrl = modelDocument.modelXbrl
+            modelFact = ModelObject.createStreamFact(modelDocument, element)
+            modelXbrl.facts.append(modelFact)
+            modelXbrl.factsInInstance.append(modelFact)
+            modelXbrl.factIndexes.clear()
+            if modelFact.id is not None:
+                modelDocument.idObjects[modelFact.id] = modelFact
+            element.getparent().remove(element)
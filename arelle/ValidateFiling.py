@@ -8,7 +8,7 @@ import xml.dom, xml.parsers
 import os, re, collections, datetime
 from collections import defaultdict
 from arelle import (ModelObject, ModelDocument, ModelValue, ValidateXbrl,
-                ModelRelationshipSet, XmlUtil, XbrlConst, UrlUtil,
+                ModelRelationshipSet, XmlUtil, XbrlConst, UrlUtil, ValidateIncremental,
                 ValidateFilingDimensions, ValidateFilingDTS, ValidateFilingText)
 
 class ValidateFiling(ValidateXbrl.ValidateXbrl):
@@ -350,17 +350,16 @@ class ValidateFiling(ValidateXbrl.ValidateXbrl):
                 factLangStartsWith = self.disclosureSystem.defaultXmlLang
 
             #6.5.12 equivalent facts
-            factsForLang = {}
+            factIndex = modelXbrl.factIndex()
             keysNotDefaultLang = {}
-            iF1 = 1
+            equivalentFactsSeen = defaultdict(int)
             for f1 in modelXbrl.facts:
+                factKey = (f1.qname, f1.contextID, f1.unitID, f1.xmlLang, None)
                 # build keys table for 6.5.14
                 if not f1.isNil:
-                    langTestKey = "{0},{1},{2}".format(f1.qname, f1.contextID, f1.unitID)
-                    factsForLang.setdefault(langTestKey, []).append(f1)
                     lang = f1.xmlLang
                     if lang != "" and not lang.startswith(factLangStartsWith):
-                        keysNotDefaultLang[langTestKey] = f1
+                        keysNotDefaultLang[factKey[:3]] = f1
                         
                     if self.disclosureSystem.GFM and f1.isNumeric and \
                         f1.decimals and f1.decimals != "INF" and not f1.isNil:
@@ -377,24 +376,22 @@ class ValidateFiling(ValidateXbrl.ValidateXbrl):
                                 _("Fact {0} of context {1} decimals {2} value {3} causes Value Error exception.").format(
                                       f1.qname, f1.contextID, f1.decimals, f1.value), 
                                 "err", "GFM.1.02.26")
-                # 6.5.12 test
-                for f2 in modelXbrl.facts[iF1:]:
-                    if f1.qname == f2.qname and \
-                       f1.contextID == f2.contextID and \
-                       f1.unitID == f2.unitID and \
-                       f1.xmlLang == f2.xmlLang:
+                # 6.5.12 test, facts following f1 with its key and xml:lang
+                equivalentFacts = factIndex.get(factKey, ())
+                if len(equivalentFacts) > 1:
+                    equivalentFactsSeen[factKey] += 1
+                    for f2 in equivalentFacts[equivalentFactsSeen[factKey]:]:
                         modelXbrl.error(
                             _("Facts {0} of context {1} and {2} are equivalent.").format(
                                       f1.qname, f1.contextID, f2.contextID), 
                             "err", "EFM.6.05.12", "GFM.1.02.11")
-                iF1 += 1
     
             #6.5.14 facts without english text
             for itemNotDefaultLang in keysNotDefaultLang.items():
                 keyNotDefaultLang, factNotDefaultLang = itemNotDefaultLang
                 anyDefaultLangFact = False
-                for fact in factsForLang[keyNotDefaultLang]:
-                    if fact.xmlLang.startswith(factLangStartsWith):
+                for fact in modelXbrl.factsByKey(*keyNotDefaultLang):
+                    if fact.xmlLang.startswith(factLangStartsWith) and not fact.isNil:
                         anyDefaultLangFact = True
                 if not anyDefaultLangFact:
                     self.modelXbrl.error(
@@ -767,170 +764,28 @@ class ValidateFiling(ValidateXbrl.ValidateXbrl):
         
         # do calculation, then presentation, then other arcroles
         for arcroleFilter in (XbrlConst.summationItem, XbrlConst.parentChild, "*"):
-            for baseSetKey, baseSetModelLinks  in modelXbrl.baseSets.items():
-                arcrole, ELR, linkqname, arcqname = baseSetKey
-                if ELR and not arcrole.startswith("XBRL-"):
-                    # assure summationItem, then parentChild, then others
-                    if not (arcroleFilter == arcrole or
-                            arcroleFilter == "*" and arcrole not in (XbrlConst.summationItem, XbrlConst.parentChild)):
-                        continue
-                    if self.validateEFMorGFM or (self.validateSBRNL and arcrole in (XbrlConst.conceptLabel, XbrlConst.elementLabel)):
-                        ineffectiveArcs = ModelRelationshipSet.ineffectiveArcs(baseSetModelLinks, arcrole)
-                        #validate ineffective arcs
-                        for modelRel in ineffectiveArcs:
-                            if modelRel.fromModelObject and modelRel.toModelObject:
-                                self.modelXbrl.error(
-                                    _("Linkbase {0} ineffective arc {1} in link role {2} arcrole {3} from {4} to {5}").format(
-                                          modelRel.modelDocument.basename,
-                                          modelRel.qname, modelRel.linkrole, modelRel.arcrole,
-                                          modelRel.fromModelObject.qname, modelRel.toModelObject.qname), 
-                                    "err", "EFM.6.09.03", "GFM.1.04.03", "SBR.NL.2.2.1.05")
-                    if arcrole == XbrlConst.parentChild:
-                        conceptsPresented = set()
-                        # 6.12.2 check for distinct order attributes
-                        for relFrom, rels in modelXbrl.relationshipSet(
-                                 arcrole, ELR).fromModelObjects().items():
-                            targetConceptPreferredLabels = defaultdict(set)
-                            orderRels = {}
-                            firstRel = True
-                            relFromUsed = True
-                            for rel in rels:
-                                if firstRel:
-                                    firstRel = False
-                                    if relFrom in conceptsUsed:
-                                        conceptsUsed[relFrom] = True # 6.12.3, has a pres relationship
-                                        relFromUsed = True
-                                relTo = rel.toModelObject
-                                if relTo in conceptsUsed:
-                                    conceptsUsed[relTo] = True # 6.12.3, has a pres relationship
-                                    preferredLabel = rel.preferredLabel
-                                    if preferredLabel and preferredLabel != "":
-                                        conceptsUsedWithPreferredLabels[relTo].append(preferredLabel)
-                                    # 6.12.5 distinct preferred labels in base set
-                                    preferredLabels = targetConceptPreferredLabels[relTo]
-                                    if preferredLabel in preferredLabels:
-                                        self.modelXbrl.error(
-                                            _("Concept {0} has duplicate preferred label {1} in link role {2}").format(
-                                                  relTo.qname, preferredLabel, rel.linkrole), 
-                                            "err", "EFM.6.12.05", "GFM.1.06.05")
-                                    else:
-                                        preferredLabels.add(preferredLabel)
-                                    if relFromUsed:
-                                        # 6.14.5
-                                        conceptsPresented.add(relFrom.objectIndex)
-                                        conceptsPresented.add(relTo.objectIndex)
-                                order = rel.order
-                                if order in orderRels:
-                                    self.modelXbrl.error(
-                                        _("Duplicate presentation relations from concept {0} for order {1} in base set role {2} to concept {3} and to concept {4}").format(
-                                              relFrom.qname, order, rel.linkrole, 
-                                              rel.toModelObject.qname, orderRels[order].toModelObject.qname), 
-                                        "err", "EFM.6.12.02", "GFM.1.06.02", "SBR.NL.2.3.4.05")
-                                else:
-                                    orderRels[order] = rel
-                        for conceptPresented in conceptsPresented:
-                            if conceptPresented in usedCalcsPresented:
-                                usedCalcPairingsOfConcept = usedCalcsPresented[conceptPresented]
-                                if len(usedCalcPairingsOfConcept & conceptsPresented) > 0:
-                                    usedCalcPairingsOfConcept -= conceptsPresented
-                    elif arcrole == XbrlConst.summationItem:
-                        if self.validateEFMorGFM:
-                            # 6.14.3 check for relation concept periods
-                            fromRelationships = modelXbrl.relationshipSet(arcrole,ELR).fromModelObjects()
-                            for relFrom, rels in fromRelationships.items():
-                                orderRels = {}
-                                for rel in rels:
-                                    relTo = rel.toModelObject
-                                    # 6.14.03 must have matched period types across relationshp
-                                    if relFrom.periodType != relTo.periodType:
-                                        self.modelXbrl.error(
-                                            _("Calculation relationship period types mismatched in base set role {0} from {1} to {2}").format(
-                                                  rel.linkrole, relFrom.qname, relTo.qname), 
-                                            "err", "EFM.6.14.03", "GFM.1.07.03")
-                                    # 6.14.5 concepts used must have pres in same ext link
-                                    if relFrom in conceptsUsed and relTo in conceptsUsed:
-                                        fromObjId = relFrom.objectIndex
-                                        toObjId = relTo.objectIndex
-                                        if fromObjId < toObjId:
-                                            usedCalcsPresented[fromObjId].add(toObjId)
-                                        else:
-                                            usedCalcsPresented[toObjId].add(fromObjId)
-                                            
-                                    order = rel.order
-                                    if order in orderRels and self.disclosureSystem.GFM:
-                                        self.modelXbrl.error(
-                                            _("Duplicate calculations relations from concept {0} for order {1} in base set role {2} to concept {3} and to concept {4}").format(
-                                                  relFrom.qname, order, rel.linkrole, 
-                                                  rel.toModelObject.qname, orderRels[order].toModelObject.qname), 
-                                            "err", "EFM.N/A", "GFM.1.07.06")
-                                    else:
-                                        orderRels[order] = rel
-                                if self.directedCycle(relFrom,relFrom,fromRelationships):
-                                    self.modelXbrl.error(
-                                        _("Calculation relationships have a directed cycle in base set role {0} starting from {1}").format(
-                                              ELR, relFrom.qname), 
-                                        "err", "EFM.6.14.04", "GFM.1.07.04")
-                        elif self.validateSBRNL:
-                            # find a calc relationship to get the containing document name
-                            for modelRel in self.modelXbrl.relationshipSet(arcrole).modelRelationships:
-                                self.modelXbrl.error(
-                                    _("Calculation linkbase {0}").format(
-                                          modelRel.modelDocument.basename, modelRel.arcrole), 
-                                    "err", "SBR.NL.2.3.9.01")
-                                break
-                                
-                    elif arcrole == XbrlConst.all or arcrole == XbrlConst.notAll:
-                        drsELRs.add(ELR)
-                        
-                    elif arcrole == XbrlConst.dimensionDomain or arcrole == XbrlConst.dimensionDefault and \
-                         self.validateEFMorGFM:
-                        # 6.16.3 check domain targets in extension linkbases are domain items
-                        fromRelationships = modelXbrl.relationshipSet(arcrole,ELR).fromModelObjects()
-                        for relFrom, rels in fromRelationships.items():
-                            for rel in rels:
-                                relTo = rel.toModelObject
-    
-                                if not (relTo.type and relTo.type.isDomainItemType) and \
-                                   rel.modelDocument.uri not in self.disclosureSystem.standardTaxonomiesDict:
-                                    self.modelXbrl.error(
-                                        _("Definition relationship from {0} to {1} in role {2} requires domain item target").format(
-                                              relFrom.qname, relTo.qname, rel.linkrole), 
-                                        "err", "EFM.6.16.03", "GFM.1.08.03")
-
-                    elif arcrole == XbrlConst.dimensionDefault and self.validateSBRNL:
-                        for modelRel in self.modelXbrl.relationshipSet(arcrole).modelRelationships:
-                            self.modelXbrl.error(
-                                _("Dimension-default in linkbase {0} from {1} to {2} in role {3} is not allowed").format(
-                                      modelRel.modelDocument.basename,
-                                      modelRel.fromModelObject.qname, modelRel.toModelObject.qname, 
-                                      modelRel.arcrole), 
-                                "err", "SBR.NL.2.3.6.05")
-                           
-                    # definition tests (GFM only, for now)
-                    if XbrlConst.isStandardOrXdtArcrole(arcrole) and self.disclosureSystem.GFM: 
-                        fromRelationships = modelXbrl.relationshipSet(arcrole,ELR).fromModelObjects()
-                        for relFrom, rels in fromRelationships.items():
-                            orderRels = {}
-                            for rel in rels:
-                                relTo = rel.toModelObject
-                                order = rel.order
-                                if order in orderRels and self.disclosureSystem.GFM:
-                                    self.modelXbrl.error(
-                                        _("Duplicate definitions relations from concept {0} for order {1} in base set role {2} to concept {3} and to concept {4}").format(
-                                              relFrom.qname, order, rel.linkrole, 
-                                              rel.toModelObject.qname, orderRels[order].toModelObject.qname), 
-                                        "err", "GFM.1.08.10")
-                                else:
-                                    orderRels[order] = rel
-                                if (arcrole not in (XbrlConst.dimensionDomain, XbrlConst.domainMember) and
-                                    rel.element.getAttributeNS(XbrlConst.xbrldt,"usable") == "false"):
-                                    self.modelXbrl.error(
-                                        _("Disallowed xbrldt:usable='false' attribute on {0} relationship from concept {1} in base set role {2} to concept {3}").format(
-                                              os.path.basename(arcrole), relFrom.qname, rel.linkrole, rel.toModelObject.qname), 
-                                        "err", "GFM.1.08.11")
-
-    
-                                
+            if arcroleFilter == XbrlConst.parentChild:
+                # presentation checks are reused across reloads if presentation linkbases, schemas and instance
+                # are unchanged (see ValidateIncremental), and return the concepts they find presented by qname
+                presentedQnames, preferredLabels, presentedQnameSets = ValidateIncremental.run(modelXbrl, 
+                        ("presentation", self.disclosureSystem.name, self.validateEFMorGFM, self.validateSBRNL),
+                        ValidateIncremental.fingerprint(modelXbrl, (XbrlConst.parentChild,)),
+                        lambda: self.checkPresentation(conceptsUsed))
+                for qname in presentedQnames:
+                    conceptsUsed[modelXbrl.qnameConcepts[qname]] = True # 6.12.3, has a pres relationship
+                for qname, preferredLabel in preferredLabels:
+                    conceptsUsedWithPreferredLabels[modelXbrl.qnameConcepts[qname]].append(preferredLabel)
+                for qnames in presentedQnameSets:
+                    conceptsPresented = set(modelXbrl.qnameConcepts[qname].objectIndex for qname in qnames)
+                    for conceptPresented in conceptsPresented:
+                        if conceptPresented in usedCalcsPresented:
+                            usedCalcPairingsOfConcept = usedCalcsPresented[conceptPresented]
+                            if len(usedCalcPairingsOfConcept & conceptsPresented) > 0:
+                                usedCalcPairingsOfConcept -= conceptsPresented
+            else:
+                self.checkBaseSets(arcroleFilter, conceptsUsed, conceptsUsedWithPreferredLabels, 
+                                   usedCalcsPresented, [], drsELRs)
+                                        
         # checks on dimensions
         ValidateFilingDimensions.checkDimensions(self, drsELRs)
                                         
@@ -951,10 +806,8 @@ class ValidateFiling(ValidateXbrl.ValidateXbrl):
         for concept, preferredLabels in conceptsUsedWithPreferredLabels.items():
             for preferredLabel in preferredLabels:
                 hasDefaultLangPreferredLabel = False
-                for modelLabelRel in labelsRelationshipSet.fromModelObject(concept):
-                    modelLabel = modelLabelRel.toModelObject
-                    if modelLabel.xmlLang.startswith(self.disclosureSystem.defaultXmlLang) and \
-                       modelLabel.role == preferredLabel:
+                for modelLabel in labelsRelationshipSet.labels(concept, preferredLabel):
+                    if modelLabel.xmlLang.startswith(self.disclosureSystem.defaultXmlLang):
                         hasDefaultLangPreferredLabel = True
                         break
                 if not hasDefaultLangPreferredLabel:
@@ -967,6 +820,183 @@ class ValidateFiling(ValidateXbrl.ValidateXbrl):
 
         modelXbrl.modelManager.showStatus(_("ready"), 2000)
                     
+    def checkPresentation(self, conceptsUsed):
+        # presentation base set checks, returning concepts presented, their preferred labels
+        # and concepts presented in each link role, by qname, to be applied to (reloaded) concepts
+        presentedConceptsUsed = dict.fromkeys(conceptsUsed, False)
+        conceptsUsedWithPreferredLabels = defaultdict(list)
+        presentedConceptSets = []
+        self.checkBaseSets(XbrlConst.parentChild, presentedConceptsUsed, conceptsUsedWithPreferredLabels,
+                           None, presentedConceptSets, None)
+        modelXbrl = self.modelXbrl
+        return ([concept.qname for concept, isPresented in presentedConceptsUsed.items() if isPresented],
+                [(concept.qname, preferredLabel)
+                 for concept, preferredLabels in conceptsUsedWithPreferredLabels.items()
+                 for preferredLabel in preferredLabels],
+                [[modelXbrl.modelObject(objectIndex).qname for objectIndex in conceptsPresented]
+                 for conceptsPresented in presentedConceptSets])
+        
+    def checkBaseSets(self, arcroleFilter, conceptsUsed, conceptsUsedWithPreferredLabels, 
+                      usedCalcsPresented, presentedConceptSets, drsELRs):
+        modelXbrl = self.modelXbrl
+        for baseSetKey, baseSetModelLinks  in modelXbrl.baseSets.items():
+            arcrole, ELR, linkqname, arcqname = baseSetKey
+            if ELR and not arcrole.startswith("XBRL-"):
+                # assure summationItem, then parentChild, then others
+                if not (arcroleFilter == arcrole or
+                        arcroleFilter == "*" and arcrole not in (XbrlConst.summationItem, XbrlConst.parentChild)):
+                    continue
+                if self.validateEFMorGFM or (self.validateSBRNL and arcrole in (XbrlConst.conceptLabel, XbrlConst.elementLabel)):
+                    ineffectiveArcs = ModelRelationshipSet.ineffectiveArcs(baseSetModelLinks, arcrole)
+                    #validate ineffective arcs
+                    for modelRel in ineffectiveArcs:
+                        if modelRel.fromModelObject and modelRel.toModelObject:
+                            self.modelXbrl.error(
+                                _("Linkbase {0} ineffective arc {1} in link role {2} arcrole {3} from {4} to {5}").format(
+                                      modelRel.modelDocument.basename,
+                                      modelRel.qname, modelRel.linkrole, modelRel.arcrole,
+                                      modelRel.fromModelObject.qname, modelRel.toModelObject.qname), 
+                                "err", "EFM.6.09.03", "GFM.1.04.03", "SBR.NL.2.2.1.05")
+                if arcrole == XbrlConst.parentChild:
+                    conceptsPresented = set()
+                    # 6.12.2 check for distinct order attributes
+                    for relFrom, rels in modelXbrl.relationshipSet(
+                             arcrole, ELR).fromModelObjects().items():
+                        targetConceptPreferredLabels = defaultdict(set)
+                        orderRels = {}
+                        firstRel = True
+                        relFromUsed = True
+                        for rel in rels:
+                            if firstRel:
+                                firstRel = False
+                                if relFrom in conceptsUsed:
+                                    conceptsUsed[relFrom] = True # 6.12.3, has a pres relationship
+                                    relFromUsed = True
+                            relTo = rel.toModelObject
+                            if relTo in conceptsUsed:
+                                conceptsUsed[relTo] = True # 6.12.3, has a pres relationship
+                                preferredLabel = rel.preferredLabel
+                                if preferredLabel and preferredLabel != "":
+                                    conceptsUsedWithPreferredLabels[relTo].append(preferredLabel)
+                                # 6.12.5 distinct preferred labels in base set
+                                preferredLabels = targetConceptPreferredLabels[relTo]
+                                if preferredLabel in preferredLabels:
+                                    self.modelXbrl.error(
+                                        _("Concept {0} has duplicate preferred label {1} in link role {2}").format(
+                                              relTo.qname, preferredLabel, rel.linkrole), 
+                                        "err", "EFM.6.12.05", "GFM.1.06.05")
+                                else:
+                                    preferredLabels.add(preferredLabel)
+                                if relFromUsed:
+                                    # 6.14.5
+                                    conceptsPresented.add(relFrom.objectIndex)
+                                    conceptsPresented.add(relTo.objectIndex)
+                            order = rel.order
+                            if order in orderRels:
+                                self.modelXbrl.error(
+                                    _("Duplicate presentation relations from concept {0} for order {1} in base set role {2} to concept {3} and to concept {4}").format(
+                                          relFrom.qname, order, rel.linkrole, 
+                                          rel.toModelObject.qname, orderRels[order].toModelObject.qname), 
+                                    "err", "EFM.6.12.02", "GFM.1.06.02", "SBR.NL.2.3.4.05")
+                            else:
+                                orderRels[order] = rel
+                    presentedConceptSets.append(conceptsPresented) # calc pairs presented in this ELR
+                elif arcrole == XbrlConst.summationItem:
+                    if self.validateEFMorGFM:
+                        # 6.14.3 check for relation concept periods
+                        fromRelationships = modelXbrl.relationshipSet(arcrole,ELR).fromModelObjects()
+                        for relFrom, rels in fromRelationships.items():
+                            orderRels = {}
+                            for rel in rels:
+                                relTo = rel.toModelObject
+                                # 6.14.03 must have matched period types across relationshp
+                                if relFrom.periodType != relTo.periodType:
+                                    self.modelXbrl.error(
+                                        _("Calculation relationship period types mismatched in base set role {0} from {1} to {2}").format(
+                                              rel.linkrole, relFrom.qname, relTo.qname), 
+                                        "err", "EFM.6.14.03", "GFM.1.07.03")
+                                # 6.14.5 concepts used must have pres in same ext link
+                                if relFrom in conceptsUsed and relTo in conceptsUsed:
+                                    fromObjId = relFrom.objectIndex
+                                    toObjId = relTo.objectIndex
+                                    if fromObjId < toObjId:
+                                        usedCalcsPresented[fromObjId].add(toObjId)
+                                    else:
+                                        usedCalcsPresented[toObjId].add(fromObjId)
+                                        
+                                order = rel.order
+                                if order in orderRels and self.disclosureSystem.GFM:
+                                    self.modelXbrl.error(
+                                        _("Duplicate calculations relations from concept {0} for order {1} in base set role {2} to concept {3} and to concept {4}").format(
+                                              relFrom.qname, order, rel.linkrole, 
+                                              rel.toModelObject.qname, orderRels[order].toModelObject.qname), 
+                                        "err", "EFM.N/A", "GFM.1.07.06")
+                                else:
+                                    orderRels[order] = rel
+                            if self.directedCycle(relFrom,relFrom,fromRelationships):
+                                self.modelXbrl.error(
+                                    _("Calculation relationships have a directed cycle in base set role {0} starting from {1}").format(
+                                          ELR, relFrom.qname), 
+                                    "err", "EFM.6.14.04", "GFM.1.07.04")
+                    elif self.validateSBRNL:
+                        # find a calc relationship to get the containing document name
+                        for modelRel in self.modelXbrl.relationshipSet(arcrole).modelRelationships:
+                            self.modelXbrl.error(
+                                _("Calculation linkbase {0}").format(
+                                      modelRel.modelDocument.basename, modelRel.arcrole), 
+                                "err", "SBR.NL.2.3.9.01")
+                            break
+                            
+                elif arcrole == XbrlConst.all or arcrole == XbrlConst.notAll:
+                    drsELRs.add(ELR)
+                    
+                elif arcrole == XbrlConst.dimensionDomain or arcrole == XbrlConst.dimensionDefault and \
+                     self.validateEFMorGFM:
+                    # 6.16.3 check domain targets in extension linkbases are domain items
+                    fromRelationships = modelXbrl.relationshipSet(arcrole,ELR).fromModelObjects()
+                    for relFrom, rels in fromRelationships.items():
+                        for rel in rels:
+                            relTo = rel.toModelObject
+
+                            if not (relTo.type and relTo.type.isDomainItemType) and \
+                               rel.modelDocument.uri not in self.disclosureSystem.standardTaxonomiesDict:
+                                self.modelXbrl.error(
+                                    _("Definition relationship from {0} to {1} in role {2} requires domain item target").format(
+                                          relFrom.qname, relTo.qname, rel.linkrole), 
+                                    "err", "EFM.6.16.03", "GFM.1.08.03")
+
+                elif arcrole == XbrlConst.dimensionDefault and self.validateSBRNL:
+                    for modelRel in self.modelXbrl.relationshipSet(arcrole).modelRelationships:
+                        self.modelXbrl.error(
+                            _("Dimension-default in linkbase {0} from {1} to {2} in role {3} is not allowed").format(
+                                  modelRel.modelDocument.basename,
+                                  modelRel.fromModelObject.qname, modelRel.toModelObject.qname, 
+                                  modelRel.arcrole), 
+                            "err", "SBR.NL.2.3.6.05")
+                       
+                # definition tests (GFM only, for now)
+                if XbrlConst.isStandardOrXdtArcrole(arcrole) and self.disclosureSystem.GFM: 
+                    fromRelationships = modelXbrl.relationshipSet(arcrole,ELR).fromModelObjects()
+                    for relFrom, rels in fromRelationships.items():
+                        orderRels = {}
+                        for rel in rels:
+                            relTo = rel.toModelObject
+                            order = rel.order
+                            if order in orderRels and self.disclosureSystem.GFM:
+                                self.modelXbrl.error(
+                                    _("Duplicate definitions relations from concept {0} for order {1} in base set role {2} to concept {3} and to concept {4}").format(
+                                          relFrom.qname, order, rel.linkrole, 
+                                          rel.toModelObject.qname, orderRels[order].toModelObject.qname), 
+                                    "err", "GFM.1.08.10")
+                            else:
+                                orderRels[order] = rel
+                            if (arcrole not in (XbrlConst.dimensionDomain, XbrlConst.domainMember) and
+                                rel.element.getAttributeNS(XbrlConst.xbrldt,"usable") == "false"):
+                                self.modelXbrl.error(
+                                    _("Disallowed xbrldt:usable='false' attribute on {0} relationship from concept {1} in base set role {2} to concept {3}").format(
+                                          os.path.basename(arcrole), relFrom.qname, rel.linkrole, rel.toModelObject.qname), 
+                                    "err", "GFM.1.08.11")
+
     def directedCycle(self, relFrom, origin, fromRelationships):
         if relFrom in fromRelationships:
             for rel in fromRelationships[relFrom]:
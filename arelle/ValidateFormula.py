@@ -4,7 +4,7 @@ Created on Dec 9, 2010
 @author: Mark V Systems Limited
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
-import os
+import os, sys, threading, multiprocessing
 from collections import defaultdict
 from arelle.pyparsing.pyparsing_py3 import (ParseException) 
 from arelle.ModelFormulaObject import (ModelParameter, ModelInstance,
@@ -14,6 +14,7 @@ from arelle.ModelFormulaObject import (ModelParameter, ModelInstance,
                                        ModelPrecondition, ModelConceptName, Trace,
                                        Aspect, aspectModels, ModelAspectCover)
 from arelle.ModelObject import (ModelObject)
+from arelle.FormulaProfile import FormulaProfile
 from arelle.ModelValue import (qname,QName)
 from arelle import (XbrlConst, XmlUtil, ModelXbrl, ModelDocument, XPathParser, XPathContext, FunctionXs) 
 
@@ -475,6 +476,8 @@ def validate(val):
             consisAsser.compile()
             modelRel.toModelObject.hasConsistencyAssertion = True
 
+    XPathParser.saveParseCache(val.modelXbrl.modelManager)
+
     if initialErrorCount < val.modelXbrl.logCountErr:
         return  # don't try to execute
         
@@ -508,15 +511,23 @@ def validate(val):
     # evaluate consistency assertions
     
     # evaluate variable sets not in consistency assertions
+    formulaProfileFile = val.modelXbrl.modelManager.formulaProfileFile
+    if formulaProfileFile:
+        xpathContext.profile = FormulaProfile()
+    formulaWorkers = val.modelXbrl.modelManager.formulaWorkers
     for instanceQname in orderedInstancesList:
-        for modelVariableSet in instanceProducingVariableSets[instanceQname]:
-            # produce variable evaluations
-            from arelle.FormulaEvaluator import evaluate
-            try:
-                evaluate(xpathContext, modelVariableSet)
-            except XPathContext.XPathException as err:
-                val.modelXbrl.error( _("Variable set \n{0} \nException: \n{1}").format( modelVariableSet, err.message),
-                    "err", err.code)
+        modelVariableSets = instanceProducingVariableSets[instanceQname]
+        if (instanceQname is None and formulaWorkers > 1 and len(modelVariableSets) > 1 and 
+            "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1):
+            # assertions, evaluated after all formulas producing instances, are independent of each other;
+            # processes are only forked by a single threaded process (e.g., not by the GUI)
+            evaluateInProcesses(val, xpathContext, modelVariableSets, formulaWorkers)
+            continue
+        for modelVariableSet in modelVariableSets:
+            evaluateVariableSet(val, xpathContext, modelVariableSet)
+    if formulaProfileFile:
+        xpathContext.profile.save(formulaProfileFile, val.modelXbrl)
+        xpathContext.profile = None
             
     # log assertion result counts
     asserTests = {}
@@ -549,6 +560,69 @@ def validate(val):
             val.modelXbrl.formulaOutputInstance.close()
         val.modelXbrl.formulaOutputInstance = outputXbrlInstance
 
+def evaluateVariableSet(val, xpathContext, modelVariableSet):
+    # produce variable evaluations
+    from arelle.FormulaEvaluator import evaluate
+    try:
+        evaluate(xpathContext, modelVariableSet)
+    except XPathContext.XPathException as err:
+        val.modelXbrl.error( _("Variable set \n{0} \nException: \n{1}").format( modelVariableSet, err.message),
+            "err", err.code)
+
+def evaluateInProcesses(val, xpathContext, modelVariableSets, numProcesses):
+    # evaluates independent variable sets in forked processes, each inheriting the instance, formulae and
+    # compiled programs, and returning counts, messages and profiles of its share of the variable sets.
+    # The variable sets evaluated here are the assertions (not producing instances), evaluated after all
+    # formulas producing instances in orderedInstancesList order, which are evaluated in this process; no
+    # finer dependency graph among formulas (e.g., by xfi instance parameters) is built.
+    context = multiprocessing.get_context("fork")
+    sys.stdout.flush() # else buffered output is also flushed by the forked processes
+    processes = []
+    for i in range(min(numProcesses, len(modelVariableSets))):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=evaluateForked, 
+                                  args=(val, xpathContext, modelVariableSets[i::numProcesses], sender))
+        process.start()
+        sender.close()
+        processes.append((process, receiver))
+    # merge counts, messages and profiles in variable set order, as if evaluated in this process
+    results = [None] * len(modelVariableSets)
+    for i, (process, receiver) in enumerate(processes):
+        try:
+            results[i::numProcesses] = receiver.recv()
+        except EOFError: # process failed, its variable sets are evaluated here
+            pass
+        receiver.close()
+        process.join()
+    for modelVariableSet, result in zip(modelVariableSets, results):
+        if result is None:
+            evaluateVariableSet(val, xpathContext, modelVariableSet)
+            continue
+        countSatisfied, countNotSatisfied, messages, profile = result
+        modelVariableSet.countSatisfied = countSatisfied
+        modelVariableSet.countNotSatisfied = countNotSatisfied
+        for message, severity, codes in messages:
+            val.modelXbrl.error(message, severity, *codes)
+        if profile is not None:
+            xpathContext.profile.merge(profile)
+
+def evaluateForked(val, xpathContext, modelVariableSets, sender):
+    # in a forked process, returns results of modelVariableSets to the validating process by sender
+    val.modelXbrl.modelManager.cntlr.webCache.forked()
+    results = []
+    for modelVariableSet in modelVariableSets:
+        messages = val.modelXbrl.captureMessages(logMessages=False) # logged by the validating process
+        if xpathContext.profile is not None:
+            xpathContext.profile = FormulaProfile() # of just this variable set
+        try:
+            evaluateVariableSet(val, xpathContext, modelVariableSet)
+        finally:
+            val.modelXbrl.endCaptureMessages(messages)
+        results.append((modelVariableSet.countSatisfied, modelVariableSet.countNotSatisfied, 
+                        messages, xpathContext.profile))
+    sender.send(results)
+    sender.close()
+
 def checkFilterAspectModel(val, variableSet, filterRelationships, xpathContext, uncoverableAspects=None):
     if uncoverableAspects is None:
         oppositeAspectModel = ({'dimensional','non-dimensional'} - {variableSet.aspectModel}).pop()
@@ -0,0 +1,64 @@
+'''
+Created on Oct 18, 2026
+
+Reuse of validation check results across reloads of a modelXbrl (such as by
+ModelXbrl.reload after an extension linkbase is edited, or by WatchRss).
+
+Each reusable check has a fingerprint of its dependency documents: the DTS's
+instance and schema documents plus the linkbases containing links of the base
+sets it depends on, by url, mtime and size.  When a check is run with the same
+key and fingerprint as when it was last run, its messages (captured by
+ModelXbrl.captureMessages) are logged again and its prior result is returned,
+instead of rerunning it; so an edit to a presentation linkbase does not rerun
+the calculation or XDT checks, but an edit to a calculation linkbase does.
+
+Reusable checks are the calculation check, the UTR check, the XDT check of each
+dimensional base set and the EFM (GFM, SBR.NL) presentation checks.  A check whose
+results are used by later validation returns them in terms of qnames, which the
+caller applies to the reloaded model objects, as XDT dimension defaults are by
+ValidateXbrlDimensions.loadBaseSet, and presented concepts by ValidateFiling.
+
+Reload still rediscovers every document, so model objects, and the relationship
+sets built of them, are rebuilt on each reload; only check results are reused.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import os
+from arelle import ModelDocument
+
+def dependencyDocuments(modelXbrl, arcroles=()):
+    filepaths = set(modelDocument.filepath
+                    for modelDocument in modelXbrl.urlDocs.values()
+                    if modelDocument.type != ModelDocument.Type.LINKBASE)
+    for baseSetKey, modelLinks in modelXbrl.baseSets.items():
+        if baseSetKey[0] in arcroles:
+            for modelLink in modelLinks:
+                filepaths.add(modelLink.modelDocument.filepath)
+    return filepaths
+
+def fingerprint(modelXbrl, arcroles=()):
+    # url, mtime and size of dependency documents, None if any is not a local file (always rechecked)
+    documents = []
+    for filepath in dependencyDocuments(modelXbrl, arcroles):
+        try:
+            fileStat = os.stat(filepath)
+            documents.append((filepath, fileStat.st_mtime, fileStat.st_size))
+        except (EnvironmentError, TypeError):
+            return None
+    return tuple(sorted(documents))
+
+def run(modelXbrl, checkKey, checkFingerprint, check):
+    # returns check(), or its prior result, logging its prior messages, if its dependency documents are unchanged
+    priorResult = modelXbrl.validationResults.get(checkKey)
+    if checkFingerprint is not None and priorResult is not None and priorResult[0] == checkFingerprint:
+        for message, severity, codes in priorResult[1]:
+            modelXbrl.error(message, severity, *codes)
+        return priorResult[2]
+    messages = modelXbrl.captureMessages()
+    try:
+        result = check()
+    finally:
+        modelXbrl.endCaptureMessages(messages)
+    modelXbrl.validationResults[checkKey] = (checkFingerprint, messages, result)
+    return result
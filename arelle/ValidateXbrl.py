@@ -6,7 +6,8 @@ Created on Oct 17, 2010
 '''
 import re
 from arelle import (ModelDocument, XmlUtil, XbrlUtil, XbrlConst, 
-                ValidateXbrlCalcs, ValidateXbrlDimensions, ValidateXbrlDTS, ValidateFormula, ValidateUtr)
+                ValidateXbrlCalcs, ValidateXbrlDimensions, ValidateXbrlDTS, ValidateFormula, ValidateUtr,
+                ValidateIncremental)
 from arelle.ModelValue import (qname)
 
 arcNamesTo21Resource = {"labelArc","referenceArc"}
@@ -14,6 +15,8 @@ xlinkTypeValues = {"", "simple", "extended", "locator", "arc", "resource", "titl
 xlinkActuateValues = {"", "onLoad", "onRequest", "other", "none"}
 xlinkShowValues = {"", "new", "replace", "embed", "other", "none"}
 xlinkLabelAttributes = {"label", "from", "to"}
+xdtArcroles = (XbrlConst.all, XbrlConst.notAll, XbrlConst.hypercubeDimension, 
+               XbrlConst.dimensionDomain, XbrlConst.domainMember, XbrlConst.dimensionDefault)
 periodTypeValues = {"instant","duration"}
 balanceValues = {None, "credit","debit"}
 baseXbrliTypes = {
@@ -200,6 +203,9 @@ class ValidateXbrl:
         self.dimensionDefaults = {}
         modelXbrl.qnameDimensionDefaults = {}
         modelXbrl.qnameDimensionContextElement = {}
+        modelXbrl.factIndexes.pop("aspect", None) # dimension default members are indexed
+        if modelXbrl.hasXDT:
+            dimFingerprint = ValidateIncremental.fingerprint(modelXbrl, xdtArcroles)
         # check base set cycles, dimensions
         modelXbrl.modelManager.showStatus(_("validating relationship sets"))
         for baseSetKey in modelXbrl.baseSets.keys():
@@ -294,7 +300,9 @@ class ValidateXbrl:
                                           fromConcept.qname, toConcept.qname, ELR), 
                                     "err", "xbrl.5.2.6.2.2:essenceAliasBalance")
             elif modelXbrl.hasXDT and arcrole.startswith(XbrlConst.dimStartsWith):
-                ValidateXbrlDimensions.checkBaseSet(self, arcrole, ELR, relsSet)             
+                ValidateXbrlDimensions.loadBaseSet(self, arcrole, ELR, relsSet)
+                ValidateIncremental.run(modelXbrl, ("xdt",) + baseSetKey, dimFingerprint,
+                                        lambda: ValidateXbrlDimensions.checkBaseSet(self, arcrole, ELR, relsSet))
             elif modelXbrl.hasFormulae and arcrole.startswith(XbrlConst.formulaStartsWith):
                 ValidateFormula.checkBaseSet(self, arcrole, ELR, relsSet)
                             
@@ -399,7 +407,8 @@ class ValidateXbrl:
                                               f.qname, f.contextID, denominator), 
                                         "err", "xbrl.5.1.1:fractionPrecisionDecimals")
                         else:
-                            if modelXbrl.modelDocument.type != ModelDocument.Type.INLINEXBRL:
+                            if modelXbrl.modelDocument.type != ModelDocument.Type.INLINEXBRL and \
+                               f.element is not None: # streamed item facts have no child elements
                                 for child in f.element.childNodes:
                                     if child.nodeType == 1:
                                         self.modelXbrl.error(
@@ -589,13 +598,24 @@ class ValidateXbrl:
         
         if self.validateCalcLB:
             modelXbrl.modelManager.showStatus(_("Validating instance calculations"))
-            ValidateXbrlCalcs.validate(modelXbrl, inferPrecision=(not self.validateInferDecimals))
+            inferPrecision = not self.validateInferDecimals
+            ValidateIncremental.run(modelXbrl, ("calculations", inferPrecision), 
+                                    ValidateIncremental.fingerprint(modelXbrl, 
+                                        (XbrlConst.summationItem, XbrlConst.essenceAlias, XbrlConst.requiresElement)),
+                                    lambda: ValidateXbrlCalcs.validate(modelXbrl, inferPrecision))
             
         if modelXbrl.modelManager.validateUtr:
-            ValidateUtr.validate(modelXbrl)
+            ValidateIncremental.run(modelXbrl, ("utr",), ValidateIncremental.fingerprint(modelXbrl),
+                                    lambda: ValidateUtr.validate(modelXbrl))
             
         if modelXbrl.hasFormulae:
-            ValidateFormula.validate(self)
+            if modelXbrl.modelDocument.isStreamed:
+                modelXbrl.error(
+                    _("Formulae are not evaluated for streamed instance {0}").format(
+                          modelXbrl.modelDocument.basename), 
+                    "info", "arelle:streamedInstanceFormulae")
+            else:
+                ValidateFormula.validate(self)
             
         modelXbrl.modelManager.showStatus(_("ready"), 2000)
         
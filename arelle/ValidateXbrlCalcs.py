@@ -26,6 +26,8 @@ class ValidateXbrlCalcs:
         self.itemConceptBindKeys = defaultdict(set)
         self.duplicateKeyFacts = {}
         self.duplicatedFacts = set()
+        self.roundedValues = {}
+        self.roundedItems = {}
         self.esAlFacts = defaultdict(list)
         self.esAlConceptBindKeys = defaultdict(set)
         self.conceptsInEssencesAlias = set()
@@ -37,23 +39,23 @@ class ValidateXbrlCalcs:
                              .format(_("precision") if self.inferPrecision else _("decimals")))
 
 
-        # identify equal contexts
-        contexts = tuple(self.modelXbrl.contexts.values())
-        for i in range(len(contexts)):
-            cntx1 = contexts[i]
-            for j in range(i+1, len(contexts)):
+        # identify equal contexts, only contexts with the same aspect key can be equal
+        for contexts in self.modelXbrl.contextsByAspectKey().values():
+            for j in range(1, len(contexts)):
                 cntx2 = contexts[j]
-                if cntx1.isEqualTo(cntx2) and not cntx2 in self.mapContext:
-                    self.mapContext[cntx2] = cntx1
+                for i in range(j):
+                    if contexts[i].isEqualTo(cntx2):
+                        self.mapContext[cntx2] = contexts[i]
+                        break
 
-        # identify equal contexts
-        units = tuple(self.modelXbrl.units.values())
-        for i in range(len(units)):
-            unit1 = units[i]
-            for j in range(i+1, len(units)):
+        # identify equal units
+        for units in self.modelXbrl.unitsByAspectKey().values():
+            for j in range(1, len(units)):
                 unit2 = units[j]
-                if unit1.isEqualTo(unit2) and not unit2 in self.mapUnit:
-                    self.mapUnit[unit2] = unit1
+                for i in range(j):
+                    if units[i].isEqualTo(unit2):
+                        self.mapUnit[unit2] = units[i]
+                        break
                     
         # identify concepts participating in essence-alias relationships
         # identify calcluation & essence-alias base sets (by key)
@@ -79,37 +81,32 @@ class ValidateXbrlCalcs:
                         fromRelationships = relsSet.fromModelObjects()
                         for sumConcept, modelRels in fromRelationships.items():
                             sumBindingKeys = self.sumConceptBindKeys[sumConcept]
-                            dupBindingKeys = set()
                             boundSumKeys = set()
                             # determine boundSums
                             for modelRel in modelRels:
                                 itemBindingKeys = self.itemConceptBindKeys[modelRel.toModelObject]
                                 boundSumKeys |= sumBindingKeys & itemBindingKeys
-                            # add up rounded items
-                            boundSums = defaultdict(float)
-                            for modelRel in modelRels:
-                                weight = modelRel.weight
-                                itemConcept = modelRel.toModelObject
-                                for itemBindKey in boundSumKeys:
-                                    ancestor, context, unit = itemBindKey
-                                    factKey = (itemConcept, ancestor, context, unit)
-                                    if factKey in self.itemFacts:
-                                        for fact in self.itemFacts[factKey]:
-                                            if fact in self.duplicatedFacts:
-                                                dupBindingKeys.add(itemBindKey)
-                                            else:
-                                                boundSums[itemBindKey] += self.roundFact(fact) * weight
+                            weightedItemConcepts = [(modelRel.toModelObject, modelRel.weight) for modelRel in modelRels]
                             for sumBindKey in boundSumKeys:
                                 ancestor, context, unit = sumBindKey
                                 factKey = (sumConcept, ancestor, context, unit)
                                 if factKey in self.sumFacts:
+                                    # add up rounded items, in relationships order
+                                    boundSum = 0.0
+                                    isDuplicated = False
+                                    for itemConcept, weight in weightedItemConcepts:
+                                        roundedValues, hasDuplicate = self.roundedItemValues((itemConcept, ancestor, context, unit))
+                                        for roundedValue in roundedValues:
+                                            boundSum += roundedValue * weight
+                                        if hasDuplicate:
+                                            isDuplicated = True
                                     for fact in self.sumFacts[factKey]:
                                         if fact in self.duplicatedFacts:
-                                            dupBindingKeys.add(sumBindKey)
-                                        elif sumBindKey not in dupBindingKeys:
-                                            roundedSum = self.roundFact(fact)
-                                            roundedItemsSum = self.roundFact(fact, vFloat=boundSums[sumBindKey])
-                                            if roundedItemsSum  != self.roundFact(fact):
+                                            isDuplicated = True
+                                        elif not isDuplicated:
+                                            roundedSum = self.roundedValue(fact)
+                                            roundedItemsSum = self.roundFact(fact, vFloat=boundSum)
+                                            if roundedItemsSum  != roundedSum:
                                                 self.modelXbrl.error(
                                                     _("Calculation inconsistent from {0} in link role {1} reported sum {2} computed sum {3} context {4} unit {5}").format(
                                                           sumConcept.qname, ELR, roundedSum, roundedItemsSum, context.id, unit.id), 
@@ -134,7 +131,7 @@ class ValidateXbrlCalcs:
                                                     _("Essence-Alias inconsistent units from {0} to {1} in link role {2} context {3}").format(
                                                           essenceConcept.qname, aliasConcept.qname, ELR, context.id), 
                                                     "err", "xbrl.5.2.6.2.2:essenceAliasUnitsInconsistency")
-                                            if not XbrlUtil.vEqual(essenceConcept, eF.element, aliasConcept, aF.element):
+                                            if not XbrlUtil.vEqual(essenceConcept, eF.element, aliasConcept, aF.element, eF.text, aF.text):
                                                 self.modelXbrl.error(
                                                     _("Essence-Alias inconsistent value from {0} to {1} in link role {2} context {3}").format(
                                                           essenceConcept.qname, aliasConcept.qname, ELR, context.id), 
@@ -189,16 +186,40 @@ class ValidateXbrlCalcs:
                 if concept in self.conceptsInRequiresElement:
                     self.requiresElementFacts[concept].append(f)
 
+    def roundedValue(self, fact):
+        # a fact is rounded once, for all the summation networks and bindings it is in
+        try:
+            return self.roundedValues[fact]
+        except KeyError:
+            self.roundedValues[fact] = vRounded = self.roundFact(fact)
+            return vRounded
+        
+    def roundedItemValues(self, itemFactKey):
+        # rounded values of the non-duplicated facts of a binding of (concept, ancestor, context, unit),
+        # and whether the binding has duplicated facts
+        try:
+            return self.roundedItems[itemFactKey]
+        except KeyError:
+            roundedValues = []
+            hasDuplicate = False
+            for fact in self.itemFacts.get(itemFactKey, ()):
+                if fact in self.duplicatedFacts:
+                    hasDuplicate = True
+                else:
+                    roundedValues.append(self.roundedValue(fact))
+            self.roundedItems[itemFactKey] = roundedItems = (roundedValues, hasDuplicate)
+            return roundedItems
+
     def roundFact(self, fact, vFloat=None):
         if vFloat is None:
             vStr = fact.value
-            vFloat = float(vStr)
+            vFloat = fact.numericValue
             vFloatFact = vFloat
         else: #only vFloat is defined, may not need vStr unless inferring precision from decimals
             if isnan(vFloat):
                 return vFloat
             vStr = None
-            vFloatFact = float(fact.value)
+            vFloatFact = fact.numericValue
         dStr = fact.decimals
         pStr = fact.precision
         if dStr == "INF" or pStr == "INF":
@@ -248,9 +269,25 @@ class ValidateXbrlCalcs:
                 vRounded = round(vFloat, d)
         return vRounded
 
+# inferred precision and decimals are kept on facts, which are not edited after discovery,
+# as consistency assertions, filters and functions may infer them for each evaluation
 def inferredPrecision(fact):
+    try:
+        return fact.inferredPrecisionValue
+    except AttributeError:
+        fact.inferredPrecisionValue = p = factInferredPrecision(fact)
+        return p
+    
+def inferredDecimals(fact):
+    try:
+        return fact.inferredDecimalsValue
+    except AttributeError:
+        fact.inferredDecimalsValue = d = factInferredDecimals(fact)
+        return d
+    
+def factInferredPrecision(fact):
     vStr = fact.value
-    vFloat = float(vStr)
+    vFloat = fact.numericValue
     dStr = fact.decimals
     pStr = fact.precision
     if dStr == "INF" or pStr == "INF":
@@ -276,9 +313,8 @@ def inferredPrecision(fact):
     else:
         return p
     
-def inferredDecimals(fact):
-    vStr = fact.value
-    vFloat = float(vStr)
+def factInferredDecimals(fact):
+    vFloat = fact.numericValue
     dStr = fact.decimals
     pStr = fact.precision
     if dStr == "INF" or pStr == "INF":
@@ -14,7 +14,31 @@ def loadDimensionDefaults(val):
     for baseSetKey in val.modelXbrl.baseSets.keys():
         arcrole, ELR, linkqname, arcqname = baseSetKey
         if ELR and linkqname and arcqname and arcrole == XbrlConst.dimensionDefault:
-            checkBaseSet(val, arcrole, ELR, val.modelXbrl.relationshipSet(arcrole,ELR,linkqname,arcqname))
+            loadBaseSet(val, arcrole, ELR, val.modelXbrl.relationshipSet(arcrole,ELR,linkqname,arcqname))
+
+def loadBaseSet(val, arcrole, ELR, relsSet):
+    # dimension defaults and context elements used by later validation, without checking relationships,
+    # loaded before checkBaseSet, which is not rerun if its prior messages are reused (see ValidateIncremental)
+    if arcrole == XbrlConst.all:
+        for priItemConcept, hcRels in relsSet.fromModelObjects().items():
+            for hasHcRel in hcRels:
+                hcConcept = hasHcRel.toModelObject
+                if priItemConcept and hcConcept:
+                    dimELR = hasHcRel.targetRole
+                    if not dimELR:
+                        dimELR = ELR
+                    for hcDimRel in val.modelXbrl.relationshipSet(
+                         XbrlConst.hypercubeDimension, dimELR).fromModelObject(hcConcept):
+                        dimConcept = hcDimRel.toModelObject
+                        if dimConcept:
+                            val.modelXbrl.qnameDimensionContextElement[dimConcept.qname] = hasHcRel.contextElement
+    elif arcrole == XbrlConst.dimensionDefault:
+        for modelRel in relsSet.modelRelationships:
+            fromConcept = modelRel.fromModelObject
+            toConcept = modelRel.toModelObject
+            if fromConcept and toConcept and fromConcept not in val.dimensionDefaults:
+                val.dimensionDefaults[fromConcept] = toConcept
+                val.modelXbrl.qnameDimensionDefaults[fromConcept.qname] = toConcept.qname
 
 def checkBaseSet(val, arcrole, ELR, relsSet):
     # check hypercube-dimension relationships
@@ -66,8 +90,6 @@ def checkBaseSet(val, arcrole, ELR, relsSet):
                     for hcDimRel in hcDimRels:
                         dimConcept = hcDimRel.toModelObject
                         if dimConcept:
-                            if arcrole == XbrlConst.all:
-                                val.modelXbrl.qnameDimensionContextElement[dimConcept.qname] = hcContextElement
                             domELR = hcDimRel.targetRole
                             if not domELR:
                                 domELR = dimELR
@@ -130,9 +152,6 @@ def checkBaseSet(val, arcrole, ELR, relsSet):
                         _("Dimension {0} has multiple defaults {1} and {2}").format(
                               fromConcept.qname, toConcept.qname, val.dimensionDefaults[fromConcept].qname), 
                         "err", "xbrldte:TooManyDefaultMembersError")
-                else:
-                    val.dimensionDefaults[fromConcept] = toConcept
-                    val.modelXbrl.qnameDimensionDefaults[fromConcept.qname] = toConcept.qname
 
     # check for primary item cycles
     elif arcrole == XbrlConst.domainMember:
@@ -303,23 +322,83 @@ def checkContext(val, cntx):
                 "err", "xbrldie:RepeatedDimensionInInstanceError")
             
 def checkFact(val, f):
-    if not isFactDimensionallyValid(val, f):
+    # facts mostly share both concept and context, their validity is determined once per pair
+    contextValidity = drsClosure(val, f.concept).contextValidity
+    context = f.context
+    try:
+        isValid = contextValidity[context]
+    except KeyError:
+        isValid = contextValidity[context] = isFactDimensionallyValid(val, f)
+    if not isValid:
         val.modelXbrl.error(
             _("Fact {0} context {1} dimensions not valid").format(
                   f.concept.qname, f.context.id), 
             "err", "xbrldie:PrimaryItemDimensionallyInvalidError")
 
 def isFactDimensionallyValid(val, f):
-    hasElrHc = False
-    for ELR, hcRels in priItemElrHcRels(val, f.concept).items():
-        hasElrHc = True
-        if checkFactElrHcs(val, f, ELR, hcRels):
+    elrHypercubes = drsClosure(val, f.concept).elrHypercubes
+    for ELR, hypercubes in elrHypercubes:
+        if checkFactElrHcs(val, f, ELR, hypercubes):
             return True # meets hypercubes in this ELR
         
-    if hasElrHc:
+    if elrHypercubes:
         # no ELR hypercubes fully met
         return False
     return True
+
+class DrsClosure:
+    # a primary item's has-hypercube relationships, including inherited ones, by ELR, closed over
+    # hypercube-dimension, dimension-domain and domain-member relationships into, for each hypercube: 
+    # (hcIsClosed, hcContextElement, hcNegating, ((dimConcept, usable members of its domain), ...)), 
+    # so checking a fact's dimensions is by set lookups instead of walking the relationships
+    def __init__(self, val, priItem):
+        self.elrHypercubes = []
+        for ELR, hcRels in priItemElrHcRels(val, priItem).items():
+            hypercubes = []
+            for hasHcRel in hcRels:
+                dimELR = hasHcRel.targetRole
+                if dimELR is None:
+                    dimELR = ELR
+                dims = []
+                for hcDimRel in val.modelXbrl.relationshipSet(
+                                    XbrlConst.hypercubeDimension, dimELR).fromModelObject(hasHcRel.toModelObject):
+                    dimConcept = hcDimRel.toModelObject
+                    domELR = hcDimRel.targetRole
+                    if domELR is None:
+                        domELR = dimELR
+                    dims.append((dimConcept, usableDomainMembers(val, dimConcept, domELR)))
+                hypercubes.append((hasHcRel.isClosed, hasHcRel.contextElement, 
+                                   hasHcRel.arcrole == XbrlConst.notAll, tuple(dims)))
+            self.elrHypercubes.append((ELR, hypercubes))
+        self.contextValidity = {} # validity of the primary item's facts by context, see checkFact
+
+def drsClosure(val, priItem):
+    drsClosures = val.modelXbrl.drsClosures
+    try:
+        return drsClosures[priItem]
+    except KeyError:
+        closure = drsClosures[priItem] = DrsClosure(val, priItem)
+        return closure
+
+def usableDomainMembers(val, dimConcept, domELR):
+    # members of which memberStateInDomain is MEMBER_USABLE, relationships from each concept in 
+    # each ELR are the same however reached, so each (concept, ELR) is only walked once
+    memberStates = {}
+    visited = set()
+    stack = [(val.modelXbrl.relationshipSet(XbrlConst.dimensionDomain, domELR).fromModelObject(dimConcept), domELR)]
+    while stack:
+        rels, ELR = stack.pop()
+        for rel in rels:
+            toConcept = rel.toModelObject
+            memberStates[toConcept] = max(memberStates.get(toConcept, NOT_FOUND), 
+                                          MEMBER_USABLE if rel.isUsable else MEMBER_NOT_USABLE)
+            toELR = rel.targetRole
+            if toELR is None:
+                toELR = ELR
+            if (toConcept, toELR) not in visited:
+                visited.add((toConcept, toELR))
+                stack.append((val.modelXbrl.relationshipSet(XbrlConst.domainMember, toELR).fromModelObject(toConcept), toELR))
+    return frozenset(member for member, state in memberStates.items() if state == MEMBER_USABLE)
     
 def priItemElrHcRels(val, priItem, ELR=None, elrHcRels=None):
     if elrHcRels is None:
@@ -342,15 +421,11 @@ NOT_FOUND = 0
 MEMBER_USABLE = 1
 MEMBER_NOT_USABLE = 2
 
-def checkFactElrHcs(val, f, ELR, hcRels):
+def checkFactElrHcs(val, f, ELR, hypercubes):
     context = f.context
     elrValid = True # start assuming ELR is valid
     
-    for hasHcRel in hcRels:
-        hcConcept = hasHcRel.toModelObject
-        hcIsClosed = hasHcRel.isClosed
-        hcContextElement = hasHcRel.contextElement
-        hcNegating = hasHcRel.arcrole == XbrlConst.notAll
+    for hcIsClosed, hcContextElement, hcNegating, dims in hypercubes:
         modelDimValues = context.dimValues(hcContextElement)
         contextElementDimSet = set(modelDimValues.keys())
         modelNonDimValues = context.nonDimValues(hcContextElement)
@@ -360,17 +435,7 @@ def checkFactElrHcs(val, f, ELR, hcRels):
         if hcIsClosed and len(modelNonDimValues) > 0:
             hcValid = False
         else:
-            dimELR = hasHcRel.targetRole
-            if dimELR is None:
-                dimELR = ELR
-            for hcDimRel in val.modelXbrl.relationshipSet(
-                                XbrlConst.hypercubeDimension, dimELR).fromModelObject(hcConcept):
-                dimConcept = hcDimRel.toModelObject
-                domELR = hcDimRel.targetRole
-                if domELR is None:
-                    domELR = dimELR
-                dimDomRels = val.modelXbrl.relationshipSet(
-                                XbrlConst.dimensionDomain, domELR).fromModelObject(dimConcept)
+            for dimConcept, usableMembers in dims:
                 if dimConcept in modelDimValues:
                     memModelDimension = modelDimValues[dimConcept]
                     contextElementDimSet.discard(dimConcept)
@@ -381,7 +446,7 @@ def checkFactElrHcs(val, f, ELR, hcRels):
                     hcValid = False
                     continue
                 if not dimConcept.isTypedDimension:
-                    if memberStateInDomain(val, memConcept, dimDomRels, domELR) != MEMBER_USABLE:
+                    if memConcept not in usableMembers:
                         hcValid = False 
         if hcIsClosed and len(contextElementDimSet) > 0:
             hcValid = False # has extra stuff in the context element
@@ -414,31 +479,17 @@ def memberStateInDomain(val, memConcept, rels, ELR, fromConcepts=None):
 # check a single dimension value for primary item (not the complete set of dimension values)
 def checkPriItemDimValueValidity(val, priItemConcept, dimConcept, memConcept):
     if priItemConcept and dimConcept and memConcept:
-        for ELR, hcRels in priItemElrHcRels(val, priItemConcept).items():
-            if checkPriItemDimValueElrHcs(val, priItemConcept, dimConcept, memConcept, ELR, hcRels):
+        for ELR, hypercubes in drsClosure(val, priItemConcept).elrHypercubes:
+            if checkPriItemDimValueElrHcs(val, priItemConcept, dimConcept, memConcept, ELR, hypercubes):
                 return True
     return False
 
-def checkPriItemDimValueElrHcs(val, priItemConcept, matchDim, matchMem, ELR, hcRels):
-    for hasHcRel in hcRels:
-        hcConcept = hasHcRel.toModelObject
-        hcIsClosed = hasHcRel.isClosed
-        hcNegating = hasHcRel.arcrole == XbrlConst.notAll
-        
-        dimELR = hasHcRel.targetRole
-        if dimELR is None:
-            dimELR = ELR
-        for hcDimRel in val.modelXbrl.relationshipSet(
-                            XbrlConst.hypercubeDimension, dimELR).fromModelObject(hcConcept):
-            dimConcept = hcDimRel.toModelObject
+def checkPriItemDimValueElrHcs(val, priItemConcept, matchDim, matchMem, ELR, hypercubes):
+    for hcIsClosed, hcContextElement, hcNegating, dims in hypercubes:
+        for dimConcept, usableMembers in dims:
             if dimConcept != matchDim:
                 continue
-            domELR = hcDimRel.targetRole
-            if domELR is None:
-                domELR = dimELR
-            dimDomRels = val.modelXbrl.relationshipSet(
-                            XbrlConst.dimensionDomain, domELR).fromModelObject(dimConcept)
-            if memberStateInDomain(val, matchMem, dimDomRels, domELR) != MEMBER_USABLE:
+            if matchMem not in usableMembers:
                 return hcNegating # true if all, false if not all
         if hcIsClosed:
             return False # has extra stuff in the context element
@@ -91,6 +91,14 @@ class WatchRss:
                 for rssItem in self.rssModelXbrl.modelDocument.items:
                     pubDateRssItems.append((rssItem.pubDate,rssItem.objectId()))
                 
+                # fetch zip files of new filings concurrently, ahead of validating them one by one
+                self.cntlr.webCache.getfilenames(
+                    [rssItem.zippedUrl.rpartition("/")[0]
+                     for rssItem in self.rssModelXbrl.modelDocument.items
+                     if not rssWatchOptions.latestPubDate or rssItem.pubDate >= rssWatchOptions.latestPubDate])
+                if self.stopRequested:
+                    break
+                
                 for pubDate, rssItemObjectId in sorted(pubDateRssItems):
                     rssItem = self.rssModelXbrl.modelObject(rssItemObjectId)
                     # update ui thread via modelManager (running in background here)
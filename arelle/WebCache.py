@@ -4,9 +4,11 @@ Created on Oct 5, 2010
 @author: Mark V Systems Limited
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
-import os, posixpath, sys, re, shutil, time, urllib.request, pickle
+import os, posixpath, sys, re, shutil, time, urllib.request, pickle, threading, http.client, hashlib
+from collections import defaultdict
 from urllib.error import (URLError, HTTPError, ContentTooShortError)
-from urllib.parse import unquote
+from urllib.parse import (unquote, urlsplit, urljoin)
+from arelle.WebCacheIndex import WebCacheIndex
 
 def proxyDirFmt(httpProxyTuple):
     if isinstance(httpProxyTuple,tuple) and len(httpProxyTuple) == 5:
@@ -39,6 +41,72 @@ def lastModifiedTime(headers):
                 return time.mktime(hdrTime)
     return None
     
+class HttpConnectionPool:
+    # keep-alive connections by (scheme, host), shared by the threads fetching into the web cache
+    def __init__(self, maxIdlePerHost=4, timeout=60):
+        self.maxIdlePerHost = maxIdlePerHost
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.idleConnections = defaultdict(list)
+        
+    def open(self, url, headers, maxRedirects=10):
+        # returns (response, connection) of a GET of url following redirects, response is to be read
+        # and released; error statuses (including 304 not modified) raise HTTPError as urllib does
+        for redirects in range(maxRedirects + 1):
+            response, connection = self.request(url, headers)
+            status = response.status
+            if 200 <= status < 300:
+                return response, connection
+            response.read() # allows reuse of the connection
+            self.release(response, connection)
+            location = response.getheader("location")
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            raise HTTPError(url, status, response.reason, response.msg, None)
+        raise HTTPError(url, status, _("too many redirections"), response.msg, None)
+        
+    def request(self, url, headers):
+        scheme, netloc, path, query, fragment = urlsplit(url)
+        key = (scheme, netloc)
+        if query:
+            path += "?" + query
+        while True:
+            with self.lock:
+                idle = self.idleConnections[key]
+                connection = idle.pop() if idle else None
+            isReused = connection is not None
+            if not isReused:
+                connectionClass = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+                connection = connectionClass(netloc, timeout=self.timeout)
+                connection.poolKey = key
+            try:
+                connection.request("GET", path or "/", headers=headers)
+                return connection.getresponse(), connection
+            except (http.client.HTTPException, EnvironmentError):
+                connection.close()
+                if not isReused:
+                    raise
+                # server closed an idle keep-alive connection, retry on another
+            
+    def release(self, response, connection):
+        if response.isclosed() and not response.will_close: # fully read and kept alive
+            with self.lock:
+                idle = self.idleConnections[connection.poolKey]
+                if len(idle) < self.maxIdlePerHost:
+                    idle.append(connection)
+                    return
+        connection.close()
+        
+    def close(self):
+        with self.lock:
+            for idle in self.idleConnections.values():
+                for connection in idle:
+                    connection.close()
+            self.idleConnections.clear()
+
+def urlHost(url):
+    return urlsplit(url)[1]
 
 class WebCache:
     
@@ -60,19 +128,35 @@ class WebCache:
             self.cacheDir = cntlr.userAppDir + os.sep + "cache"
         self.workOffline = False
         self.maxAgeSeconds = 60.0 * 60.0 * 24.0 * 7.0 # seconds before checking again for file
-        self.urlCheckPickleFile = cntlr.userAppDir + os.sep + "cachedUrlCheckTimes.pickle"
+        self.index = WebCacheIndex(self.cacheDir + os.sep + "cacheIndex.sqlite")
+        self.importUrlCheckTimes(cntlr.userAppDir + os.sep + "cachedUrlCheckTimes.pickle",
+                                 cntlr.userAppDir + os.sep + "cachedUrlETags.pickle")
+            
+    def importUrlCheckTimes(self, urlCheckPickleFile, urlETagPickleFile):
+        # check times and ETags of prior versions are moved into the index
+        if not os.path.exists(urlCheckPickleFile):
+            return
         try:
-            with open(self.urlCheckPickleFile, 'rb') as f:
-                self.cachedUrlCheckTimes = pickle.load(f)
+            with open(urlCheckPickleFile, 'rb') as f:
+                cachedUrlCheckTimes = pickle.load(f)
         except Exception:
-            self.cachedUrlCheckTimes = {}
-        self.cachedUrlCheckTimesModified = False
-            
-    def saveUrlCheckTimes(self):
-        if self.cachedUrlCheckTimesModified:
-            with open(self.urlCheckPickleFile, 'wb') as f:
-                pickle.dump(self.cachedUrlCheckTimes, f, pickle.HIGHEST_PROTOCOL)
-        self.cachedUrlCheckTimesModified = False
+            cachedUrlCheckTimes = {}
+        try:
+            with open(urlETagPickleFile, 'rb') as f:
+                cachedUrlETags = pickle.load(f)
+        except Exception:
+            cachedUrlETags = {}
+        entries = []
+        for url, checked in cachedUrlCheckTimes.items():
+            filepath = self.urlCacheFilepath(url)
+            if os.path.exists(filepath):
+                entries.append((url, filepath, checked, cachedUrlETags.get(url), os.path.getsize(filepath)))
+        self.index.importEntries(entries)
+        for pickleFile in (urlCheckPickleFile, urlETagPickleFile):
+            try:
+                os.remove(pickleFile)
+            except EnvironmentError:
+                pass
         
     def resetProxies(self, httpProxyTuple):
         self.proxy_handler = urllib.request.ProxyHandler(proxyDirFmt(httpProxyTuple))
@@ -80,11 +164,25 @@ class WebCache:
         self.http_auth_handler = urllib.request.HTTPBasicAuthHandler()
 
         self.opener = urllib.request.build_opener(self.proxy_handler, self.proxy_auth_handler, self.http_auth_handler)
+        
+        # proxied and authenticated requests go through the opener, others through pooled keep-alive connections
+        if getattr(self, "httpPool", None) is not None:
+            self.httpPool.close()
+        self.httpPool = None if self.proxy_handler.proxies.get("http") else HttpConnectionPool()
+        self.authenticatedHosts = set()
 
         #self.opener.close()
         #self.opener = WebCacheUrlOpener(self.cntlr, proxyDirFmt(httpProxyTuple))
         
     
+    def forked(self):
+        # in a forked process: the keep-alive connections and index connection inherited from the parent
+        # process are left referenced, never used or closed (which would disturb the parent's), new ones are opened
+        self.inheritedConnections = (self.httpPool, self.index)
+        if self.httpPool is not None:
+            self.httpPool = HttpConnectionPool()
+        self.index = WebCacheIndex(self.index.filename, self.index.timeout)
+        
     def normalizeUrl(self, url, base=None):
         if url and not (url.startswith('http://') or os.path.isabs(url)):
             if base is not None and not base.startswith('http:') and '%' in url:
@@ -110,43 +208,44 @@ class WebCache:
                 normedPath = urlparts[0] + '://' + urlparts[2].replace('\\','/')
         return normedPath
     
-    def getfilename(self, url, base=None, reload=False):
+    def getfilename(self, url, base=None, reload=False, deferErrors=False):
+        # with deferErrors (such as by a discovery prefetch thread) a retrieval error returns None
+        # without being reported or switching to work offline, the caller retries to report it
         if url is None:
             return url
         if base is not None:
             url = self.normalizeUrl(url, base)
         if url.startswith('http://'):
-            # form cache file name
-            filepath = self.cacheDir + os.sep + 'http' + os.sep + url[7:]
-            # handle default directory requests
-            if filepath.endswith("/"):
-                filepath += "default.unknown"
-            if os.sep == '\\':
-                filepath = filepath.replace('/', '\\')
+            filepath = self.urlCacheFilepath(url)
             if self.workOffline:
                 return filepath
-            filepathtmp = filepath + ".tmp"
+            # unique to the fetching process and thread
+            filepathtmp = "{0}.{1}-{2}.tmp".format(filepath, os.getpid(), threading.get_ident())
             timeNow = time.time()
             if not reload and os.path.exists(filepath):
-                if timeNow - self.cachedUrlCheckTimes.get(url, 0.0) > self.maxAgeSeconds:
-                    # weekly check if newer file exists
-                    newerOnWeb = False
-                    try: # no provision here for proxy authentication!!!
-                        remoteFileTime = lastModifiedTime( self.getheaders(url) )
-                        if remoteFileTime and remoteFileTime > os.path.getmtime(filepath):
-                            newerOnWeb = True
-                    except:
-                        pass # for now, forget about authentication here
-                    if not newerOnWeb:
-                        # update ctime by copying file and return old file
-                        self.cachedUrlCheckTimes[url] = timeNow
-                        self.cachedUrlCheckTimesModified = True
-                        return filepath
-                else:
+                indexEntry = self.index.entry(url)
+                if indexEntry is not None and timeNow - (indexEntry[1] or 0.0) <= self.maxAgeSeconds:
                     return filepath
+                # weekly check if newer file exists, a conditional request retrieves it only if so
+                try: # no provision here for proxy authentication!!!
+                    self.progressUrl = url
+                    savedfile, headers = self.retrieve(url,
+                                                       filename=filepathtmp,
+                                                       reporthook=self.reportProgress,
+                                                       ifModifiedSince=os.path.getmtime(filepath),
+                                                       etag=indexEntry[2] if indexEntry is not None else None)
+                except:
+                    savedfile = None # for now, forget about authentication here
+                if savedfile is None:
+                    # not newer on web, keep cached file
+                    if os.path.exists(filepathtmp):
+                        os.remove(filepathtmp)
+                    self.index.checked(url, filepath, timeNow, os.path.getsize(filepath))
+                    return filepath
+                return self.cacheRetrievedFile(url, filepath, filepathtmp, headers, timeNow)
             filedir = os.path.dirname(filepath)
             if not os.path.exists(filedir):
-                os.makedirs(filedir)
+                os.makedirs(filedir, exist_ok=True) # may be concurrently made by another fetching thread
             # Retrieve over HTTP and cache, using rename to avoid collisions
             # self.modelManager.addToLog('web caching: {0}'.format(url))
             
@@ -155,11 +254,18 @@ class WebCache:
             while retryCount > 0:
                 try:
                     self.progressUrl = url
-                    savedfile, headers = self.retrieve(
-                    #savedfile, headers = self.opener.retrieve(
-                                      url,
-                                      filename=filepathtmp,
-                                      reporthook=self.reportProgress)
+                    try:
+                        savedfile, headers = self.retrieve(
+                        #savedfile, headers = self.opener.retrieve(
+                                          url,
+                                          filename=filepathtmp,
+                                          reporthook=self.reportProgress)
+                    except Exception:
+                        if deferErrors:
+                            if os.path.exists(filepathtmp):
+                                os.remove(filepathtmp)
+                            return None
+                        raise
                     retryCount = 0
                 except ContentTooShortError as err:
                     self.cntlr.addToLog(_("{0} \nretrieving {1}").format(err,url))
@@ -178,6 +284,7 @@ class WebCache:
                                     userPwd = self.cntlr.internet_user_password(host, realm)
                                     if isinstance(userPwd,tuple):
                                         self.http_auth_handler.add_password(realm=realm,uri=host,user=userPwd[0],passwd=userPwd[1]) 
+                                        self.authenticatedHosts.add(urlHost(url))
                                         retryCount -= 1
                                         continue
                                 self.cntlr.addToLog(_("'{0}' www-authentication for realm '{1}' is required to access {2}\n{3}").format(scheme, realm, url, err))
@@ -205,16 +312,7 @@ class WebCache:
                     self.workOffline = True
                     return filepath
                 
-                # rename temporarily named downloaded file to desired name                
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-                os.rename(filepathtmp, filepath)
-                webFileTime = lastModifiedTime(headers)
-                if webFileTime: # set mtime to web mtime
-                    os.utime(filepath,(webFileTime,webFileTime))
-                self.cachedUrlCheckTimes[url] = timeNow
-                self.cachedUrlCheckTimesModified = True
-                return filepath
+                return self.cacheRetrievedFile(url, filepath, filepathtmp, headers, timeNow)
         
         if url.startswith("file://"): url = url[7:]
         elif url.startswith("file:\\"): url = url[6:]
@@ -222,6 +320,39 @@ class WebCache:
             url = url.replace('/', '\\')
         return url
     
+    def urlCacheFilepath(self, url):
+        # form cache file name
+        filepath = self.cacheDir + os.sep + 'http' + os.sep + url[7:]
+        # handle default directory requests
+        if filepath.endswith("/"):
+            filepath += "default.unknown"
+        if os.sep == '\\':
+            filepath = filepath.replace('/', '\\')
+        return filepath
+    
+    def cacheRetrievedFile(self, url, filepath, filepathtmp, headers, timeNow):
+        webFileTime = lastModifiedTime(headers)
+        if webFileTime: # set mtime to web mtime
+            os.utime(filepathtmp,(webFileTime,webFileTime))
+        with open(filepathtmp, 'rb') as f:
+            hash = hashlib.sha256(f.read()).hexdigest()
+        size = os.path.getsize(filepathtmp)
+        # rename temporarily named downloaded file to desired name, replacing atomically so other
+        # processes sharing the cache never see a partial file
+        os.replace(filepathtmp, filepath)
+        self.index.update(url, filepath, timeNow, headers["etag"], size, hash)
+        return filepath
+    
+    def getfilenames(self, urls, base=None, maxWorkers=8):
+        # fetches urls concurrently into the cache, returns their filenames in order of urls
+        from concurrent.futures import ThreadPoolExecutor
+        if base is not None:
+            urls = [self.normalizeUrl(url, base) for url in urls]
+        uniqueUrls = list(set(urls))
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            filenames = dict(zip(uniqueUrls, executor.map(self.getfilename, uniqueUrls)))
+        return [filenames[url] for url in urls]
+    
     def reportProgress(self, blockCount, blockSize, totalSize):
         if totalSize > 0:
             self.cntlr.showStatus(_("web caching {0}: {1:.0f} of {2:.0f} KB").format(
@@ -235,6 +366,22 @@ class WebCache:
 
     def clear(self):
         shutil.rmtree(self.cacheDir + os.sep + 'http', True)
+        self.index.clear()
+        
+    def statistics(self):
+        # returns (number of files, total size, oldest check time, newest check time) of indexed files
+        return self.index.statistics()
+    
+    def evict(self, maxSize=None, maxAgeSeconds=None):
+        # removes files last checked before maxAgeSeconds, and least recently checked files
+        # until the total size is under maxSize
+        evictedFilepaths = self.index.evict(maxSize, maxAgeSeconds, time.time())
+        for filepath in evictedFilepaths:
+            try:
+                os.remove(filepath)
+            except EnvironmentError:
+                pass # already removed, or in use by another process
+        return evictedFilepaths
         
     def getheaders(self, url):
         if url and url.startswith('http://'):
@@ -258,8 +405,25 @@ class WebCache:
                 pass
         return None
         
-    def retrieve(self, url, filename, reporthook=None, data=None):
-        fp = self.opener.open(url, data)
+    def retrieve(self, url, filename, reporthook=None, data=None, ifModifiedSince=None, etag=None):
+        # returns (filename, headers), filename is None if not modified since ifModifiedSince or etag
+        requestHeaders = {}
+        if ifModifiedSince:
+            from email.utils import formatdate
+            requestHeaders["If-Modified-Since"] = formatdate(ifModifiedSince, usegmt=True)
+        if etag:
+            requestHeaders["If-None-Match"] = etag
+        connection = None
+        try:
+            if data is None and self.httpPool is not None and urlHost(url) not in self.authenticatedHosts:
+                requestHeaders.update(self.opener.addheaders) # user agent
+                fp, connection = self.httpPool.open(url, requestHeaders)
+            else:
+                fp = self.opener.open(urllib.request.Request(url, data, requestHeaders))
+        except HTTPError as err:
+            if err.code == 304: # not modified
+                return None, err.headers
+            raise
         try:
             headers = fp.info()
             tfp = open(filename, 'wb')
@@ -285,7 +449,10 @@ class WebCache:
             finally:
                 tfp.close()
         finally:
-            fp.close()
+            if connection is not None:
+                self.httpPool.release(fp, connection)
+            else:
+                fp.close()
         # raise exception if actual size does not match content-length header
         if size >= 0 and read < size:
             raise ContentTooShortError(
@@ -0,0 +1,123 @@
+'''
+Created on Oct 18, 2026
+
+Index of the files in the web cache, an sqlite database (in WAL mode) in the cache
+directory, with the url, cached file path, time last checked on the web, ETag, size
+and hash of each file.
+
+Each update is its own statement (autocommit), so several processes sharing a cache
+directory (such as formula workers or separate command line runs) update entries
+atomically instead of rewriting a pickled dictionary after each load.  Connections
+are opened per thread and per process, sqlite3 connections not being shareable.
+
+The index is advisory: if the database can't be opened or is busy past its timeout,
+lookups find no entry and the file is just checked on the web again.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import os, sqlite3, threading
+
+class WebCacheIndex:
+    def __init__(self, filename, timeout=30.0):
+        self.filename = filename
+        self.timeout = timeout
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None or self.local.pid != os.getpid(): # forked processes open their own
+            dir = os.path.dirname(self.filename)
+            if not os.path.exists(dir):
+                os.makedirs(dir, exist_ok=True)
+            connection = sqlite3.connect(self.filename, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS urls ("
+                               "url TEXT PRIMARY KEY, filepath TEXT, checked REAL, etag TEXT, size INTEGER, hash TEXT)")
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None and self.local.pid == os.getpid():
+            connection.close()
+        self.local.connection = None
+
+    def entry(self, url):
+        # returns (filepath, checked, etag, size, hash) of url, or None
+        try:
+            return self.connection.execute(
+                "SELECT filepath, checked, etag, size, hash FROM urls WHERE url = ?", (url,)).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def checked(self, url, filepath, checked, size=None):
+        # records that url was found unchanged on the web (without an upsert, which needs sqlite 3.24)
+        try:
+            connection = self.connection
+            connection.execute(
+                "INSERT OR IGNORE INTO urls (url, filepath, checked, size) VALUES (?, ?, ?, ?)",
+                (url, filepath, checked, size))
+            connection.execute("UPDATE urls SET checked = ? WHERE url = ?", (checked, url))
+        except sqlite3.Error:
+            pass
+
+    def update(self, url, filepath, checked, etag=None, size=None, hash=None):
+        # records a newly retrieved file of url
+        try:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO urls (url, filepath, checked, etag, size, hash) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, filepath, checked, etag, size, hash))
+        except sqlite3.Error:
+            pass
+
+    def importEntries(self, entries):
+        # entries (url, filepath, checked, etag, size) of a prior cache index, kept if already indexed
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO urls (url, filepath, checked, etag, size) VALUES (?, ?, ?, ?, ?)",
+                    entries)
+        except sqlite3.Error:
+            pass
+
+    def statistics(self):
+        # returns (number of files, total size, oldest check time, newest check time)
+        try:
+            return self.connection.execute(
+                "SELECT COUNT(*), TOTAL(size), MIN(checked), MAX(checked) FROM urls").fetchone()
+        except sqlite3.Error:
+            return (0, 0, None, None)
+
+    def evict(self, maxSize=None, maxAgeSeconds=None, timeNow=None):
+        # removes entries checked before maxAgeSeconds, and least recently checked entries
+        # until total size is under maxSize, returns file paths of removed entries
+        evicted = []
+        try:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE") # no other process updates while evicting
+            try:
+                totalSize = connection.execute("SELECT TOTAL(size) FROM urls").fetchone()[0]
+                for url, filepath, checked, size in connection.execute(
+                        "SELECT url, filepath, checked, size FROM urls ORDER BY checked").fetchall():
+                    if not ((maxAgeSeconds is not None and timeNow - (checked or 0.0) > maxAgeSeconds) or
+                            (maxSize is not None and totalSize > maxSize)):
+                        break
+                    connection.execute("DELETE FROM urls WHERE url = ?", (url,))
+                    totalSize -= size or 0
+                    evicted.append(filepath)
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            return []
+        return evicted
+
+    def clear(self):
+        try:
+            self.connection.execute("DELETE FROM urls")
+        except sqlite3.Error:
+            pass
@@ -4,7 +4,8 @@ Created on Dec 30, 2010
 @author: Mark V Systems Limited
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
-import xml.dom
+import xml.dom, operator
+from math import isnan
 from arelle.XPathParser import (VariableRef, QNameDef, OperationDef, RangeDecl, Expr, ProgHeader,
                           exceptionErrorIndication)
 from arelle import (ModelObject, ModelXbrl, XbrlConst, XmlUtil)
@@ -70,6 +71,7 @@ class XPathContext:
         self.progHeader = None
         self.traceType = None
         self.variableSet = None
+        self.profile = None # FormulaProfile accumulating evaluation costs, if profiling
         self.inScopeVars = {} if inScopeVars is None else inScopeVars
         if inputXbrlInstance: 
             self.inScopeVars[XbrlConst.qnStandardInputInstance] = inputXbrlInstance.modelXbrl
@@ -79,6 +81,19 @@ class XPathContext:
         return self.modelXbrl.modelManager.formulaOptions
         
     def evaluate(self, exprStack, contextItem=None, resultStack=None, parentOp=None):
+        if resultStack is None: resultStack =  []
+        if contextItem is None: contextItem = self.contextItem
+        if exprStack and isinstance(exprStack[0], ProgHeader):
+            # parsed programs are compiled on first evaluation and run compiled thereafter
+            if self.profile is not None:
+                return self.profile.evaluate(self, exprStack, contextItem, resultStack, parentOp)
+            progHeader = exprStack[0]
+            if progHeader.compiledProg is None:
+                progHeader.compiledProg = compileProg(exprStack)
+            return progHeader.compiledProg(self, contextItem, resultStack, parentOp)
+        return self.interpret(exprStack, contextItem, resultStack, parentOp)
+        
+    def interpret(self, exprStack, contextItem=None, resultStack=None, parentOp=None):
         if resultStack is None: resultStack =  []
         if contextItem is None: contextItem = self.contextItem
         setProgHeader = False
@@ -443,12 +458,15 @@ class XPathContext:
             targetSequence.extend(targetNodes)
         return targetSequence
         
-    def predicate(self, p, sourceSequence):
+    def predicate(self, p, sourceSequence, argsProg=None):
         targetSequence = []
         sourcePosition = 0
         for item in sourceSequence:
             sourcePosition += 1
-            predicateResult = self.evaluate(p.args, contextItem=item)
+            if argsProg is not None:
+                predicateResult = argsProg(self, item, [], None)
+            else:
+                predicateResult = self.evaluate(p.args, contextItem=item)
             if len(predicateResult) == 1: predicateResult = predicateResult[0] # first result
             if len(predicateResult) == 1 and isinstance(predicateResult[0],(int,float)):
                 result = predicateResult[0]
@@ -475,11 +493,17 @@ class XPathContext:
             return x
         baseXsdType = None
         e = None
+        fact = None
         if isinstance(x, ModelObject.ModelFact):
+            try:
+                return x.atomizedValue # typed value of fact, atomized once
+            except AttributeError:
+                pass
             if x.isTuple:
                 raise XPathException(p, 'err:FOTY0012', _('Atomizing tuple {0} that does not have a typed value').format(x))
             if x.isNil:
                 return []
+            fact = x
             baseXsdType = x.concept.baseXsdType
             v = x.value # resolves default value
             e = x.element
@@ -514,7 +538,10 @@ class XPathContext:
                     v = x.value
         if baseXsdType in ("decimal", "float", "double"):
             try:
-                x = float(v)
+                if fact is not None and not isnan(fact.numericValue):
+                    x = fact.numericValue # float of fact value, from its fact table row
+                else:
+                    x = float(v)
             except ValueError:
                 raise XPathException(p, 'err:FORG0001', _('Atomizing {0} to a {1} does not have a proper value').format(x,baseXsdType))
         elif baseXsdType in ("integer",):
@@ -538,6 +565,8 @@ class XPathContext:
             x = dateTime(v, type=DATETIME)
         elif baseXsdType:
             x = str(v)
+        if fact is not None:
+            fact.atomizedValue = x
         return x
     
     def effectiveBooleanValue(self, p, x):
@@ -591,4 +620,475 @@ class XPathContext:
         if isinstance(x, ModelObject.ModelObject):
             return x.modelXbrl
         return None
-              
\ No newline at end of file
+              
+# compiled evaluation: each exprStack step is compiled once into a closure with its operation
+# dispatch, operand programs and function implementation resolved, constant operands folded,
+# and then run with the same result stack semantics as XPathContext.interpret
+
+kindTestLocalNames = {'attribute', 'comment', 'document-node', 'element', 
+                      'item', 'node', 'processing-instruction', 'schema-attribute', 'schema-element', 'text'}
+
+valueOperators = {'+': operator.add, '-': operator.sub, '*': operator.mul,
+                  'div': operator.truediv, 'idiv': operator.floordiv, 'mod': operator.mod,
+                  'gt': operator.gt, 'ge': operator.ge, 'lt': operator.lt, 'le': operator.le,
+                  'eq': operator.eq, 'ne': operator.ne}
+
+generalOperators = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+                    '=': operator.eq, '!=': operator.ne}
+
+def compileProg(exprStack):
+    try:
+        return stepsProg(compileSteps(exprStack), 
+                         any(isinstance(p, ProgHeader) for p in exprStack))
+    except (IndexError, AttributeError, TypeError, KeyError):
+        # malformed program (e.g. after a parse error), leave its errors to the interpreter
+        def interpretedProg(xc, contextItem, resultStack, parentOp):
+            return xc.interpret(exprStack, contextItem, resultStack, parentOp)
+        return interpretedProg
+
+def stepsProg(steps, resetsProgHeader=False):
+    stepFunctions = tuple(step for step, constant in steps)
+    def prog(xc, contextItem, resultStack, parentOp):
+        if contextItem is None: contextItem = xc.contextItem
+        for step in stepFunctions:
+            result = step(xc, contextItem, resultStack, parentOp)
+            if result is not None:   # note: result can be False which gets appended to resultStack
+                resultStack.append( xc.flattenSequence( result ) )
+        if resetsProgHeader:
+            xc.progHeader = None
+        return resultStack
+    return prog
+
+def compileArgs(args):
+    # returns the program for an operation's args and, when all args are constant,
+    # their (flattened) result stack
+    steps = compileSteps(args)
+    if all(constant is not None for step, constant in steps):
+        values = [constantSequence(constant[0]) for step, constant in steps]
+        def constantProg(xc, contextItem, resultStack, parentOp):
+            resultStack.extend(list(value) for value in values)
+            return resultStack
+        return constantProg, values
+    return stepsProg(steps), None
+
+def constantSequence(value):
+    return list(value) if isinstance(value, list) else [value]
+
+def constantStep(value):
+    def step(xc, contextItem, resultStack, parentOp):
+        return value
+    return (step, (value,))
+
+def compileSteps(exprStack):
+    steps = []  # (step closure, (constant value,) or None)
+    for p in exprStack:
+        if isinstance(p,(str,int,float)):
+            steps.append(constantStep(p))
+        elif isinstance(p,VariableRef):
+            steps.append((variableRefStep(p.name), None))
+        elif isinstance(p,QNameDef):
+            steps.append((axisStep(p), None))
+        elif isinstance(p,OperationDef):
+            step = compileOperation(p, steps)
+            if step is not None:
+                steps.append(step)
+        elif isinstance(p,ProgHeader):
+            steps.append((progHeaderStep(p), None))
+    return steps
+
+def variableRefStep(name):
+    def step(xc, contextItem, resultStack, parentOp):
+        return xc.inScopeVars.get(name)
+    return step
+
+def axisStep(p):
+    def step(xc, contextItem, resultStack, parentOp):
+        if len(resultStack) == 0 or not xc.isNodeSequence(resultStack[-1]):
+            resultStack.append( [ contextItem, ] )
+        return xc.stepAxis(parentOp, p, resultStack.pop() )
+    return step
+
+def progHeaderStep(p):
+    from arelle.ModelFormulaObject import Trace
+    setsTraceType = p.traceType not in (Trace.MESSAGE, Trace.CUSTOM_FUNCTION)
+    def step(xc, contextItem, resultStack, parentOp):
+        xc.progHeader = p
+        if setsTraceType: 
+            xc.traceType = p.traceType
+    return step
+
+def compileOperation(p, steps):
+    # returns (step, constant) for the operation, folding a constant left operand on steps
+    op = p.name
+    if isinstance(op, QNameDef): # function call
+        return (functionCallStep(p, op, compileArgs(p.args)[0]), None)
+    elif op in valueOperators or op == 'to':
+        argsProg, argsValues = compileArgs(p.args)
+        if op != 'to' and argsValues is not None and steps and steps[-1][1] is not None:
+            s1 = constantSequence(steps[-1][1][0])
+            s2 = [x for value in argsValues for x in value]
+            if len(s1) == 1 and len(s2) == 1:
+                op1 = s1[0]
+                op2 = s2[0]
+                if ((isinstance(op1,(int,float)) and isinstance(op2,(int,float))) or
+                    (isinstance(op1,str) and isinstance(op2,str))):
+                    try:
+                        folded = valueOperators[op](op1, op2)
+                        steps.pop()
+                        return constantStep(folded)
+                    except (TypeError, ValueError, ArithmeticError):
+                        pass # not folded, raised when evaluated
+        return (valueOperationStep(p, op, argsProg), None)
+    elif op in generalOperators:
+        return (generalComparisonStep(p, generalOperators[op], compileArgs(p.args)[0]), None)
+    elif op in {'is', '>>', '<<'}:
+        return (nodeComparisonStep(p, op, compileArgs(p.args)[0]), None)
+    elif op in {'intersect','except','union','|'}:
+        return (nodeOperationStep(p, op, compileArgs(p.args)[0]), None)
+    elif op in {'and', 'or'}:
+        return (logicalOperationStep(p, op, compileArgs(p.args)[0]), None)
+    elif op in {'u+', 'u-'}:
+        argsProg, argsValues = compileArgs(p.args)
+        if argsValues is not None:
+            s1 = [x for value in argsValues for x in value]
+            if len(s1) == 1 and isinstance(s1[0],(int,float)):
+                return constantStep(s1[0] if op == 'u+' else -s1[0])
+        return (unaryOperationStep(p, op, argsProg), None)
+    elif op == 'instance':
+        return (instanceOfStep(p), None)
+    elif op == 'sequence':
+        argsProg, argsValues = compileArgs(p.args)
+        if argsValues is not None:
+            return constantStep([x for value in argsValues for x in value])
+        def sequenceStep(xc, contextItem, resultStack, parentOp):
+            return argsProg(xc, contextItem, [], None)
+        return (sequenceStep, None)
+    elif op == 'predicate':
+        argsProg = compileArgs(p.args)[0]
+        def predicateStep(xc, contextItem, resultStack, parentOp):
+            return xc.predicate(p, resultStack.pop(), argsProg)
+        return (predicateStep, None)
+    elif op in {'for','some','every'}:
+        rangeVarsProg = compileRangeVars(op, p.args[0], p.args[1:])
+        def rangeStep(xc, contextItem, resultStack, parentOp):
+            result = []
+            rangeVarsProg(xc, contextItem, result)
+            return result
+        return (rangeStep, None)
+    elif op == 'if':
+        testProg = compileArgs(p.args[0].expr[0])[0]
+        thenProg = compileArgs(p.args[1].args)[0]
+        elseProg = compileArgs(p.args[2].args)[0]
+        def ifStep(xc, contextItem, resultStack, parentOp):
+            if xc.effectiveBooleanValue( p, testProg(xc, contextItem, [], None) ):
+                return thenProg(xc, contextItem, [], None)
+            return elseProg(xc, contextItem, [], None)
+        return (ifStep, None)
+    elif op == '.':
+        def contextItemStep(xc, contextItem, resultStack, parentOp):
+            return contextItem
+        return (contextItemStep, None)
+    elif op == '..':
+        def parentStep(xc, contextItem, resultStack, parentOp):
+            return XmlUtil.parent(contextItem.element 
+                                  if isinstance(contextItem, ModelObject.ModelObject)
+                                  else contextItem)
+        return (parentStep, None)
+    elif op in ('/', '//', 'rootChild', 'rootDescendant'):
+        return (pathStep(p, op, compileArgs(p.args)[0]), None)
+    return None # no result, as interpreted
+
+def functionCallStep(p, op, argsProg):
+    from arelle import (FunctionXs, FunctionFn, FunctionXfi, FunctionCustom)
+    ns = op.namespaceURI; localname = op.localName
+    # resolve the function implementation once, custom functions are looked up when called
+    if op.unprefixed and localname in kindTestLocalNames:
+        def call(xc, contextItem, resultStack, parentOp, args):
+            # step axis operation
+            if len(resultStack) == 0 or not xc.isNodeSequence(resultStack[-1]):
+                if isinstance(contextItem, (tuple,list)):
+                    resultStack.append( contextItem )
+                else:
+                    resultStack.append( [ contextItem, ] )
+            return xc.stepAxis(parentOp, p, resultStack.pop() )
+    elif op.unprefixed or ns == XbrlConst.fn:
+        fnFunction = FunctionFn.fnFunctions.get(localname)
+        def call(xc, contextItem, resultStack, parentOp, args):
+            try:
+                if fnFunction is None: raise FunctionFn.fnFunctionNotAvailable()
+                return fnFunction(xc, p, contextItem, args)
+            except FunctionFn.fnFunctionNotAvailable:
+                raise FunctionNotAvailable("fn:{0}".format(localname))
+    elif ns == XbrlConst.xfi or ns == XbrlConst.xff:
+        xfiFunction = FunctionXfi.xfiFunctions.get(localname)
+        def call(xc, contextItem, resultStack, parentOp, args):
+            try:
+                if xfiFunction is None: raise FunctionXfi.xfiFunctionNotAvailable()
+                return xfiFunction(xc, p, args)
+            except FunctionXfi.xfiFunctionNotAvailable:
+                raise FunctionNotAvailable("xfi:{0}".format(localname))
+    elif ns == XbrlConst.xsd:
+        def call(xc, contextItem, resultStack, parentOp, args):
+            return FunctionXs.call(xc, p, localname, args)
+    else:
+        def call(xc, contextItem, resultStack, parentOp, args):
+            raise XPathException(p, 'err:XPST0017', _('Function call not identified.'))
+    def step(xc, contextItem, resultStack, parentOp):
+        args = argsProg(xc, contextItem, [], None)
+        try:
+            if op in xc.modelXbrl.modelCustomFunctionSignatures:
+                return FunctionCustom.call(xc, p, op, contextItem, args)
+            return call(xc, contextItem, resultStack, parentOp, args)
+        except FunctionNumArgs:
+            raise XPathException(p, 'err:XPST0017', _('Number of arguments do not match signature arity.'))
+        except FunctionArgType as err:
+            raise XPathException(p, 'err:XPTY0004', _('Argument {0} does not match expected type {1}.')
+                                 .format(err.argNum, err.expectedType))
+        except FunctionNotAvailable:
+            raise XPathException(p, 'arelle:functDeferred', _('Function {0} is not available in this build.')
+                                 .format(str(op)))
+    return step
+
+def numericOperand(xc, p, x):
+    # number of a single numeric item or fact (by its cached typed value), else None
+    if isinstance(x, list) and len(x) == 1:
+        x = x[0]
+    if isinstance(x, ModelObject.ModelFact):
+        x = xc.atomize(p, x)
+    if type(x) in (float, int):
+        return x
+    return None
+
+def valueOperationStep(p, op, argsProg):
+    from arelle.FunctionUtil import (testTypeCompatiblity)
+    operation = valueOperators.get(op)
+    def step(xc, contextItem, resultStack, parentOp):
+        # binary arithmetic operations and value comparisons
+        x1 = resultStack.pop() if len(resultStack) > 0 else []
+        x2 = argsProg(xc, contextItem, [], None) # result stack of the right operand, such as [[fact]]
+        # numeric operands, such as of value assertions on fact sums, need no sequence or type checks
+        op1 = numericOperand(xc, p, x1)
+        op2 = numericOperand(xc, p, x2[0] if len(x2) == 1 else x2) if op1 is not None else None
+        if op2 is not None and operation is not None:
+            try:
+                return operation(op1, op2)
+            except ZeroDivisionError:
+                raise XPathException(p, 'err:FOAR0001', _('Attempt to divide by zero: {0} {1} {2}.')
+                                     .format(op1, op, op2))
+        s1 = xc.atomize( p, x1 )
+        s2 = xc.atomize( p, x2 )
+        if len(s1) > 1 or len(s2) > 1:
+            raise XPathException(p, 'err:XPTY0004', _("Value operation '{0}' sequence length error").format(op))
+        if len(s1) == 0 or len(s2) == 0:
+            return []
+        op1 = s1[0]
+        op2 = s2[0]
+        testTypeCompatiblity( xc, p, op, op1, op2 )
+        if op == 'to':
+            return range( int(op1), int(op2) + 1 )
+        try:
+            return operation(op1, op2)
+        except ZeroDivisionError:
+            raise XPathException(p, 'err:FOAR0001', _('Attempt to divide by zero: {0} {1} {2}.')
+                                 .format(op1, op, op2))
+    return step
+
+def generalComparisonStep(p, operation, argsProg):
+    def step(xc, contextItem, resultStack, parentOp):
+        x1 = resultStack.pop() if len(resultStack) > 0 else []
+        x2 = argsProg(xc, contextItem, [], None)
+        op1 = numericOperand(xc, p, x1)
+        op2 = numericOperand(xc, p, x2[0] if len(x2) == 1 else x2) if op1 is not None else None
+        if op2 is not None:
+            return operation(op1, op2)
+        s1 = xc.atomize( p, x1 )
+        s2 = xc.atomize( p, x2 )
+        result = []
+        for op1 in s1:
+            for op2 in s2:
+                result = operation(op1, op2)
+                if result:
+                    break
+            if result:
+                break
+        return result
+    return step
+
+def nodeComparisonStep(p, op, argsProg):
+    def step(xc, contextItem, resultStack, parentOp):
+        s1 = resultStack.pop() if len(resultStack) > 0 else []
+        s2 = argsProg(xc, contextItem, [], None)
+        if len(s1) > 1 or len(s2) > 1 or not xc.isNodeSequence(s1) or not xc.isNodeSequence(s2[0]):
+            raise XPathException(p, 'err:XPTY0004', _('Node comparison sequence error'))
+        if len(s1) == 0 or len(s2[0]) == 0:
+            return []
+        n1 = s1[0]
+        if isinstance(n1,ModelObject.ModelObject): n1 = n1.element
+        n2 = s2[0][0]
+        if isinstance(n2,ModelObject.ModelObject): n2 = n2.element
+        result = False;
+        for op1 in s1:
+            for op2 in s2:
+                if op == 'is':
+                    result = n1 == n2
+                elif op == '>>':
+                    result = op1 > op2
+                elif op == '<<':
+                    result = op1 <= op2
+            if result:
+                break
+        return result
+    return step
+
+def nodeOperationStep(p, op, argsProg):
+    def step(xc, contextItem, resultStack, parentOp):
+        s1 = resultStack.pop() if len(resultStack) > 0 else []
+        s2 = xc.flattenSequence(argsProg(xc, contextItem, [], None))
+        if not xc.isNodeSequence(s1) or not xc.isNodeSequence(s2):
+            raise XPathException(p, 'err:XPTY0004', _('Node operation sequence error'))
+        set1 = set(s1)
+        set2 = set(s2)
+        if op == 'intersect':
+            resultset = set1 & set2
+        elif op == 'except':
+            resultset = set1 - set2
+        else: # union or |
+            resultset = set1 | set2
+        # convert to a list in document order
+        return xc.documentOrderedNodes(resultset)
+    return step
+
+def logicalOperationStep(p, op, argsProg):
+    isAnd = op == 'and'
+    def step(xc, contextItem, resultStack, parentOp):
+        if len(resultStack) == 0:
+            return []
+        op1 = xc.effectiveBooleanValue( p, resultStack.pop() )
+        op2 = xc.effectiveBooleanValue( p, argsProg(xc, contextItem, [], None) )
+        if isAnd:
+            return op1 and op2
+        return op1 or op2
+    return step
+
+def unaryOperationStep(p, op, argsProg):
+    isMinus = op == 'u-'
+    def step(xc, contextItem, resultStack, parentOp):
+        s1 = xc.atomize( p, argsProg(xc, contextItem, [], None) )
+        if len(s1) > 1:
+            raise XPathException(p, 'err:XPTY0004', _('Unary expression sequence length error'))
+        if len(s1) == 0:
+            return []
+        if isMinus:
+            return -s1[0]
+        return s1[0]
+    return step
+
+def instanceOfStep(p):
+    xsdTypes = {"integer": int,
+                "string": str,
+                "decimal": float,
+                "double": float,
+                "float": float,
+                "boolean": bool,
+                "QName": QName,
+                "anyURI": AnyURI,
+                "date": DateTime,
+                "dateTime": DateTime}
+    def step(xc, contextItem, resultStack, parentOp):
+        result = False
+        s1 = xc.flattenSequence( resultStack.pop() ) if len(resultStack) > 0 else []
+        arity = len(s1)
+        if len(p.args) > 1:
+            occurenceIndicator = p.args[1]
+            if (occurenceIndicator == '?' and arity in (0,1) ) or \
+               (occurenceIndicator == '+' and arity >= 1) or \
+               (occurenceIndicator == '*'):
+                result = True
+        elif arity == 1:
+            result = True
+        if result and len(p.args) > 0:
+            t = p.args[0]
+            for x in s1:
+                if isinstance(t, QNameDef):
+                    if t.namespaceURI == XbrlConst.xsd:
+                        type = xsdTypes.get(t.localName)
+                        if type:
+                            result = isinstance(x, type)
+                            if result and type == DateTime:
+                                result = x.dateOnly == (t.localName == "date")
+                elif isinstance(t, OperationDef):
+                    if t.name == "element" and isinstance(x,xml.dom.Node):
+                        if len(t.args) >= 1:
+                            qn = t.args[0]
+                            if qn== '*' or (isinstance(qn,QNameDef) and qn == x):
+                                result = True
+                                if len(t.args) >= 2 and isinstance(t.args[1],QNameDef):
+                                    modelXbrl = x.ownerDocument.modelDocument.modelXbrl
+                                    modelConcept = modelXbrl.qnameConcepts.get(qname(x))
+                                    if not modelConcept.instanceOfType(t.args[1]):
+                                        result = False
+                if not result: 
+                    break
+        return result
+    return step
+
+def compileRangeVars(op, p, args):
+    if isinstance(p, RangeDecl):
+        bindingProg = compileArgs(p.bindingSeq)[0]
+        nextProg = compileRangeVars(op, args[0], args[1:])
+        rvQname = p.rangeVar.name
+        def rangeVarProg(xc, contextItem, result):
+            r = bindingProg(xc, contextItem, [], None)
+            if len(r) == 1: # should be an expr single
+                r = r[0]
+                if hasattr(r, '__iter__') and not isinstance(r, str):
+                    if len(r) == 1 and isinstance(r[0],range):
+                        r = r[0]
+                    hasPrevValue = rvQname in xc.inScopeVars
+                    if hasPrevValue: 
+                        prevValue = xc.inScopeVars[rvQname]
+                    for rv in r:
+                        xc.inScopeVars[rvQname] = rv 
+                        nextProg(xc, contextItem, result)
+                        if op != 'for' and len(result) > 0:
+                            break   # short circuit evaluation
+                    if op == 'every' and len(result) == 0:
+                        result.append( True )   # true if no false result returned during iteration
+                    if hasPrevValue: 
+                        xc.inScopeVars[rvQname] = prevValue
+        return rangeVarProg
+    elif isinstance(p, Expr) and p.name == 'return':
+        exprProg = compileArgs(p.expr)[0]
+        def returnProg(xc, contextItem, result):
+            result.append( exprProg(xc, contextItem, [], None) )
+        return returnProg
+    elif isinstance(p, Expr) and p.name == 'satisfies':
+        exprProg = compileArgs(p.expr)[0]
+        def satisfiesProg(xc, contextItem, result):
+            boolresult = xc.effectiveBooleanValue(p, exprProg(xc, contextItem, [], None))
+            if (op == 'every') != boolresult:
+                # stop short circuit eval
+                result.append( boolresult )
+        return satisfiesProg
+    def noProg(xc, contextItem, result):
+        pass
+    return noProg
+
+def pathStep(p, op, argsProg):
+    isRootStep = op in ('rootChild', 'rootDescendant')
+    if isRootStep:
+        op = '/' if op == 'rootChild' else '//'
+    def step(xc, contextItem, resultStack, parentOp):
+        if isRootStep:
+            # fix up for multi-instance
+            resultStack.append( [xc.inputXbrlInstance.xmlDocument,] )
+        # contains QNameDefs and predicates
+        if len(resultStack) > 0:
+            innerFocusNodes = resultStack.pop()
+        else:
+            innerFocusNodes = contextItem
+        navSequence = []
+        for innerFocusNode in xc.flattenSequence(innerFocusNodes):
+            argsProg(xc, innerFocusNode, navSequence, op)
+        return xc.documentOrderedNodes(xc.flattenSequence(navSequence))
+    return step
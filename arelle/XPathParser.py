@@ -8,18 +8,42 @@ from arelle.pyparsing.pyparsing_py3 import (Word, Keyword, alphas, ParseExceptio
                  Literal, CaselessLiteral,
                  Combine, Optional, nums, Or, Forward, Group, ZeroOrMore, StringEnd, alphanums,
                  ParserElement, quotedString, delimitedList, Suppress, Regex)
+from arelle.pyparsing.pyparsing_py3 import ParseResults
 from arelle.Locale import format_string
-import time, xml.dom
-from arelle import (XmlUtil, ModelValue, XbrlConst)
+import time, xml.dom, os, re, pickle, copyreg, threading
+from arelle import (XmlUtil, ModelValue, XbrlConst, Version)
 
 
 # Debugging flag can be set to either "debug_flag=True" or "debug_flag=False"
 debug_flag=True
 
-exprStack = []
-xmlElement = None
-modelXbrl = None
-xbrlResource = None
+class ParserContext:
+    # state of one parse, which the grammar's parse actions build
+    def __init__(self, modelXbrl, xmlElement):
+        self.modelXbrl = modelXbrl
+        self.xmlElement = xmlElement
+        self.exprStack = []
+        self.hasErrors = False
+    def error(self, message, severity, code):
+        self.hasErrors = True
+        self.modelXbrl.error(message, severity, code)
+
+# the grammar's parse actions find the context of the parse running on their thread,
+# parses are serialized by grammarLock as pyparsing's packrat cache is shared by all parses
+parsingContexts = threading.local()
+grammarLock = threading.RLock()
+
+def parserContext():
+    return parsingContexts.current
+
+def parseWithContext(context, normalizedExpr):
+    with grammarLock:
+        priorContext = getattr(parsingContexts, "current", None)
+        parsingContexts.current = context
+        try:
+            return xpathExpr.parseString( normalizedExpr, parseAll=True )
+        finally:
+            parsingContexts.current = priorContext
 
 class ProgHeader:
     def __init__(self, modelObject, name, element, sourceStr, traceType):
@@ -28,27 +52,28 @@ class ProgHeader:
         self.element = element
         self.sourceStr = sourceStr
         self.traceType = traceType
+        self.compiledProg = None # compiled by XPathContext on first evaluation
     def __repr__(self):
         return ("ProgHeader({0},{1})".format(self.name,self.modelObject))
 
 def pushFirst( sourceStr, loc, toks ):
-    exprStack.append( toks[0] )
+    parserContext().exprStack.append( toks[0] )
 
 def pushFloat( sourceStr, loc, toks ):
     num = float(toks[0])
-    exprStack.append( num )
+    parserContext().exprStack.append( num )
     return num
 
 def pushInt( sourceStr, loc, toks ):
     num = int(toks[0])
-    exprStack.append( num )
+    parserContext().exprStack.append( num )
     return num
 
 def pushQuotedString( sourceStr, loc, toks ):
     str = toks[0]
     q = str[0]
     dequotedStr = str[1:-1].replace(q+q,q)
-    exprStack.append( dequotedStr )
+    parserContext().exprStack.append( dequotedStr )
     return dequotedStr
 
 class QNameDef(ModelValue.QName):
@@ -59,6 +84,8 @@ class QNameDef(ModelValue.QName):
         self.loc = loc
     def __hash__(self):
         return self.hash
+    def __reduce__(self):
+        return (QNameDef, (self.loc, self.prefix, self.namespaceURI, self.localName, self.isAttribute))
     def __repr__(self):
         return ("{0}QName({1})".format('@' if self.isAttribute else '',str(self)))
     def __eq__(self,other):
@@ -70,17 +97,20 @@ class QNameDef(ModelValue.QName):
     	return not self.__eq__(other)
 
 def pushQName( sourceStr, loc, toks ):
+    context = parserContext()
+    exprStack = context.exprStack
+    xmlElement = context.xmlElement
     qname = toks[0]
     if xmlElement:
         nsLocalname = XmlUtil.prefixedNameToNamespaceLocalname(xmlElement, qname)
         if nsLocalname is None:
-            modelXbrl.error(
+            context.error(
                 _("QName prefix not defined for {0}").format(qname),
                   "err","err:XPST0081")
             return
         if (nsLocalname == (XbrlConst.xff,"uncovered-aspect") and
             xmlElement.localName not in ("formula", "consistencyAssertion", "valueAssertion")):
-                modelXbrl.error(
+                context.error(
                     _("Function {0} cannot be used on an XPath expression associated with a {1}").format(qname, xmlElement.localName),
                       "err","xffe:invalidFunctionUse")
     else:
@@ -92,6 +122,7 @@ def pushQName( sourceStr, loc, toks ):
     return q
 
 def pushAttr( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     # usually has QName of attr already on exprstack, get rid of it
     if toks[0] == '@' and len(exprStack) > 0 and len(toks) > 1 and exprStack[-1] == toks[1]:
         exprStack.remove(toks[1])
@@ -116,6 +147,7 @@ class OpDef:
     	return not self.__eq__(other)
 
 def pushOp( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     op = OpDef(loc, toks)
     # assure this operand not already on stack
     if len(exprStack) == 0 or exprStack[-1] != op: 
@@ -137,9 +169,10 @@ class OperationDef:
                     toks1 = QNameDef(loc,None,'*',toks1[2:])
                 elif toks1.endswith(':*'):
                     prefix = toks1[:-2]
-                    ns = XmlUtil.xmlns(xmlElement, prefix)
+                    context = parserContext()
+                    ns = XmlUtil.xmlns(context.xmlElement, prefix)
                     if ns is None:
-                        modelXbrl.error(
+                        context.error(
                             _("wildcard prefix not defined for {0}").format(toks1),
                               "err","err:XPST0081")
                     toks1 = QNameDef(loc,prefix,ns,'*')
@@ -158,6 +191,7 @@ class OperationDef:
             return ("{1} {0}".format(self.name, self.args))
 
 def pushOperation( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     if isinstance(toks[0], str):
         name = toks[0]
         removeOp = False
@@ -179,6 +213,7 @@ def pushOperation( sourceStr, loc, toks ):
     return operation
 
 def pushUnaryOperation( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     if isinstance(toks[0], str):
         operation = OperationDef(sourceStr, loc, 'u' + toks[0], toks, True)
         exprStack.append(operation)
@@ -188,12 +223,14 @@ def pushUnaryOperation( sourceStr, loc, toks ):
     return operation
 
 def pushFunction( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     name = toks[0]
     operation = OperationDef(sourceStr, loc, name, toks, True)
     exprStack[exprStack.index(toks[0]):] = [operation]  # replace tokens with production
     return operation
 
 def pushSequence( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     operation = OperationDef(sourceStr, loc, 'sequence', toks, False)
     if len(toks) == 0:  # empty sequence
         exprStack.append(operation)
@@ -202,12 +239,14 @@ def pushSequence( sourceStr, loc, toks ):
     return operation
 
 def pushPredicate( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     # drop the predicate op, used to clean expression stack
     predicate = OperationDef(sourceStr, loc, 'predicate', toks[1:], False)
     exprStack[exprStack.index(toks[0]):] = [predicate]  # replace tokens with production
     return predicate
 
 def pushRootStep( sourceStr, loc, toks ):
+    exprStack = parserContext().exprStack
     # drop the predicate op, used to clean expression stack
     if toks[0] == '/':
         op = 'rootChild'
@@ -235,14 +274,15 @@ class VariableRef:
         return ("variableRef('{0}')".format(self.name))
 
 def pushVarRef( sourceStr, loc, toks ):
-    qname = ModelValue.qname(xmlElement, toks[0][1:], noPrefixIsNoNamespace=True)
+    context = parserContext()
+    qname = ModelValue.qname(context.xmlElement, toks[0][1:], noPrefixIsNoNamespace=True)
     if qname is None:
-        modelXbrl.error(
+        context.error(
             _("QName prefix not defined for variable reference ${0}").format(toks[0][1:]),
               "err","err:XPST0081")
         qname = ModelValue.qname(XbrlConst.xpath2err,"XPST0081") # use as qname to allow parsing to complete
     varRef = VariableRef(loc, qname)
-    exprStack.append( varRef )
+    context.exprStack.append( varRef )
     return varRef
 
 class RangeDecl:
@@ -255,6 +295,7 @@ class RangeDecl:
 
 def pushRangeVar( sourceStr, loc, toks ):
     rangeDecl = RangeDecl(loc, toks)
+    exprStack = parserContext().exprStack
     exprStack[exprStack.index(rangeDecl.rangeVar):] = [rangeDecl]  # replace tokens with production
     return rangeDecl
 
@@ -268,6 +309,7 @@ class Expr:
 
 def pushExpr( sourceStr, loc, toks ):
     expr = Expr(loc, toks)
+    exprStack = parserContext().exprStack
     exprStack[exprStack.index(toks[0]):] = [expr]  # replace tokens with production
     return expr
 
@@ -540,20 +582,107 @@ def normalizeExpr(expr):
     return ''.join(result)
 
 isInitialized = False
+isGrammarInitialized = False
 
 def initializeParser(modelObject):
     global isInitialized
     if not isInitialized:
         modelManager = modelObject.modelXbrl.modelManager
-        modelManager.showStatus(_("Initializing formula xpath2 grammar"))
-        startedAt = time.time()
-        xpathExpr.parseString( "0", parseAll=True )
-        modelManager.addToLog(format_string(modelManager.locale, 
-                                    _("Formula xpath2 grammar initialized in %.2f secs"), 
-                                    time.time() - startedAt))
-        modelManager.showStatus(None)
+        if modelManager.xpathParseCache:
+            loadParseCache(modelManager)
         isInitialized = True
 
+def initializeGrammar(modelManager):
+    # deferred until an expression is not in the parse cache
+    global isGrammarInitialized
+    with grammarLock:
+        if not isGrammarInitialized:
+            modelManager.showStatus(_("Initializing formula xpath2 grammar"))
+            startedAt = time.time()
+            parseWithContext(ParserContext(None, None), "0")
+            modelManager.addToLog(format_string(modelManager.locale, 
+                                        _("Formula xpath2 grammar initialized in %.2f secs"), 
+                                        time.time() - startedAt))
+            modelManager.showStatus(None)
+            isGrammarInitialized = True
+
+# parsed programs (less their ProgHeader) by normalized expression and the namespace bindings
+# of the prefixes it may use, shared by the parses of all documents in the process and, with
+# the modelManager xpathParseCache option, persisted in the web cache for subsequent processes
+parseCache = {}
+parseCacheModified = False
+parseCacheHits = parseCacheLookups = 0   # for the formula profile
+# prefixes are matched by the NCName characters of XML 1.0 (5th edition), such as my.pfx of my.pfx:elt
+ncNameStartChars = ("A-Z_a-z\u00C0-\u00D6\u00D8-\u00F6\u00F8-\u02FF\u0370-\u037D\u037F-\u1FFF\u200C-\u200D"
+                    "\u2070-\u218F\u2C00-\u2FEF\u3001-\uD7FF\uF900-\uFDCF\uFDF0-\uFFFD\U00010000-\U000EFFFF")
+ncNameChars = ncNameStartChars + "0-9\u00B7\u0300-\u036F\u203F-\u2040.-"
+prefixPattern = re.compile("([{0}][{1}]*):".format(ncNameStartChars, ncNameChars))
+
+def parseCacheKey(normalizedExpr, element):
+    if element is None:
+        return (normalizedExpr,)
+    return (normalizedExpr,
+            element.localName in ("formula", "consistencyAssertion", "valueAssertion"), # for uncovered-aspect
+            XmlUtil.xmlns(element, None),
+            tuple((prefix, XmlUtil.xmlns(element, prefix))
+                  for prefix in sorted(set(prefixPattern.findall(normalizedExpr)))))
+
+def parseCacheFilename(modelManager):
+    return os.path.join(modelManager.cntlr.webCache.cacheDir, "xpathParseCache.pickle")
+
+class ParseCachePickler(pickle.Pickler):
+    # parse results (of grouped tokens) are pickled by their tokens
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[ParseResults] = lambda parseResults: (ParseResults, (list(parseResults),))
+
+# the only classes a parse cache file may construct, it is in the web cache directory which other
+# users or processes may write, so unpickling anything else (such as a callable) is refused
+parseCacheClasses = {("arelle.XPathParser", "QNameDef"), ("arelle.XPathParser", "OpDef"),
+                     ("arelle.XPathParser", "OperationDef"), ("arelle.XPathParser", "VariableRef"),
+                     ("arelle.XPathParser", "RangeDecl"), ("arelle.XPathParser", "Expr"),
+                     ("arelle.ModelValue", "internedQname"),
+                     ("arelle.pyparsing.pyparsing_py3", "ParseResults")}
+
+class ParseCacheUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module, name) not in parseCacheClasses:
+            raise pickle.UnpicklingError("{0}.{1} is not a parsed program class".format(module, name))
+        return super().find_class(module, name)
+
+def loadParseCache(modelManager):
+    try:
+        with open(parseCacheFilename(modelManager), "rb") as f:
+            version, cachedProgs = ParseCacheUnpickler(f).load()
+        if version == Version.version and isinstance(cachedProgs, dict):
+            for cacheKey, prog in cachedProgs.items():
+                if isinstance(cacheKey, tuple) and isinstance(prog, tuple):
+                    parseCache.setdefault(cacheKey, prog)
+    except (EnvironmentError, EOFError, ValueError, TypeError, AttributeError, ImportError,
+            IndexError, KeyError, pickle.UnpicklingError):
+        pass # missing, partially written, from an incompatible version, or not a parse cache
+
+def saveParseCache(modelManager):
+    global parseCacheModified
+    if not modelManager.xpathParseCache or not parseCacheModified:
+        return
+    filename = parseCacheFilename(modelManager)
+    try:
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # unique to the saving process and thread, replaced atomically so other processes sharing
+        # the cache directory never read a partial file (the last process saving wins)
+        tmpFilename = "{0}.{1}-{2}.tmp".format(filename, os.getpid(), threading.get_ident())
+        try:
+            with open(tmpFilename, "wb") as f:
+                ParseCachePickler(f, pickle.HIGHEST_PROTOCOL).dump((Version.version, dict(parseCache)))
+            os.replace(tmpFilename, filename)
+        finally:
+            if os.path.exists(tmpFilename):
+                os.remove(tmpFilename)
+        parseCacheModified = False
+    except (EnvironmentError, pickle.PicklingError) as err:
+        modelManager.addToLog(_("XPath parse cache not saved: {0}").format(err))
+
 def exceptionErrorIndication(exception):
     errorAt = exception.column
     source = ''
@@ -586,12 +715,10 @@ def staticExpressionFunctionContext():
     
 def parse(modelObject, xpathExpression, element, name, traceType):
     from arelle.ModelFormulaObject import Trace
-    global modelXbrl
+    global parseCacheModified, parseCacheHits, parseCacheLookups
     modelXbrl = modelObject.modelXbrl
-    global exprStack
-    exprStack = []
-    global xmlElement
-    xmlElement = element
+    context = ParserContext(modelXbrl, element)
+    exprStack = context.exprStack
 
     # throws ParseException
     if xpathExpression and len(xpathExpression) > 0:
@@ -610,7 +737,18 @@ def parse(modelObject, xpathExpression, element, name, traceType):
                     "info", "formula:trace")
             exprStack.append( ProgHeader(modelObject,name,element,normalizedExpr,traceType) )
 
-            L = xpathExpr.parseString( normalizedExpr, parseAll=True )
+            cacheKey = parseCacheKey(normalizedExpr, element)
+            cachedProg = parseCache.get(cacheKey)
+            parseCacheLookups += 1
+            if cachedProg is not None:
+                parseCacheHits += 1
+                exprStack.extend(cachedProg)
+            else:
+                initializeGrammar(modelXbrl.modelManager)
+                L = parseWithContext( context, normalizedExpr )
+                if not context.hasErrors: # parses with errors are not cached, to report them again
+                    parseCache[cacheKey] = tuple(exprStack[1:])
+                    parseCacheModified = True
             
             #modelXbrl.error( _("AST {0} {1}").format(name, L),
             #    "info", "formula:trace")
@@ -632,18 +770,7 @@ def parse(modelObject, xpathExpression, element, name, traceType):
                 _("Parsing terminated in {0} due to error: {1} \n{2}").format(name,
                      err, normalizedExpr), 
                 "err", "parser:unableToParse")
-        
-        '''
-        code = []
-        compile(exprStack, code)
-        pyCode = ''.join(code)
-        val.modelXbrl.error(
-            _("PyCode {0} {1}").format(
-                 name,
-                 pyCode),
-            "info", "formula:trace")
-        return pyCode
-        '''
+
         return exprStack
     return None
 
@@ -679,88 +806,7 @@ def variableReferences(exprStack, varRefSet, element, rangeVars=None):
         if localRangeVar in rangeVars:
             rangeVars.remove(localRangeVar)
 
-'''
-pyOpForXPathOp = {
-    '+': '+', '-':'-', '*':'*', ',':',',
-    'div': '/', 'idiv': '/', 'mod':'%', 
-    'gt': '>', 'ge': '>=', 'eq':'==', 'ne':'!=', 'lt':'<', 'le':'<=',
-    '>': '>', '>=': '>=', '=':'==', '!=':'!=', '<':'<', '<=':'<=',
-    }
-pyGeneratorExprOp = { 'for':'flatten(tuple(', 'some':'any(', 'every':'all('}
-pyGeneratorExprEnd = { 'for':'))', 'some':')', 'every':')'}
-
-def compile(exprStack, code, inScopeVars=None):
-    if inScopeVars is None: inScopeVars = []
-    codeStartIndex = len(code)
-    for p in exprStack:
-        if isinstance(p,str):
-            code.append(p.__repr__())
-        elif isinstance(p,int) or isinstance(p,float):
-            code.append(str(p))
-        elif isinstance(p,VariableRef):
-            code.append((" {0} ","variables.get({0})")[p.name in inScopeVars].format(p.name))
-        elif isinstance(p,QNameDef):
-            code.append(" '{0}' ".format(p.name))
-        elif isinstance(p,OperationDef):
-            op = p.name
-            if isinstance(op, QNameDef):
-                code.append("{0}(".format(op.name))
-                compile(p.args, code)
-                code.append(")")
-            elif op in pyOpForXPathOp:
-                code.append(" {0} ".format(pyOpForXPathOp[p.name]))
-                compile(p.args, code)
-            elif op in ('u+', 'u-'):
-                code.append(" {0}".format(op[1]))
-                compile(p.args, code)
-            elif op == "sequence":
-                code.append('(')
-                compile(p.args, code)
-                code.append(')')
-            elif op == "predicate":
-                code.append('predicate(')
-                compile(p.args, code)
-                code.append(')')
-            elif op == "range":
-                code.insert(codeStartIndex, 'range(')
-                code.append(', ')
-                compile(p.args, code)
-                code.append(' + 1 )')
-            elif op in pyGeneratorExprOp: # for, some, every
-                code.append('{0}'.format(pyGeneratorExprOp[op]))
-                rangeVars = tuple(rv.rangeVar.name for rv in p.args[0:-1])
-                # operation has all in-scope variables
-                for rv in rangeVars: inScopeVars.append(rv)
-                compile(p.args[-1:], code)   # return expression
-                for rv in rangeVars: inScopeVars.remove(rv)
-                # for clauses have prior in-scope variables
-                for i in range(len(p.args) - 1):
-                    if i > 0: inScopeVars.append(rangeVars[i-1])
-                    compile(p.args[i:i+1], code) # for expression
-                for i in range(len(p.args) - 2): inScopeVars.remove(rangeVars[i])
-                code.append(pyGeneratorExprEnd[op])
-            elif op == "pathRoot":
-                code.append(" self.stepAxis(self.inputXbrlInstance.xmlRootElement) ")
-                compile(p.args, code)
-            elif op == "/":
-                code.append(" .stepAxis('child::' ")
-                compile(p.args, code)
-                code.append(" )")
-            elif op == "//":
-                code.append(" .stepAxis('descendant::' ")
-                compile(p.args, code)
-                code.append(" )")
-        elif isinstance(p,OpDef):
-            op = p.name
-            if op in pyOpForXPathOp:
-                code.append("{0}".format(pyOpForXPathOp[p.name]))
-        elif isinstance(p,RangeDecl):
-            code.append(' for {0} in '.format(p.rangeVar.name))
-            compile(p.bindingSeq, code)
-        elif isinstance(p,Expr):
-            if p.name in ("return","satisfies"):
-                compile(p.expr, code)
-'''
+# parsed programs are compiled to python closures by XPathContext.compileProg
                 
 def codeModule(code):
     return \
@@ -901,12 +947,12 @@ def parser_unit_test():
                  "//*[@id eq 'context-for-xpath-rule']//xbrldi:explicitMember[2]",
                  ):
         # Start with a blank exprStack and a blank varStack
-        exprStack = []
-        xmlElement = None
+        context = ParserContext(None, None)
+        exprStack = context.exprStack
 
         # try parsing the input string
         try:
-            L=xpathExpr.parseString( normalizeExpr( test ), parseAll=True )
+            L=parseWithContext( context, normalizeExpr( test ) )
         except (ParseException, ParseSyntaxException) as err:
             L=['Parse Failure',test,err]
         
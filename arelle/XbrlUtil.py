@@ -47,6 +47,28 @@ def sEqual(dts1, elt1, elt2, equalMode=S_EQUAL, excludeIDs=False, dts2=None, ns2
             return False
     return True
 
+def sEqualKey(dts, elt, equalMode=S_EQUAL, excludeIDs=False):
+    # hashable key of elt for hash indexing, elements that are sEqual have equal keys
+    # (elements with equal keys may still not be sEqual, so matches are confirmed by sEqual)
+    modelConcept = dts.qnameConcepts.get(ModelValue.qname(elt))
+    text = XmlUtil.text(elt)
+    if modelConcept:
+        baseXsdType = modelConcept.baseXsdType
+        if len(text) == 0 and modelConcept.default is not None:
+            text = modelConcept.default
+    else:
+        baseXsdType = None
+    childKeys = tuple(sEqualKey(dts, child, equalMode, excludeIDs) for child in childElements(elt))
+    key = (elt.namespaceURI, elt.localName, 
+           xTypeValue(baseXsdType, elt, elt, text, equalMode),
+           frozenset(attributeSet(dts, modelConcept, elt, (), equalMode, excludeIDs)),
+           childKeys)
+    try:
+        hash(key)
+    except TypeError: # typed value is not hashable, key by element names only
+        key = (elt.namespaceURI, elt.localName, childKeys)
+    return key
+
 def attributeSet(modelXbrl, modelConcept, elt, exclusions=(), equalMode=S_EQUAL, excludeIDs=False, ns2ns1Tbl=None):
     attrs = set()
     for i in range(len(elt.attributes)):
@@ -136,9 +158,10 @@ def xTypeValue(baseXsdType, elt, node, value, equalMode=S_EQUAL):
             return value.strip()
     return value
 
-def vEqual(modelConcept1, node1, modelConcept2, node2):
-    text1 = XmlUtil.text(node1)
-    text2 = XmlUtil.text(node2)
+def vEqual(modelConcept1, node1, modelConcept2, node2, text1=None, text2=None):
+    # text is provided for facts without nodes, such as streamed facts
+    if text1 is None: text1 = XmlUtil.text(node1)
+    if text2 is None: text2 = XmlUtil.text(node2)
     if modelConcept1:
         baseXsdType1 = modelConcept1.baseXsdType
         if len(text1) == 0 and modelConcept1.default is not None:
@@ -0,0 +1,469 @@
+'''
+Created on Oct 18, 2026
+
+lxml loader mode for model documents
+
+Documents parsed here are lxml trees whose element classes also provide the subset
+of the xml.dom.minidom node interface that Arelle uses (nodeType, localName,
+namespaceURI, getAttribute(NS), childNodes, parentNode, attributes, ...), so that
+ModelObject.element can be an lxml element without changing the model, validation
+and formula code, while parsing is done by libxml2 and nodes are held in C memory.
+
+Text, attribute and document nodes are lightweight python objects created on access.
+The typed values set by XmlValidate (xValue and xValid) of an element and of its
+attributes are held by the element proxy, which lxml discards (with its python
+attributes) when no longer referenced.  Elements of model objects (such as facts,
+contexts and dimension values) keep their proxies, and thus their typed values, for
+the life of the model; the typed values of other elements are a cache, which is
+recomputed (XbrlUtil.typedValue validates again) or read from the text (xTypeValue)
+when the proxy has been discarded, rather than pinning a proxy of every validated
+element for the life of the document.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import xml.dom
+from lxml import etree
+from arelle import XbrlConst
+
+XMLSyntaxError = etree.XMLSyntaxError
+xmlnsNamespace = "http://www.w3.org/2000/xmlns/"
+
+def parse(file):
+    source = file.read()
+    encoding = None
+    if isinstance(source, str): # e.g., from ValidateFilingText.checkfile
+        from arelle.XmlUtil import xmlEncodingPattern
+        match = xmlEncodingPattern.match(source[0:200])
+        if match:
+            encoding = match.group(1)
+        source = source.encode("utf-8")
+        parser = etree.XMLParser(encoding="utf-8", huge_tree=True)
+    else:
+        parser = etree.XMLParser(huge_tree=True)
+    parser.set_element_class_lookup(classLookup)
+    tree = etree.fromstring(source, parser).getroottree()
+    if encoding is None:
+        encoding = tree.docinfo.encoding if b"encoding" in source[0:200] else None
+    return LxmlDocument(tree, encoding)
+
+def iterparse(file):
+    # (event, element) of start and end tags as file is parsed, for streaming large instances
+    events = etree.iterparse(file, events=("start", "end"), huge_tree=True)
+    events.set_element_class_lookup(classLookup)
+    return events
+
+def qualifiedName(element, namespaceURI, localName):
+    if not namespaceURI:
+        return localName
+    if namespaceURI == XbrlConst.xml:
+        return "xml:" + localName
+    prefix = None
+    for nsPrefix, nsURI in element.nsmap.items():
+        if nsURI == namespaceURI:
+            prefix = nsPrefix
+            if prefix: break
+    return prefix + ":" + localName if prefix else localName
+
+def clarkName(element, name):
+    # name is as for minidom getAttribute, e.g., "id", "xml:lang", "xsi:schemaLocation"
+    prefix, sep, localName = name.partition(":")
+    if not sep:
+        return name
+    if prefix == "xml":
+        return "{" + XbrlConst.xml + "}" + localName
+    ns = element.nsmap.get(prefix)
+    if ns is None:
+        return name
+    return "{" + ns + "}" + localName
+
+def lxmlTags(namespaceURI, localNames, wildNamespaceURI=False):
+    # lxml iteration tags for XmlUtil's (namespaceURI, localNames) arguments
+    if wildNamespaceURI or namespaceURI == "*":
+        nsPart = "{*}"
+    else:
+        nsPart = "{" + (namespaceURI or "") + "}"
+    if localNames == ("*",):
+        if nsPart == "{*}":
+            return (etree.Element,)
+        return (nsPart + "*",)
+    return tuple(nsPart + localName for localName in localNames)
+
+def xmlnsDeclarations(element):
+    # namespace declarations made on this element (lxml does not treat them as attributes)
+    parent = element.getparent()
+    parentNsmap = parent.nsmap if parent is not None else {}
+    return [(prefix, ns) for prefix, ns in element.nsmap.items() if parentNsmap.get(prefix) != ns]
+
+class LxmlDocument(xml.dom.Node):
+    nodeType = 9
+    localName = None
+    namespaceURI = None
+    prefix = None
+    tagName = None
+    parentNode = None
+    nodeValue = None
+
+    def __init__(self, tree, encoding):
+        self.tree = tree
+        self.documentElement = tree.getroot()
+        self.documentElement._ownerDocument = self
+        self.version = tree.docinfo.xml_version
+        self.encoding = encoding
+
+    def __bool__(self):
+        return True
+
+    def _get_encoding(self): # minidom accessor of the xml declaration encoding, used for inline documents
+        return self.encoding
+
+    @property
+    def childNodes(self):
+        root = self.documentElement
+        if root is None:
+            return []
+        return list(reversed(list(root.itersiblings(preceding=True)))) + [root] + list(root.itersiblings())
+
+    @property
+    def firstChild(self):
+        childNodes = self.childNodes
+        return childNodes[0] if childNodes else None
+
+    def getElementsByTagNameNS(self, namespaceURI, localName):
+        return self.documentElement.getElementsByTagNameNS(namespaceURI, localName, includeSelf=True)
+
+    def getElementsByTagName(self, name):
+        return self.documentElement.getElementsByTagName(name, includeSelf=True)
+
+    def getElementById(self, id):
+        for element in self.documentElement.iter(etree.Element):
+            if element.get("id") == id:
+                return element
+        return None
+
+    def toxml(self, encoding=None):
+        return etree.tostring(self.tree, encoding=encoding or "unicode")
+
+    def unlink(self):
+        if self.documentElement is not None:
+            self.documentElement._ownerDocument = None
+        self.documentElement = None
+        self.tree = None
+
+class LxmlTypedValueMixin:
+    # xValue and xValid of XmlValidate, held by the element proxy for the element and its attributes
+    def typedValues(self):
+        element = self.ownerElement if self.nodeType == 2 else self
+        return element.__dict__.setdefault("_typedValues", {})
+
+    def typedValue(self, name):
+        try:
+            return self.typedValues()[(self.typedValueKey(), name)]
+        except KeyError:
+            raise AttributeError(name) # not validated, as hasattr(node, "xValid") tests
+
+    @property
+    def xValue(self):
+        return self.typedValue("xValue")
+
+    @xValue.setter
+    def xValue(self, value):
+        self.typedValues()[(self.typedValueKey(), "xValue")] = value
+
+    @property
+    def xValid(self):
+        return self.typedValue("xValid")
+
+    @xValid.setter
+    def xValid(self, value):
+        self.typedValues()[(self.typedValueKey(), "xValid")] = value
+
+class LxmlText(xml.dom.Node):
+    __slots__ = ("nodeValue", "parentNode")
+    nodeType = 3
+    localName = None
+    namespaceURI = None
+    prefix = None
+    childNodes = ()
+
+    def __init__(self, nodeValue, parentNode):
+        self.nodeValue = nodeValue
+        self.parentNode = parentNode
+
+    @property
+    def data(self):
+        return self.nodeValue
+
+    def __repr__(self):
+        return "<LxmlText {0!r}>".format(self.nodeValue[:20])
+
+class LxmlAttr(LxmlTypedValueMixin, xml.dom.Node):
+    nodeType = 2
+    childNodes = ()
+    parentNode = None
+
+    def typedValueKey(self):
+        return self.name
+
+    def __init__(self, ownerElement, name, namespaceURI, localName, prefix, value):
+        self.ownerElement = ownerElement
+        self.name = name
+        self.namespaceURI = namespaceURI
+        self.localName = localName
+        self.prefix = prefix
+        self.value = value
+
+    @property
+    def nodeValue(self):
+        return self.value
+
+    @property
+    def nodeName(self):
+        return self.name
+
+    def __repr__(self):
+        return "<LxmlAttr {0}={1!r}>".format(self.name, self.value)
+
+class LxmlAttributes:
+    # minidom NamedNodeMap work-alike, xmlns declarations are included as attributes
+    def __init__(self, element):
+        self.attrs = []
+        for prefix, ns in xmlnsDeclarations(element):
+            if prefix:
+                self.attrs.append(LxmlAttr(element, "xmlns:" + prefix, xmlnsNamespace, prefix, "xmlns", ns))
+            else:
+                self.attrs.append(LxmlAttr(element, "xmlns", xmlnsNamespace, "xmlns", None, ns))
+        for clark, value in element.attrib.items():
+            if clark[0] == "{":
+                ns, sep, localName = clark[1:].partition("}")
+                name = qualifiedName(element, ns, localName)
+                prefix = name.partition(":")[0] if ":" in name else None
+                self.attrs.append(LxmlAttr(element, name, ns, localName, prefix, value))
+            else:
+                self.attrs.append(LxmlAttr(element, clark, None, clark, None, value))
+
+    def __len__(self):
+        return len(self.attrs)
+
+    @property
+    def length(self):
+        return len(self.attrs)
+
+    def item(self, index):
+        try:
+            return self.attrs[index]
+        except IndexError:
+            return None
+
+    def keys(self):
+        return [attr.name for attr in self.attrs]
+
+    def items(self):
+        return [(attr.name, attr.value) for attr in self.attrs]
+
+    def values(self):
+        return list(self.attrs)
+
+    def getNamedItem(self, name):
+        for attr in self.attrs:
+            if attr.name == name:
+                return attr
+        return None
+
+    def getNamedItemNS(self, namespaceURI, localName):
+        for attr in self.attrs:
+            if attr.namespaceURI == namespaceURI and attr.localName == localName:
+                return attr
+        return None
+
+    def __getitem__(self, name):
+        attr = self.getNamedItem(name)
+        if attr is None:
+            raise KeyError(name)
+        return attr
+
+class LxmlNodeMixin:
+    # minidom sibling and parent navigation shared by element, comment and processing instruction classes
+    def __bool__(self):
+        return True # lxml elements without children are otherwise false
+
+    @property
+    def __iter__(self):
+        # minidom nodes are not iterable, sequences of nodes are flattened by hasattr(x, '__iter__') tests
+        raise AttributeError("__iter__")
+
+    @property
+    def parentNode(self):
+        parent = self.getparent()
+        if parent is None:
+            return self.ownerDocument
+        return parent
+
+    @property
+    def ownerDocument(self):
+        return getattr(self.getroottree().getroot(), "_ownerDocument", None)
+
+    @property
+    def previousSibling(self):
+        # text nodes of an element are its text, and the tail of each child (document children have no text nodes)
+        parent = self.getparent()
+        previous = self.getprevious()
+        if parent is None:
+            return previous
+        if previous is not None:
+            if previous.tail:
+                return LxmlText(previous.tail, parent)
+            return previous
+        if parent.text:
+            return LxmlText(parent.text, parent)
+        return None
+
+    @property
+    def nextSibling(self):
+        parent = self.getparent()
+        if parent is not None and self.tail:
+            return LxmlText(self.tail, parent)
+        return self.getnext()
+
+    def tailNodes(self, nodes, parentNode):
+        nodes.append(self)
+        if self.tail:
+            nodes.append(LxmlText(self.tail, parentNode))
+
+class LxmlElement(LxmlNodeMixin, LxmlTypedValueMixin, etree.ElementBase, xml.dom.Node):
+    nodeType = 1
+    nodeValue = None
+
+    def typedValueKey(self):
+        return None
+
+    @property
+    def localName(self):
+        tag = self.tag
+        if tag[0] == "{":
+            return tag.rpartition("}")[2]
+        return tag
+
+    @property
+    def namespaceURI(self):
+        tag = self.tag
+        if tag[0] == "{":
+            return tag[1:].partition("}")[0]
+        return None
+
+    @property
+    def tagName(self):
+        prefix = self.prefix
+        return prefix + ":" + self.localName if prefix else self.localName
+
+    @property
+    def nodeName(self):
+        return self.tagName
+
+    @property
+    def childNodes(self):
+        nodes = []
+        if self.text:
+            nodes.append(LxmlText(self.text, self))
+        for child in self.iterchildren():
+            child.tailNodes(nodes, self)
+        return nodes
+
+    @property
+    def firstChild(self):
+        if self.text:
+            return LxmlText(self.text, self)
+        for child in self.iterchildren():
+            return child
+        return None
+
+    @property
+    def attributes(self):
+        try:
+            return self._attributes
+        except AttributeError:
+            self._attributes = LxmlAttributes(self)
+            return self._attributes
+
+    def getAttribute(self, name):
+        if name.startswith("xmlns"):
+            attr = self.attributes.getNamedItem(name)
+            return attr.value if attr is not None else ""
+        return self.get(clarkName(self, name), "")
+
+    def hasAttribute(self, name):
+        if name.startswith("xmlns"):
+            return self.attributes.getNamedItem(name) is not None
+        return clarkName(self, name) in self.attrib
+
+    def getAttributeNS(self, namespaceURI, localName):
+        if namespaceURI == xmlnsNamespace:
+            attr = self.attributes.getNamedItemNS(namespaceURI, localName)
+            return attr.value if attr is not None else ""
+        return self.get("{" + namespaceURI + "}" + localName if namespaceURI else localName, "")
+
+    def hasAttributeNS(self, namespaceURI, localName):
+        if namespaceURI == xmlnsNamespace:
+            return self.attributes.getNamedItemNS(namespaceURI, localName) is not None
+        return ("{" + namespaceURI + "}" + localName if namespaceURI else localName) in self.attrib
+
+    def getAttributeNode(self, name):
+        return self.attributes.getNamedItem(name)
+
+    def getAttributeNodeNS(self, namespaceURI, localName):
+        return self.attributes.getNamedItemNS(namespaceURI, localName)
+
+    def getElementsByTagNameNS(self, namespaceURI, localName, includeSelf=False):
+        tag = lxmlTags(namespaceURI, (localName,))[0]
+        if includeSelf:
+            return list(self.iter(tag))
+        return list(self.iterdescendants(tag))
+
+    def getElementsByTagName(self, name, includeSelf=False):
+        elements = self.iter(etree.Element) if includeSelf else self.iterdescendants(etree.Element)
+        if name == "*":
+            return list(elements)
+        return [element for element in elements if element.tagName == name]
+
+    def hasChildNodes(self):
+        return bool(self.text) or len(self) > 0
+
+    def setIdAttribute(self, name):
+        pass # ids are located by getElementById without marking
+
+    def toxml(self):
+        return etree.tostring(self, encoding="unicode", with_tail=False)
+
+class LxmlComment(LxmlNodeMixin, etree.CommentBase, xml.dom.Node):
+    nodeType = 8
+    localName = None
+    namespaceURI = None
+    prefix = None
+    childNodes = ()
+
+    @property
+    def nodeValue(self):
+        return self.text
+
+    @property
+    def data(self):
+        return self.text
+
+class LxmlProcessingInstruction(LxmlNodeMixin, etree.PIBase, xml.dom.Node):
+    nodeType = 7
+    localName = None
+    namespaceURI = None
+    prefix = None
+    childNodes = ()
+
+    @property
+    def nodeValue(self):
+        return self.text
+
+    @property
+    def data(self):
+        return self.text
+
+classLookup = etree.ElementDefaultClassLookup(element=LxmlElement,
+                                              comment=LxmlComment,
+                                              pi=LxmlProcessingInstruction)
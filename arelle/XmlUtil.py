@@ -6,6 +6,10 @@ Created on Oct 22, 2010
 '''
 import re, datetime, xml.dom.minidom, xml.dom
 from arelle import XbrlConst
+try:
+    from arelle.XmlLxml import LxmlElement, lxmlTags
+except ImportError: # lxml not installed, only minidom documents are loaded
+    class LxmlElement: pass
 
 datetimePattern = re.compile('\s*([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})\s*|'
                              '\s*([0-9]{4})-([0-9]{2})-([0-9]{2})\s*')
@@ -19,6 +23,8 @@ def xmlns(element, prefix):
         return XbrlConst.xml
     else:
         xmlnsattr = "xmlns:" + prefix
+    if isinstance(element, LxmlElement):
+        return element.nsmap.get(prefix or None)
     ns = None
     treeElt = element
     while treeElt.nodeType == 1:
@@ -126,9 +132,13 @@ def childText(element, childNamespaceURI, childLocalNames):
 
 def textNotStripped(element):
     if not element: return ""   
+    if isinstance(element, LxmlElement):
+        return (element.text or "") + "".join(child.tail for child in element.iterchildren() if child.tail)
     return "".join(child.nodeValue for child in element.childNodes if child.nodeType == 3 or child.nodeType == 4)
 
 def innerText(element, ixExclude=False):   
+    if isinstance(element, LxmlElement) and not ixExclude:
+        return "".join(element.itertext()).strip()
     try:
         return "".join(child.nodeValue for child in innerTextNodes(element, ixExclude, [])).strip()
     except TypeError:
@@ -158,6 +168,10 @@ def parentId(element, parentNamespaceURI, parentLocalName):
     
 def hasChild(element, childNamespaceURI, childLocalNames):
     if not isinstance(childLocalNames,tuple): childLocalNames = (childLocalNames ,)
+    if isinstance(element, LxmlElement):
+        for child in element.iterchildren(*lxmlTags(childNamespaceURI, childLocalNames)):
+            return True
+        return False
     wildLocalName = childLocalNames == ('*',)
     for child in element.childNodes:
         if child.nodeType == 1 and child.namespaceURI == childNamespaceURI and \
@@ -219,6 +233,8 @@ def children(element, childNamespaceURI, childLocalNames):
     if not isinstance(childLocalNames,tuple): childLocalNames = (childLocalNames ,)
     wildLocalName = childLocalNames == ('*',)
     wildNamespaceURI = not childNamespaceURI or childNamespaceURI == '*'
+    if isinstance(element, LxmlElement):
+        return list(element.iterchildren(*lxmlTags(childNamespaceURI, childLocalNames, wildNamespaceURI)))
     if element is not None:
         for child in element.childNodes:
             if child.nodeType == 1 and \
@@ -228,6 +244,12 @@ def children(element, childNamespaceURI, childLocalNames):
     return children
 
 def child(element, childNamespaceURI, childLocalNames):
+    if isinstance(element, LxmlElement):
+        if not isinstance(childLocalNames,tuple): childLocalNames = (childLocalNames ,)
+        wildNamespaceURI = not childNamespaceURI or childNamespaceURI == '*'
+        for child in element.iterchildren(*lxmlTags(childNamespaceURI, childLocalNames, wildNamespaceURI)):
+            return child
+        return None
     result = children(element, childNamespaceURI, childLocalNames)
     if result and len(result) > 0:
         return result[0]
@@ -285,7 +307,7 @@ def copyNodes(parent, elts):
     from arelle.ModelValue import (qname)
     document = parent.ownerDocument
     xmlnsElement = document.documentElement
-    for origElt in elts if hasattr(elts, '__iter__') else (elts,):
+    for origElt in (elts,) if isinstance(elts, xml.dom.Node) or not hasattr(elts, '__iter__') else elts:
         copyElt = document.createElementNS(origElt.namespaceURI, 
                                            addQnameValue(document.documentElement, qname(origElt)))
         parent.appendChild(copyElt)
@@ -348,6 +370,13 @@ def childrenAttrs(element, childNamespaceURI, childLocalNames, attrLocalName):
     return childrenAttrs
 
 def descendant(element, descendantNamespaceURI, descendantLocalNames, attrName=None, attrValue=None):
+    if isinstance(element, LxmlElement):
+        if not isinstance(descendantLocalNames,tuple): descendantLocalNames = (descendantLocalNames ,)
+        for descendantLocalName in descendantLocalNames:
+            for child in element.iterdescendants(*lxmlTags(descendantNamespaceURI, (descendantLocalName,))):
+                if not attrName or child.getAttribute(attrName) == attrValue or (attrValue == "*" and child.hasAttribute(attrName)):
+                    return child
+        return None
     for descendantLocalName in descendantLocalNames if isinstance(descendantLocalNames,tuple) else (descendantLocalNames,):
         for child in element.getElementsByTagNameNS(descendantNamespaceURI, descendantLocalName):
             if attrName:
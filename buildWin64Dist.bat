@@ -1,8 +1,8 @@
 rem Build Arelle GUI using cx_Freeze
 
-@set PYTHONDIR=c:\python32
+@set PYTHONDIR=c:\python34
 @set NSISDIR=C:\Program Files (x86)\NSIS
-@set BUILTDIR=build\exe.win-amd64-3.2
+@set BUILTDIR=build\exe.win-amd64-3.4
 
 rem rmdir build /s/q
 rmdir dist /s/q
@@ -1,8 +1,8 @@
 rem Build Arelle GUI using cx_Freeze
 
-@set PYTHONDIR=c:\python32x86
+@set PYTHONDIR=c:\python34x86
 @set NSISDIR=C:\Program Files (x86)\NSIS
-@set BUILTDIR=build\exe.win32-3.2
+@set BUILTDIR=build\exe.win32-3.4
 
 rem rmdir build /s/q
 rmdir dist /s/q
@@ -11,4 +11,4 @@ mkdir dist
 
 "%NSISDIR%\makensis" installWin86.nsi
 
-rem compact /c /f dist\exe.win32-3.2.exe
\ No newline at end of file
+rem compact /c /f dist\exe.win32-3.4.exe
\ No newline at end of file
@@ -1,12 +1,12 @@
 rem Build Arelle GUI using cx_Freeze
 rem both win 32 (x86) and win 64 (x64)
 
-@set PYTHON32DIR=c:\python32x86
-@set PYTHON64DIR=c:\python32
+@set PYTHON32DIR=c:\python34x86
+@set PYTHON64DIR=c:\python34
 @set NSISDIR=C:\Program Files (x86)\NSIS
 @set CMDLINEZIP=C:\Program Files (x86)\7z\7za.exe
-@set BUILT32DIR=build\exe.win32-3.2
-@set BUILT64DIR=build\exe.win-amd64-3.2
+@set BUILT32DIR=build\exe.win32-3.4
+@set BUILT64DIR=build\exe.win-amd64-3.4
 
 "%PYTHON64DIR%\python" buildVersion.py
 
@@ -19,7 +19,7 @@ rem win 32 (x86) build
 "%PYTHON32DIR%\python" setup.py build_exe
 rem fix up lxml missing modules in cx_freeze build
 mkdir lxml
-copy "%PYTHON32DIR%\Lib\site-packages\lxml\__pycache__\_elementpath.cpython-32.pyc" lxml\_elementpath.pyc
+copy "%PYTHON32DIR%\Lib\site-packages\lxml\__pycache__\_elementpath.cpython-34.pyc" lxml\_elementpath.pyc
 "%CMDLINEZIP%" a "%BUILT32DIR%\library.zip" lxml\_elementpath.pyc
 rmdir lxml/s/q
 "%NSISDIR%\makensis" installWin86.nsi
@@ -30,13 +30,13 @@ rem win 64 build
 "%PYTHON64DIR%\python" setup.py build_exe
 rem fix up lxml missing modules in cx_freeze build
 mkdir lxml
-copy "%PYTHON64DIR%\Lib\site-packages\lxml\__pycache__\_elementpath.cpython-32.pyc" lxml\_elementpath.pyc
+copy "%PYTHON64DIR%\Lib\site-packages\lxml\__pycache__\_elementpath.cpython-34.pyc" lxml\_elementpath.pyc
 "%CMDLINEZIP%" a "%BUILT64DIR%\library.zip" lxml\_elementpath.pyc
 rmdir lxml/s/q
 "%NSISDIR%\makensis" installWin64.nsi
 rem rename for build date
 call buildRenameX64.bat
 
-rem compact /c /f dist\exe.win32-3.2.exe
+rem compact /c /f dist\exe.win32-3.4.exe
 
 rem rmdir build /s/q
@@ -10,7 +10,7 @@ rem Run SEC Edgar Filer Manual (EFM) Conformance Suite tests
 
 @set ARELLEDIR=C:\Users\Herm Fischer\Documents\mvsl\projects\Arelle\ArelleProject\arelle
 
-@set PYTHONDIR=c:\python31
+@set PYTHONDIR=c:\python34
 @set PYTHONPATH=..
 
 "%PYTHONDIR%\python" -m arelle.CntlrCmdLine --file "%TESTCASESINDEXFILE%" --efm --validate --csvTestReport "%OUTPUTCSVFILE%" 1>  "%OUTPUTLOGFILE%" 2>&1
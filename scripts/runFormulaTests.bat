@@ -10,7 +10,7 @@ rem Run XBRL Formula Conformance Suite tests
 
 @set ARELLEDIR=C:\Users\Herm Fischer\Documents\mvsl\projects\Arelle\ArelleProject\arelle
 
-@set PYTHONDIR=c:\python31
+@set PYTHONDIR=c:\python34
 @set PYTHONPATH=..
 
 "%PYTHONDIR%\python" -marelle.CntlrCmdLine --file "%TESTCASESINDEXFILE%" --validate --csvTestReport "%OUTPUTCSVFILE%" --logFile "%OUTPUTLOGFILE%"
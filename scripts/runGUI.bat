@@ -1,6 +1,6 @@
 rem Run Arelle GUI
 
-@set PYTHONDIR=c:\python31
+@set PYTHONDIR=c:\python34
 @set PYTHONPATH=..
 
 "%PYTHONDIR%\python" -m arelle.CntlrWinMain
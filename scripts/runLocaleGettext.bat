@@ -1,5 +1,5 @@
 @rem Run Internationalizable string extraction
-@set PYTHONDIR=C:\python31
+@set PYTHONDIR=C:\python34
 
 %PYTHONDIR%\python %PYTHONDIR%\Tools\i18n\pygettext.py --verbose --output-dir=..\locale arelle\*.pyw arelle\*.py
 
@@ -1,3 +1,3 @@
 rem Run Versioning consumption tests
 
-\python31\python "C:\Users\Herm Fischer\Documents\mvsl\projects\Arelle\ArelleProject\src\CntlrProfiler.py"  1> "C:\temp\Arelle-Profiler-log.txt" 2>&1
+\python34\python "C:\Users\Herm Fischer\Documents\mvsl\projects\Arelle\ArelleProject\src\CntlrProfiler.py"  1> "C:\temp\Arelle-Profiler-log.txt" 2>&1
@@ -0,0 +1,15 @@
+rem Run Arelle regression tests
+
+@set TESTCASESINDEXFILE=..\tests\index.xml
+@set EFMTESTCASESINDEXFILE=..\tests\index-efm.xml
+
+@set OUTPUTLOGFILE=c:\temp\Regression-test-log.txt
+
+@set OUTPUTCSVFILE=c:\temp\Regression-test-report.csv
+@set EFMOUTPUTCSVFILE=c:\temp\Regression-EFM-test-report.csv
+
+@set PYTHONDIR=c:\python34
+@set PYTHONPATH=..
+
+"%PYTHONDIR%\python" -m arelle.CntlrCmdLine --file "%TESTCASESINDEXFILE%" --validate --calcDecimals --csvTestReport "%OUTPUTCSVFILE%" 1>  "%OUTPUTLOGFILE%" 2>&1
+"%PYTHONDIR%\python" -m arelle.CntlrCmdLine --file "%EFMTESTCASESINDEXFILE%" --efm --validate --csvTestReport "%EFMOUTPUTCSVFILE%" 1>> "%OUTPUTLOGFILE%" 2>&1
@@ -68,6 +68,7 @@ setup(name='Arelle',
       packages=packages,
       data_files=dataFiles,
       platforms = ['OS Independent'],
+      python_requires = '>=3.4', # os.replace, concurrent.futures, multiprocessing contexts
       license = 'Apache-2',
       keywords = ['xbrl'],
       classifiers = [
@@ -76,7 +77,7 @@ setup(name='Arelle',
           'Intended Audience :: Developers',
           'License :: OSI Approved :: Apache-2 License',
           'Programming Language :: Python :: 3',
-          'Programming Language :: Python :: 3.1',
+          'Programming Language :: Python :: 3.4',
           'Operating System :: OS Independent',
           'Topic :: XBRL Validation and Versioning',
           ],